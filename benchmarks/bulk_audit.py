@@ -0,0 +1,79 @@
+"""
+Writing rows with their audit fields: per-row save() against BaseQuerySet's bulk_create() and bulk_update().
+
+Rows are OutboundEmail messages (a BaseModel without signal receivers, so only the write path is
+measured) written inside acting_as(), so both paths record the same created_by/updated_by. The per-row
+path runs in one transaction, its best case; in autocommit mode every row would also pay a commit.
+
+    python -m benchmarks.bulk_audit --rows 100000
+"""
+import argparse
+import time
+
+from benchmarks.common import print_table, setup_django, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection, transaction
+    from django.test import override_settings
+    from loan_app_backend.apps.loanapp.models import OutboundEmail, Users
+    from loan_app_backend.apps.loanapp.outbox import outbound_email
+    from middlewares.user_middleware import acting_as
+
+    def build():
+        return [outbound_email("Benchmark", [f'user{i}@example.com'], body="Hello") for i in range(args.rows)]
+
+    def save_each(emails):
+        for email in emails:
+            email.save()
+
+    def update_each(emails):
+        for email in emails:
+            email.status = 'sent'
+            email.save()
+
+    def update_bulk(emails):
+        for email in emails:
+            email.status = 'sent'
+        OutboundEmail.objects.bulk_update(emails, ['status'], batch_size=args.batch_size)
+
+    def run(name, write, emails):
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with override_settings(DEBUG=False), connection.execute_wrapper(count), transaction.atomic():
+            write(emails)
+        seconds = time.perf_counter() - started
+        audited = OutboundEmail.objects.filter(created_by=user, updated_by=user).count()
+        return [name, f'{args.rows:,}', f'{queries:,}', f'{seconds:.2f}', f'{args.rows / seconds:,.0f}', f'{audited:,}']
+
+    rows = []
+    with test_database():
+        user = Users.objects.create_user(username='bench', email='bench@example.com', password='!')
+        with acting_as(user):
+            emails = build()
+            rows.append(run('save() per row', save_each, emails))
+            rows.append(run('save() per row (update)', update_each, emails))
+            OutboundEmail.objects.all().delete()
+
+            emails = build()
+            bulk_create = lambda emails: OutboundEmail.objects.bulk_create(emails, batch_size=args.batch_size)
+            rows.append(run(f'bulk_create (batch {args.batch_size})', bulk_create, emails))
+            rows.append(run(f'bulk_update (batch {args.batch_size})', update_bulk, emails))
+
+    print_table(['path', 'rows', 'queries', 'seconds', 'rows/s', 'rows audited'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Shared helpers for the benchmark scripts in this package.
+
+Benchmarks are run from the project root as modules, e.g. ``python -m benchmarks.email_domain``.
+Anything that touches the database runs against a throwaway test database, never the configured one.
+"""
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    """Configure Django the same way manage.py does."""
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+    from loan_app_backend.loan_app_backend.configurations import DEBUG
+
+    if DEBUG:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "loan_app_backend.loan_app_backend.settings.dev_settings")
+    else:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "loan_app_backend.loan_app_backend.settings.prod_settings")
+
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """Create a migrated test database for the duration of the block and destroy it afterwards."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(func, repeat=50):
+    """
+    Call `func` `repeat` times and return latency statistics in milliseconds.
+
+    Returns:
+        dict: p50, p99 and mean wall-clock latency plus mean CPU time per call.
+    """
+    wall, cpu = [], []
+    for _ in range(repeat):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        func()
+        wall.append((time.perf_counter() - wall_start) * 1000)
+        cpu.append((time.process_time() - cpu_start) * 1000)
+    wall.sort()
+    return {
+        'p50': statistics.median(wall),
+        'p99': wall[min(len(wall) - 1, int(len(wall) * 0.99))],
+        'mean': statistics.fmean(wall),
+        'cpu': statistics.fmean(cpu),
+    }
+
+
+def print_table(headers, rows):
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *rows)]
+    for row in [headers, *rows]:
+        print("  ".join(str(cell).rjust(width) for cell, width in zip(row, widths)))
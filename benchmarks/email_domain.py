@@ -0,0 +1,69 @@
+"""
+Latency of the shared-email-domain fraud rule as the Users table grows.
+
+Compares the legacy ``email__iendswith`` scan, a COUNT over the indexed ``email_domain`` column and the
+single-row ``EmailDomainStats`` lookup the rule now uses.
+
+    python -m benchmarks.email_domain --sizes 10000 100000 1000000
+"""
+import argparse
+
+from benchmarks.common import measure, print_table, setup_django, test_database
+
+HOT_DOMAIN = 'gmail.com'
+
+
+def seed_users(start, stop, batch_size=5000):
+    from loan_app_backend.apps.loanapp.models import Users
+
+    for offset in range(start, stop, batch_size):
+        batch = []
+        for i in range(offset, min(offset + batch_size, stop)):
+            # A third of the users share one big provider, the rest spread over many small domains.
+            domain = HOT_DOMAIN if i % 3 == 0 else f'company{i % 5000}.com'
+            batch.append(Users(
+                username=f'bench_{i}', email=f'bench_{i}@{domain}', email_domain=domain, password='!',
+            ))
+        Users.objects.bulk_create(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    setup_django()
+    from loan_app_backend.apps.loanapp.fraud import FraudContext, rebuild_fraud_counters
+    from loan_app_backend.apps.loanapp.models import Users
+
+    rows = []
+    with test_database():
+        seeded = 0
+        for size in sorted(args.sizes):
+            seed_users(seeded, size)
+            seeded = size
+            rebuild_fraud_counters()
+            user = Users.objects.filter(email_domain=HOT_DOMAIN).first()
+
+            legacy = measure(
+                lambda: Users.objects.filter(email__iendswith=f'@{HOT_DOMAIN}').distinct().count(), args.repeat
+            )
+            column = measure(lambda: Users.objects.filter(email_domain=HOT_DOMAIN).count(), args.repeat)
+            stats = measure(lambda: FraudContext(user, 0).email_domain_user_count, args.repeat)
+            rows.append([
+                f'{size:,}',
+                f"{legacy['p50']:.3f}", f"{legacy['p99']:.3f}",
+                f"{column['p50']:.3f}", f"{column['p99']:.3f}",
+                f"{stats['p50']:.3f}", f"{stats['p99']:.3f}",
+            ])
+
+    print_table(
+        ['users', 'iendswith p50', 'p99', 'column p50', 'p99', 'stats p50', 'p99'],
+        rows,
+    )
+    print("Latencies in milliseconds.")
+
+
+if __name__ == '__main__':
+    main()
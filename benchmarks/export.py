@@ -0,0 +1,74 @@
+"""
+Peak memory and throughput of the streaming loan export as the table grows.
+
+Consumes the same generator AdminLoanExportView streams (loan_rows() encoded by encode_rows()) and
+compares it with materialising the rows first, as a non-streaming export would.
+
+    python -m benchmarks.export --sizes 10000 50000 100000
+"""
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.common import print_table, setup_django, test_database
+
+
+def seed_loans(start, stop, users, batch_size=5000):
+    from loan_app_backend.apps.loanapp.models import LoanApplication
+
+    for offset in range(start, stop, batch_size):
+        LoanApplication.objects.bulk_create([
+            LoanApplication(user=users[i % len(users)], amount_requested=1000 + i, purpose="Benchmark")
+            for i in range(offset, min(offset + batch_size, stop))
+        ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 50_000, 100_000])
+    parser.add_argument('--format', choices=['csv', 'jsonl'], default='csv')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test import override_settings
+    from loan_app_backend.apps.loanapp.export import LOAN_EXPORT_FIELDS, encode_rows, loan_rows
+    from loan_app_backend.apps.loanapp.models import LoanApplication, Users
+
+    def run(consume):
+        queryset = LoanApplication.objects.order_by('-created_at')
+        tracemalloc.start()
+        started = time.perf_counter()
+        with override_settings(DEBUG=False):  # Don't count the debug query log.
+            size = consume(queryset)
+        seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return size, seconds, peak
+
+    def streamed(queryset):
+        return sum(len(block) for block in encode_rows(loan_rows(queryset), LOAN_EXPORT_FIELDS, args.format))
+
+    def materialised(queryset):
+        rows = list(loan_rows(queryset))
+        return len(b''.join(encode_rows(rows, LOAN_EXPORT_FIELDS, args.format, chunk_size=len(rows) or 1)))
+
+    rows = []
+    with test_database():
+        users = Users.objects.bulk_create([
+            Users(username=f'bench_{i}', email=f'bench_{i}@example.com', password='!') for i in range(100)
+        ])
+        seeded = 0
+        for total in sorted(args.sizes):
+            seed_loans(seeded, total, users)
+            seeded = total
+            for name, consume in (('streamed', streamed), ('materialised', materialised)):
+                size, seconds, peak = run(consume)
+                rows.append([
+                    f'{total:,}', name, f'{size / 2**20:.1f}', f'{peak / 2**20:.1f}', f'{total / seconds:,.0f}'
+                ])
+
+    print_table(['loans', 'export', 'output MiB', 'peak MiB', 'rows/s'], rows)
+
+
+if __name__ == '__main__':
+    main()
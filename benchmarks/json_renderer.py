@@ -0,0 +1,65 @@
+"""
+Encoding throughput of the JSON backends behind EnvelopeResponse and FastJSONRenderer.
+
+Encodes a wrapped loan list page (Decimal amounts) and a login payload (datetime expirations) with
+the stdlib json module and with orjson, and reports responses encoded per second.
+
+    python -m benchmarks.json_renderer --rows 100
+"""
+import argparse
+import datetime
+from decimal import Decimal
+
+from benchmarks.common import measure, print_table, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test import override_settings
+    from django.utils import timezone
+    from loan_app_backend.apps.common import renderers
+    from loan_app_backend.apps.common.responses import EnvelopeResponse
+
+    loan_page = {
+        "count": args.rows, "count_is_approximate": False, "next": None, "previous": None,
+        "results": [
+            {
+                "id": f"01JZ{i:022d}", "amount_requested": Decimal('250000.00') + i,
+                "purpose": "Working capital for inventory and equipment.", "status": "pending",
+                "created_at": timezone.now(),
+                "user": {"id": f"01JY{i % 10:022d}", "email": f"bench_{i % 10}@example.com",
+                         "first_name": "Bench", "last_name": f"User {i % 10}"},
+            }
+            for i in range(args.rows)
+        ],
+    }
+    now = timezone.now()
+    login = {
+        "access_token": "x" * 220, "refresh_token": "y" * 220,
+        "access_token_expiration": now + datetime.timedelta(hours=24),
+        "refresh_token_expiration": now + datetime.timedelta(hours=48),
+    }
+
+    if renderers.orjson is None:
+        print("orjson is not installed; only the stdlib backend is measured.")
+    rows = []
+    for name, data in ((f'loan page ({args.rows} rows)', loan_page), ('login', login)):
+        for backend in ('stdlib', 'orjson'):
+            if backend == 'orjson' and renderers.orjson is None:
+                continue
+            with override_settings(JSON_BACKEND=backend):
+                timing = measure(
+                    lambda: EnvelopeResponse("Data retrieved successfully.", data).wrap().content, args.repeat
+                )
+            rows.append([name, backend, f"{timing['p50']:.4f}", f"{1000 / timing['mean']:,.0f}"])
+
+    print_table(['payload', 'backend', 'p50 ms', 'responses/s'], rows)
+
+
+if __name__ == '__main__':
+    main()
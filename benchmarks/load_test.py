@@ -0,0 +1,181 @@
+"""
+Requests per second and latency of the async views under WSGI (gunicorn) and ASGI (uvicorn) workers.
+
+Migrates and seeds a throwaway database, then starts each server in turn with the same number of
+worker processes and drives it with `--concurrency` keep-alive clients:
+
+    profile  GET  /api/v1/users/profile/  (UserProfileView)
+    loans    POST /api/v1/users/loans/    (LoanApplicationView, fraud checks and all)
+    login    POST /api/v1/users/auth/login/  (LoginView, dominated by password hashing)
+
+Servers whose worker class is not installed are reported and skipped. The default database is a
+temporary SQLite file; pass a --database-url to measure against a (throwaway) PostgreSQL database.
+
+    python -m benchmarks.load_test --requests 2000 --concurrency 32 --workers 2
+"""
+import argparse
+import http.client
+import importlib.util
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import print_table
+
+WSGI_APP = 'loan_app_backend.loan_app_backend.wsgi:application'
+ASGI_APP = 'loan_app_backend.loan_app_backend.asgi:application'
+
+# name: (application, gunicorn worker class, extra gunicorn arguments, module the worker class needs)
+SERVERS = {
+    'gunicorn sync': (WSGI_APP, 'sync', [], None),
+    'gunicorn gthread': (WSGI_APP, 'gthread', ['--threads', '8'], None),
+    'uvicorn': (ASGI_APP, 'uvicorn.workers.UvicornWorker', [], 'uvicorn'),
+}
+
+ENDPOINTS = ['profile', 'loans', 'login']
+PASSWORD = 'load-test-password'
+
+
+def seed(users):
+    """Migrate the database, create `users` active users and return (email, access token) pairs."""
+    from django.core.management import call_command
+    from loan_app_backend.apps.loanapp.authentication import ClaimsRefreshToken
+    from loan_app_backend.apps.loanapp.models import Users
+
+    call_command('migrate', verbosity=0, interactive=False)
+    accounts = []
+    for i in range(users):
+        user = Users.objects.create_user(
+            username=f'load_{i}', email=f'load_{i}@example.com', password=PASSWORD, is_active=True
+        )
+        accounts.append((user.email, str(ClaimsRefreshToken.for_user(user).access_token)))
+    return accounts
+
+
+def request_for(endpoint, account):
+    email, token = account
+    headers = {'Authorization': f'Bearer {token}', 'Content-Type': 'application/json'}
+    if endpoint == 'profile':
+        return 'GET', '/api/v1/users/profile/', None, headers
+    if endpoint == 'loans':
+        return 'POST', '/api/v1/users/loans/', json.dumps({'amount_requested': 25000, 'purpose': "Load test"}), headers
+    body = json.dumps({'email_or_username': email, 'password': PASSWORD})
+    return 'POST', '/api/v1/users/auth/login/', body, {'Content-Type': 'application/json'}
+
+
+def start_server(name, port, workers, env):
+    application, worker_class, extra, _ = SERVERS[name]
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', application, '--workers', str(workers), '--worker-class', worker_class,
+         '--bind', f'127.0.0.1:{port}', '--log-level', 'warning', *extra],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{name} exited: {process.stderr.read().decode()[-2000:]}")
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"{name} did not start listening on port {port}")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def load(port, endpoint, accounts, total, concurrency):
+    """Send `total` requests over `concurrency` keep-alive connections; return (seconds, latencies ms, errors)."""
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def client():
+        nonlocal errors
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        mine, failed = [], 0
+        for i in counter:  # Shared iterator: each request is taken by exactly one client.
+            method, path, body, headers = request_for(endpoint, accounts[i % len(accounts)])
+            started = time.perf_counter()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                failed += response.status >= 400
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+            mine.append((time.perf_counter() - started) * 1000)
+        connection.close()
+        with lock:
+            latencies.extend(mine)
+            errors += failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for future in [pool.submit(client) for _ in range(concurrency)]:
+            future.result()
+    return time.perf_counter() - started, sorted(latencies), errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--servers', nargs='+', choices=list(SERVERS), default=list(SERVERS))
+    parser.add_argument('--endpoints', nargs='+', choices=ENDPOINTS, default=['profile', 'loans'])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--database-url', help="Defaults to a temporary SQLite file.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ.setdefault('SECRET_KEY', 'benchmark-secret-key')
+        os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.load_test_settings'
+        os.environ['LOAD_TEST_DATABASE_URL'] = args.database_url or f'sqlite:///{directory}/load_test.sqlite3'
+        import django
+        django.setup()
+        accounts = seed(args.users)
+
+        rows = []
+        for name in args.servers:
+            module = SERVERS[name][3]
+            if module and importlib.util.find_spec(module) is None:
+                rows.append([name, '-', '-', '-', '-', '-', f'{module} not installed'])
+                continue
+            process = start_server(name, args.port, args.workers, dict(os.environ))
+            try:
+                for endpoint in args.endpoints:
+                    load(args.port, endpoint, accounts, args.concurrency * 4, args.concurrency)  # Warm up.
+                    seconds, latencies, errors = load(
+                        args.port, endpoint, accounts, args.requests, args.concurrency
+                    )
+                    rows.append([
+                        name, endpoint, f'{args.requests / seconds:,.0f}', f'{statistics.median(latencies):.1f}',
+                        f'{latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]:.1f}', errors, '',
+                    ])
+            finally:
+                stop_server(process)
+
+    print(f"{args.workers} workers, {args.concurrency} concurrent clients, {args.requests} requests per row")
+    print_table(['server', 'endpoint', 'req/s', 'p50 ms', 'p99 ms', 'errors', 'note'], rows)
+
+
+if __name__ == '__main__':
+    main()
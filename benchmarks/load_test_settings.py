@@ -0,0 +1,24 @@
+"""
+Settings for the servers started by benchmarks.load_test: the development settings pointed at the load
+test's own database, with throttles raised out of the way so every request reaches the view.
+"""
+import os
+
+import dj_database_url
+
+from loan_app_backend.loan_app_backend.settings.dev_settings import *  # noqa: F401,F403
+from loan_app_backend.loan_app_backend.settings.dev_settings import REST_FRAMEWORK, RESPONSE_CACHE
+
+DEBUG = False  # As in production: no per-query logging or debug error pages.
+
+DATABASES = {'default': dj_database_url.parse(os.environ['LOAD_TEST_DATABASE_URL'])}
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default']['OPTIONS'] = {'timeout': 30}  # Worker processes queue for SQLite's write lock.
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_RATES': {scope: '1000000/min' for scope in REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']},
+}
+
+# The workers don't share the locmem cache, so cached responses would go stale across them.
+RESPONSE_CACHE = {**RESPONSE_CACHE, 'ALLOW_LOCAL_CACHE': False}
@@ -0,0 +1,75 @@
+"""
+Rows per second of the bulk loan import against submitting the same loans one at a time.
+
+"one by one" replays what LoanApplicationView.perform_create() does for every loan: a FraudContext with
+its own counter queries, a save() and a FraudFlag per matched rule.
+
+    python -m benchmarks.loan_import --rows 5000 --users 500
+"""
+import argparse
+import time
+
+from benchmarks.common import print_table, setup_django, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from loan_app_backend.apps.loanapp.fraud import FraudContext, fraud_engine
+    from loan_app_backend.apps.loanapp.loan_import import import_loans
+    from loan_app_backend.apps.loanapp.models import FraudFlag, LoanApplication, Users
+
+    def one_by_one(rows, users):
+        for row in rows:
+            user = users[row['email']]
+            matched_rules = fraud_engine.evaluate(FraudContext(user, row['amount_requested']))
+            loan = LoanApplication.objects.create(
+                user=user, amount_requested=row['amount_requested'], purpose=row['purpose'],
+                status='flagged' if matched_rules else 'pending',
+            )
+            for rule in matched_rules:
+                FraudFlag.objects.create(loan_application=loan, reason=rule.reason)
+
+    def run(name, func):
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(count):
+            func()
+        seconds = time.perf_counter() - started
+        LoanApplication.objects.all().delete()
+        return [name, args.rows, queries, f'{seconds:.2f}', f'{args.rows / seconds:,.0f}']
+
+    rows = []
+    with test_database():
+        users = {
+            user.email: user
+            for user in (
+                Users.objects.create_user(username=f'bench_{i}', email=f'bench_{i}@example.com', password='!')
+                for i in range(args.users)
+            )
+        }
+        emails = list(users)
+        loans = [
+            {'email': emails[i % len(emails)], 'amount_requested': 1000 + i, 'purpose': "Benchmark"}
+            for i in range(args.rows)
+        ]
+        rows.append(run('one by one', lambda: one_by_one(loans, users)))
+        rows.append(run(f'import (batch {args.batch_size})', lambda: import_loans(loans, batch_size=args.batch_size)))
+
+    print_table(['path', 'rows', 'queries', 'seconds', 'rows/s'], rows)
+
+
+if __name__ == '__main__':
+    main()
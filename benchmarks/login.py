@@ -0,0 +1,58 @@
+"""
+Latency and CPU per login for each password hasher policy.
+
+Runs LoginSerializer (user lookup plus password verification) against a user hashed under each policy,
+so every measured login only verifies and never rehashes.
+
+    python -m benchmarks.login --repeat 50
+"""
+import argparse
+
+from benchmarks.common import measure, print_table, setup_django, test_database
+
+POLICIES = [
+    ('pbkdf2_sha256', 'Django default, 1M iterations', {'PBKDF2_ITERATIONS': 1_000_000}),
+    ('pbkdf2_sha256', '600k iterations', {'PBKDF2_ITERATIONS': 600_000}),
+    ('scrypt', 'N=2**14 r=8 p=1 (policy default)', {'SCRYPT_WORK_FACTOR': 2**14}),
+    ('scrypt', 'N=2**15 r=8 p=1', {'SCRYPT_WORK_FACTOR': 2**15}),
+    ('argon2', 't=2 m=19 MiB p=1 (policy default)', {}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test import override_settings
+    from loan_app_backend.apps.loanapp.hashers import password_hashers
+    from loan_app_backend.apps.loanapp.models import Users
+    from loan_app_backend.apps.loanapp.serializers import LoginSerializer
+
+    def login(identifier):
+        serializer = LoginSerializer(data={'email_or_username': identifier, 'password': 'bench-password'})
+        assert serializer.is_valid(), serializer.errors
+
+    rows = []
+    with test_database():
+        for i, (algorithm, label, policy) in enumerate(POLICIES):
+            with override_settings(PASSWORD_HASHERS=password_hashers(algorithm), PASSWORD_HASHER_POLICY=policy):
+                try:
+                    user = Users.objects.create_user(
+                        username=f'bench_{i}', email=f'bench_{i}@example.com', password='bench-password'
+                    )
+                except ValueError:
+                    rows.append([algorithm, label, '-', '-', '-', 'argon2-cffi not installed'])
+                    continue
+                timing = measure(lambda: login(user.email), args.repeat)
+            rows.append([
+                algorithm, label, f"{timing['p50']:.1f}", f"{timing['p99']:.1f}", f"{timing['cpu']:.1f}",
+                Users.objects.get(pk=user.pk).password.split('$', 2)[1],
+            ])
+
+    print_table(['hasher', 'policy', 'p50 ms', 'p99 ms', 'cpu ms', 'stored cost'], rows)
+
+
+if __name__ == '__main__':
+    main()
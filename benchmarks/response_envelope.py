@@ -0,0 +1,85 @@
+"""
+Per-request CPU time and allocations of the API response envelope on a paginated loan page.
+
+"before" returns a JsonResponse from the view, which APIResponseMiddleware parses and encodes again to
+wrap it; "after" returns an EnvelopeResponse, which the middleware wraps before its only encoding.
+Both include serializing the page and reading the final body, as the WSGI handler does.
+
+    python -m benchmarks.response_envelope --rows 100
+"""
+import argparse
+import tracemalloc
+from decimal import Decimal
+
+from benchmarks.common import measure, print_table, setup_django
+
+
+def build_page(rows):
+    from loan_app_backend.apps.loanapp.models import LoanApplication, Users
+
+    users = [
+        Users(username=f'bench_{i}', email=f'bench_{i}@example.com', first_name='Bench', last_name=f'User {i}')
+        for i in range(10)
+    ]
+    return [
+        LoanApplication(
+            user=users[i % len(users)], amount_requested=Decimal('250000.00') + i,
+            purpose='Working capital for inventory and equipment.', status='pending',
+        )
+        for i in range(rows)
+    ]
+
+
+def peak_allocation(func, repeat=20):
+    """Mean peak traced memory of one call, in KiB."""
+    total = 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        func()
+        total += tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return total / repeat / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.http import JsonResponse
+    from django.test import RequestFactory
+    from loan_app_backend.apps.common.responses import EnvelopeResponse
+    from loan_app_backend.apps.loanapp.serializers import AdminLoanApplicationSerializer
+    from middlewares.response_middleware import APIResponseMiddleware
+
+    page = build_page(args.rows)
+    request = RequestFactory().get('/api/admin/loans/')
+
+    def payload():
+        return {"count": len(page), "next": None, "previous": None,
+                "results": AdminLoanApplicationSerializer(page, many=True).data}
+
+    def before():
+        return APIResponseMiddleware(
+            lambda request: JsonResponse({"message": "Data retrieved successfully.", "data": payload()}, status=200)
+        )(request).content
+
+    def after():
+        return APIResponseMiddleware(
+            lambda request: EnvelopeResponse("Data retrieved successfully.", payload(), status=200)
+        )(request).content
+
+    assert before() == after()
+    rows = []
+    for name, func in (('before', before), ('after', after)):
+        timing = measure(func, args.repeat)
+        rows.append([name, f"{timing['cpu']:.3f}", f"{timing['p50']:.3f}", f"{peak_allocation(func):.1f}"])
+
+    print_table(['envelope', 'cpu ms', 'p50 ms', 'peak KiB'], rows)
+    print(f"{args.rows} loans per page, {len(before()):,} byte body.")
+
+
+if __name__ == '__main__':
+    main()
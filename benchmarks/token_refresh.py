@@ -0,0 +1,81 @@
+"""
+Throughput of refresh-token rotation as the token blacklist grows.
+
+Compares simplejwt's TokenRefreshSerializer with ClaimsTokenRefreshSerializer on fresh tokens, and
+the cost of rejecting a replayed (already blacklisted) token.
+
+    python -m benchmarks.token_refresh --sizes 100000 1000000 3000000
+"""
+import argparse
+import datetime
+
+from benchmarks.common import measure, print_table, setup_django, test_database
+
+
+def seed_blacklist(start, stop, batch_size=10_000):
+    from django.utils import timezone
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+    expires_at = timezone.now() + datetime.timedelta(days=2)
+    for offset in range(start, stop, batch_size):
+        tokens = OutstandingToken.objects.bulk_create([
+            OutstandingToken(jti=f'bench-{i:032x}', token='-', expires_at=expires_at)
+            for i in range(offset, min(offset + batch_size, stop))
+        ])
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token=token) for token in tokens])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 1_000_000, 3_000_000])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework_simplejwt.exceptions import TokenError
+    from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+    from loan_app_backend.apps.loanapp.authentication import ClaimsRefreshToken
+    from loan_app_backend.apps.loanapp.models import Users
+    from loan_app_backend.apps.loanapp.serializers import ClaimsTokenRefreshSerializer
+
+    def rotate(serializer_class, tokens):
+        serializer_class().validate({'refresh': tokens.pop()})
+
+    def replay(serializer_class, token):
+        try:
+            serializer_class().validate({'refresh': token})
+        except TokenError:
+            return
+        raise AssertionError("Replayed token was accepted.")
+
+    rows = []
+    with test_database():
+        user = Users.objects.create_user(username='bench', email='bench@example.com', password='!')
+        seeded = 0
+        for size in sorted(args.sizes):
+            seed_blacklist(seeded, size)
+            seeded = size
+            for name, serializer_class in (('simplejwt', TokenRefreshSerializer), ('cached', ClaimsTokenRefreshSerializer)):
+                cache.clear()
+                tokens = [str(ClaimsRefreshToken.for_user(user)) for _ in range(args.repeat + 2)]
+                with CaptureQueriesContext(connection) as queries:
+                    rotate(serializer_class, tokens)
+                fresh = measure(lambda: rotate(serializer_class, tokens), args.repeat)
+
+                used = tokens.pop()
+                rotate(serializer_class, [used])
+                replayed = measure(lambda: replay(serializer_class, used), args.repeat)
+                rows.append([
+                    f'{size:,}', name, len(queries.captured_queries),
+                    f"{fresh['p50']:.3f}", f"{fresh['p99']:.3f}", f"{1000 / fresh['mean']:,.0f}",
+                    f"{replayed['p50']:.3f}",
+                ])
+
+    print_table(['blacklist rows', 'serializer', 'queries', 'p50 ms', 'p99 ms', 'refresh/s', 'replay p50 ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
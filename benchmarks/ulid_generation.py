@@ -0,0 +1,51 @@
+"""
+Cost of generating ULID strings: the former str(ulid.new()) against ULIDGenerator.new() and generate_many().
+
+No database involved: each row makes `--count` ids, keeping the best of `--repeat` runs, and checks
+that the ids come out distinct and in ascending order. The order check matters because ulid.new()
+gives the ULIDs made within the same millisecond random order, while the generator counts up.
+
+    python -m benchmarks.ulid_generation --count 100000
+"""
+import argparse
+import time
+
+import ulid
+
+from benchmarks.common import print_table, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from loan_app_backend.apps.common.fields import ULIDGenerator
+
+    generator = ULIDGenerator()
+    paths = {
+        'str(ulid.new()) per id': lambda: [str(ulid.new()) for _ in range(args.count)],
+        'ULIDGenerator.new() per id': lambda: [generator.new() for _ in range(args.count)],
+        'ULIDGenerator.generate_many()': lambda: generator.generate_many(args.count),
+    }
+
+    rows, baseline = [], None
+    for name, generate in paths.items():
+        best, ids = float('inf'), None
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            ids = generate()
+            best = min(best, time.perf_counter() - started)
+        baseline = baseline or best
+        rows.append([
+            name, f'{args.count:,}', f'{best * 1e9 / args.count:,.0f}', f'{baseline / best:.1f}x',
+            len(set(ids)) == len(ids), ids == sorted(ids),
+        ])
+
+    print_table(['path', 'ids', 'ns per id', 'speedup', 'distinct', 'ascending'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Index size and join speed of ULID keys stored as 26-character varchars against ULIDField's 16 bytes.
+
+Builds the same pair of tables twice, a parent keyed by ULID and a child with an indexed foreign key
+column (the shape of Users -> LoanApplication -> FraudFlag), once with the old CharField(max_length=26)
+column type and once with ULIDField's (uuid on PostgreSQL, a blob on SQLite). Then reports the size of
+the tables and their indexes, a join over every child row and the IN (...) lookup of 500 parents'
+children that prefetch_related() and select_related() issue, without and with ULIDField's conversion
+of the fetched keys back to strings (all times are medians).
+
+    python -m benchmarks.ulid_keys --parents 100000 --children 500000
+"""
+import argparse
+import random
+
+import ulid
+
+from benchmarks.common import measure, print_table, setup_django, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--parents', type=int, default=100_000)
+    parser.add_argument('--children', type=int, default=500_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection, models, transaction
+    from loan_app_backend.apps.common.fields import ULIDField
+
+    ulid_field = ULIDField()
+    kinds = {
+        'varchar(26)': (models.CharField(max_length=26), lambda value: value, None),
+        'ULIDField': (
+            ulid_field,
+            lambda value: ulid_field.get_db_prep_value(value, connection),
+            lambda value: ulid_field.from_db_value(value, None, connection),
+        ),
+    }
+    parent_ids = sorted(str(ulid.new()) for _ in range(args.parents))
+    children = sorted((str(ulid.new()), random.choice(parent_ids)) for _ in range(args.children))
+    lookup_ids = random.sample(parent_ids, 500)
+
+    def relation_bytes(cursor, table):
+        """(table bytes, bytes of all its indexes)."""
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT pg_table_size(%s), pg_indexes_size(%s)', [table, table])
+            return cursor.fetchone()
+        cursor.execute(
+            "SELECT COALESCE(SUM(CASE WHEN name = %s THEN pgsize END), 0), "
+            "COALESCE(SUM(CASE WHEN name <> %s THEN pgsize END), 0) FROM dbstat "
+            "WHERE name = %s OR name IN (SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = %s)",
+            [table, table, table, table],
+        )
+        return cursor.fetchone()
+
+    rows = []
+    with test_database(), connection.cursor() as cursor:
+        for name, (field, stored, loaded) in kinds.items():
+            suffix = 'ulid' if field is ulid_field else 'varchar'
+            parent, child = f'bench_parent_{suffix}', f'bench_child_{suffix}'
+            column_type = field.db_type(connection)
+            cursor.execute(f'CREATE TABLE {parent} (id {column_type} PRIMARY KEY, name varchar(20) NOT NULL)')
+            cursor.execute(
+                f'CREATE TABLE {child} (id {column_type} PRIMARY KEY, '
+                f'parent_id {column_type} NOT NULL REFERENCES {parent} (id), amount integer NOT NULL)'
+            )
+            cursor.execute(f'CREATE INDEX {child}_parent_id ON {child} (parent_id)')
+            with transaction.atomic():
+                for start in range(0, args.parents, 5000):
+                    cursor.executemany(
+                        f'INSERT INTO {parent} (id, name) VALUES (%s, %s)',
+                        [(stored(pk), 'parent') for pk in parent_ids[start:start + 5000]],
+                    )
+                for start in range(0, args.children, 5000):
+                    cursor.executemany(
+                        f'INSERT INTO {child} (id, parent_id, amount) VALUES (%s, %s, %s)',
+                        [(stored(pk), stored(parent_id), 1) for pk, parent_id in children[start:start + 5000]],
+                    )
+            if connection.vendor == 'postgresql':
+                cursor.execute(f'VACUUM ANALYZE {parent}')
+                cursor.execute(f'VACUUM ANALYZE {child}')
+            else:
+                cursor.execute('ANALYZE')
+
+            sizes = [relation_bytes(cursor, table) for table in (parent, child)]
+            keys = [stored(pk) for pk in lookup_ids]
+
+            def join():
+                cursor.execute(f'SELECT COUNT(*), SUM(c.amount) FROM {child} c JOIN {parent} p ON p.id = c.parent_id')
+                return cursor.fetchone()
+
+            def lookup(decode=True):
+                cursor.execute(
+                    f'SELECT c.id, c.parent_id, p.name FROM {child} c JOIN {parent} p ON p.id = c.parent_id '
+                    f'WHERE c.parent_id IN ({", ".join(["%s"] * len(keys))})',
+                    keys,
+                )
+                fetched = cursor.fetchall()
+                if loaded and decode:
+                    fetched = [(loaded(pk), loaded(parent_id), name) for pk, parent_id, name in fetched]
+                return fetched
+
+            assert join()[0] == args.children
+            joined = measure(join, args.repeat)
+            queried = measure(lambda: lookup(decode=False), args.repeat * 10)
+            looked_up = measure(lookup, args.repeat * 10)
+            rows.append([
+                name, column_type,
+                f'{sum(size[0] for size in sizes) / 2 ** 20:.1f}', f'{sum(size[1] for size in sizes) / 2 ** 20:.1f}',
+                f"{joined['p50']:.1f}", f"{queried['p50']:.2f}", f"{looked_up['p50']:.2f}",
+            ])
+
+    print(f"{connection.vendor}: {args.parents:,} parents, {args.children:,} children")
+    print_table(
+        ['keys', 'column type', 'tables MiB', 'indexes MiB', 'full join ms', 'IN (500) query ms', 'with decoding ms'],
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -35,28 +35,35 @@ echo "Installing dependencies..."
 pip install --upgrade pip
 pip install -r requirements.txt || { echo "Failed to install requirements"; exit 1; }
 
-# Step 6: Run migrations
+# Step 6: Stop Gunicorn and run migrations
+# Migrations such as loanapp 0008-0010 (binary ULID keys) are not safe to run under live traffic, so the
+# application is stopped first; it stays down if a migration fails.
+echo "Stopping Gunicorn..."
+sudo systemctl stop "$GUNICORN_SERVICE" || { echo "Failed to stop Gunicorn"; exit 1; }
 echo "Running Django migrations..."
 python manage.py makemigrations || { echo "Makemigrations failed"; exit 1; }
-python manage.py migrate || { echo "Migrate failed"; exit 1; }
+python manage.py migrate || { echo "Migrate failed, Gunicorn left stopped"; exit 1; }
 
 # Step 7: Collect static files
 echo "Collecting static files..."
 python manage.py collectstatic --noinput || { echo "Collectstatic failed"; exit 1; }
 
-# Step 8: Set permissions for static files and socket
+# Step 8: Start Gunicorn
+echo "Starting Gunicorn..."
+sudo systemctl start "$GUNICORN_SERVICE" || { echo "Failed to start Gunicorn"; exit 1; }
+
+# Step 9: Set permissions for static files and socket
 echo "Setting permissions..."
 sudo chown -R nwodo:www-data "$PROJECT_DIR/staticfiles"
 sudo chmod -R 755 "$PROJECT_DIR/staticfiles"
 sudo chown nwodo:www-data "$PROJECT_DIR/gunicorn.sock"
 sudo chmod 660 "$PROJECT_DIR/gunicorn.sock"
 
-# Step 9: Restart Gunicorn and Nginx
-echo "Restarting Gunicorn and Nginx..."
-sudo systemctl restart "$GUNICORN_SERVICE" || { echo "Failed to restart Gunicorn"; exit 1; }
+# Step 10: Restart Nginx
+echo "Restarting Nginx..."
 sudo systemctl restart "$NGINX_SERVICE" || { echo "Failed to restart Nginx"; exit 1; }
 
-# Step 10: Verify services
+# Step 11: Verify services
 echo "Checking service status..."
 sudo systemctl status "$GUNICORN_SERVICE" --no-pager
 sudo systemctl status "$NGINX_SERVICE" --no-pager
@@ -0,0 +1,117 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
+from loan_app_backend.apps.common.responses import EnvelopeResponse
+
+
+DEFAULT_RESPONSE_CACHE_SETTINGS = {
+    'TIMEOUT': 300,  # Seconds a cached list response is kept; changes invalidate it sooner through versions.
+    'ALLOW_LOCAL_CACHE': False,  # Cache even in a process-local cache with DEBUG off, for single-process servers.
+}
+
+
+def response_cache_settings():
+    return {**DEFAULT_RESPONSE_CACHE_SETTINGS, **getattr(settings, 'RESPONSE_CACHE', {})}
+
+
+def response_caching_enabled():
+    """
+    False when the default cache is local to each process, outside DEBUG and unless ALLOW_LOCAL_CACHE.
+
+    A version bump in one worker would then leave every other worker serving its own stale copies.
+    """
+    return (
+        not isinstance(caches['default'], LocMemCache)
+        or settings.DEBUG
+        or response_cache_settings()['ALLOW_LOCAL_CACHE']
+    )
+
+
+def version_key(scope):
+    return f'response-version:{scope}'
+
+
+def start_version(key):
+    # Counters start at the current time rather than 0, so a counter that was evicted from the cache never
+    # comes back to a number that old responses are still cached under.
+    if cache.add(key, time.time_ns(), timeout=None):
+        return cache.get(key)
+    return cache.get(key) or start_version(key)
+
+
+def get_versions(scopes):
+    """Return the current version of each scope, in order."""
+    keys = [version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    return [versions.get(key) or start_version(key) for key in keys]
+
+
+def bump_versions(*scopes):
+    """
+    Invalidate every cached response that depends on any of `scopes`.
+
+    Bumps right away and, inside a transaction, once more after commit: a response built from the old
+    rows between the two would otherwise be cached under the new version.
+    """
+    for scope in scopes:
+        key = version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            start_version(key)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: bump_versions(*scopes))
+
+
+class CachedListMixin:
+    """
+    Serve list() from the cache, per user, URL (filters and page) and version of the data it shows.
+
+    Responses carry an ETag and are answered with 304 Not Modified when the client already has them.
+    There is no Last-Modified: the time a response was cached says nothing about when its rows last
+    changed. Views set cache_scopes (or override get_cache_scopes()); saving or deleting data bumps
+    those scopes (bump_versions()), which moves every dependent response to a new cache key. Nothing
+    is cached when the cache isn't shared between processes (see response_caching_enabled()).
+    """
+
+    cache_scopes = None
+
+    def get_cache_scopes(self):
+        """Names of the versioned scopes the listed data depends on; `cache_scopes` by default."""
+        assert self.cache_scopes is not None, f"{type(self).__name__} must set cache_scopes."
+        return self.cache_scopes
+
+    def get_response_cache_key(self, request):
+        versions = get_versions(self.get_cache_scopes())
+        url = hashlib.sha1(request.build_absolute_uri().encode('utf-8')).hexdigest()
+        return (
+            f'response:{type(self).__module__}.{type(self).__qualname__}:{request.user.pk}:{url}:'
+            + ':'.join(str(version) for version in versions)
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not response_caching_enabled():
+            return super().list(request, *args, **kwargs)
+        key = self.get_response_cache_key(request)
+        entry = cache.get(key)
+        if entry is None:
+            response = super().list(request, *args, **kwargs)
+            if response.status_code != 200 or not isinstance(response, EnvelopeResponse):
+                return response
+            content = response.wrap().content
+            entry = {'content': content, 'etag': quote_etag(hashlib.sha1(content).hexdigest())}
+            cache.set(key, entry, response_cache_settings()['TIMEOUT'])
+        else:
+            response = HttpResponse(entry['content'], content_type='application/json')
+
+        response['ETag'] = entry['etag']
+        # Clients keep their copy but revalidate it on every request; it is personal data.
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ['Authorization'])
+        return get_conditional_response(request, etag=entry['etag'], response=response)
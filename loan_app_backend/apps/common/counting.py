@@ -0,0 +1,129 @@
+import hashlib
+import json
+from typing import NamedTuple
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+DEFAULT_COUNT_SETTINGS = {
+    'ESTIMATE_THRESHOLD': 100_000,  # Unfiltered tables at least this large report the planner's estimate.
+    'CACHE_THRESHOLD': 1_000,  # Exact counts at least this large are cached; smaller ones are always recounted.
+    'CACHE_TIMEOUT': 10,  # Seconds a cached exact count is reused.
+}
+
+
+class CountResult(NamedTuple):
+    value: int
+    approximate: bool
+
+
+def count_settings():
+    return {**DEFAULT_COUNT_SETTINGS, **getattr(settings, 'PAGINATION_COUNT', {})}
+
+
+def count_cache_key(queryset, versions=()):
+    """
+    A key shared by every queryset that compiles to the same SQL, i.e. the same model, filters and scope,
+    and counts the same versions of the data (see caching.get_versions()).
+    """
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.sha1(repr((queryset.db, sql, params, list(versions))).encode('utf-8')).hexdigest()
+    return f'pagination-count:{digest}'
+
+
+def estimate_count(queryset):
+    """
+    Return the planner's row estimate for an unfiltered queryset, or None when there isn't a cheap one.
+
+    Only PostgreSQL is supported: pg_class.reltuples for the table, falling back to the row estimate
+    of EXPLAIN when the table has never been analyzed.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql' or queryset.query.where:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+            [connection.ops.quote_name(queryset.model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return row[0]
+
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+def count_queryset(queryset, versions=()):
+    """
+    Count a queryset using the cheapest strategy that is accurate enough for pagination.
+
+    1. A recently cached exact count for the same filter set. With `versions`, the versions of the
+       response cache scopes the queryset reads, a write moves the count to a new key and a cached count
+       stays exact; without, it may be up to CACHE_TIMEOUT old and is flagged as approximate.
+    2. The planner's estimate for large unfiltered tables (flagged as approximate).
+    3. An exact COUNT(*), cached for a short while when the result is large.
+    """
+    options = count_settings()
+    key = count_cache_key(queryset, versions)
+    cached = cache.get(key)
+    if cached is not None:
+        return CountResult(cached, not versions)
+
+    estimate = estimate_count(queryset)
+    if estimate is not None and estimate >= options['ESTIMATE_THRESHOLD']:
+        return CountResult(estimate, True)
+
+    exact = queryset.count()
+    if exact >= options['CACHE_THRESHOLD']:
+        cache.set(key, exact, options['CACHE_TIMEOUT'])
+    return CountResult(exact, False)
+
+
+class CountingPaginator(Paginator):
+    """
+    A Django paginator whose count comes from count_queryset(), given the `count_versions` of the data.
+
+    When the count is approximate, pages past the estimated end stay reachable and the last page is not
+    truncated to the estimate.
+    """
+    count_is_approximate = False
+
+    def __init__(self, *args, count_versions=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_versions = count_versions
+
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, 'query'):
+            return super().count
+        result = count_queryset(self.object_list, self.count_versions)
+        self.count_is_approximate = result.approximate
+        return result.value
+
+    def validate_number(self, number):
+        if not (self.count and self.count_is_approximate):
+            return super().validate_number(number)
+        # Same checks as Paginator.validate_number, minus the upper bound the estimate can't vouch for.
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.count_is_approximate:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(self.object_list[bottom:bottom + self.per_page], number, self)
@@ -0,0 +1,224 @@
+import os
+import re
+import threading
+import time
+import uuid
+import ulid
+from collections import defaultdict
+from django.core import exceptions
+from django.db import models, transaction
+from django.utils.translation import gettext_lazy as _
+
+
+CROCKFORD_BASE32 = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+ULID_RE = re.compile(r'[0-7][0-9A-HJKMNP-TV-Z]{25}', re.IGNORECASE)
+
+# Crockford's base32 digits (no I, L, O or U) onto the digits int(value, 32) reads, so a ULID string
+# decodes to its 128-bit integer in C rather than one character at a time.
+_TO_INT_DIGITS = str.maketrans('ABCDEFGHJKMNPQRSTVWXYZabcdefghjkmnpqrstvwxyz', 'abcdefghijklmnopqrstuvabcdefghijklmnopqrstuv')
+_CHARACTER_PAIRS = [first + second for first in CROCKFORD_BASE32 for second in CROCKFORD_BASE32]
+_PAIR_SHIFTS = range(120, -1, -10)  # 130 bits, the top two of which are always 0.
+
+
+def is_ulid(value):
+    return isinstance(value, str) and ULID_RE.fullmatch(value) is not None
+
+
+def ulid_to_bytes(value):
+    """The 16 bytes of a ULID string; the caller has checked it with is_ulid()."""
+    return int(value.translate(_TO_INT_DIGITS), 32).to_bytes(16, 'big')
+
+
+def ulid_from_int(number):
+    """The ULID string of a 128-bit int, two characters (ten bits) per lookup: twice as fast as ulid-py's."""
+    return ''.join([_CHARACTER_PAIRS[(number >> shift) & 1023] for shift in _PAIR_SHIFTS])
+
+
+def ulid_from_bytes(value):
+    return ulid_from_int(int.from_bytes(value, 'big'))
+
+
+class ULIDGenerator:
+    """
+    Hands out ULID strings that increase strictly within the process, singly or in batches.
+
+    ulid.new() draws 80 fresh random bits for every ULID, so ULIDs made in the same millisecond sort in
+    random order. Here the first ULID of a millisecond gets fresh random bits and each later one is the
+    previous plus one (the ULID spec's monotonic mode), carrying into the timestamp in the unlikely
+    event the random bits overflow. The leading ten characters are still the creation time, so ids
+    sort by time as cursor pagination and ordering by created_at expect, and by creation order within
+    a millisecond. If the clock steps back, ids keep counting on from the last one.
+    """
+
+    def __init__(self, clock=time.time_ns):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last = 0
+        if hasattr(os, 'register_at_fork'):
+            # A forked worker must not count on from the parent's last ULID alongside its siblings.
+            os.register_at_fork(after_in_child=self._forget)
+
+    def _forget(self):
+        self._lock = threading.Lock()
+        self._last = 0
+
+    def _reserve(self, count):
+        """Reserve `count` consecutive ULIDs and return the first, as an int."""
+        timestamp = self._clock() // 1_000_000
+        with self._lock:
+            if timestamp > self._last >> 80:
+                first = timestamp << 80 | int.from_bytes(os.urandom(10), 'big')
+            else:
+                first = self._last + 1
+            self._last = first + count - 1
+        return first
+
+    def new(self):
+        return ulid_from_int(self._reserve(1))
+
+    def generate_many(self, count):
+        """
+        Return `count` consecutive ULID strings, in order, for callers assigning ids to a batch of rows.
+
+        One clock read, one lock and one random draw for the whole batch. The ULIDs of a batch differ
+        only in their low bits, so the first 24 characters are encoded once per 1024 ULIDs and each
+        ULID only appends its last two.
+        """
+        if count <= 0:
+            return []
+        number = self._reserve(count)
+        stop = number + count
+        ulids = []
+        while number < stop:
+            block_stop = min(stop, (number | 1023) + 1)
+            prefix = ulid_from_int(number)[:24]
+            ulids.extend([prefix + pair for pair in _CHARACTER_PAIRS[number & 1023:((block_stop - 1) & 1023) + 1]])
+            number = block_stop
+        return ulids
+
+
+ulid_generator = ULIDGenerator()
+
+
+class ULIDField(models.CharField):
+    """
+    A ULID primary or foreign key stored in 16 bytes: a native uuid column where the database has one
+    (PostgreSQL), a 16-byte binary column elsewhere, instead of a 26-character varchar.
+
+    Python values are still the 26-character ULID strings, so serializers, filters, URLs such as
+    admin/loans/<str:id>/update/, token claims and cache keys see the same ids as before. Lookups with
+    a string that isn't a ULID raise ValidationError, as UUIDField's do.
+    """
+    description = _("ULID")
+    default_error_messages = {
+        'invalid': _('“%(value)s” is not a valid ULID.'),
+    }
+
+    def __init__(self, *args, **kwargs):
+        kwargs['max_length'] = 26
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        del kwargs['max_length']
+        return name, path, args, kwargs
+
+    def get_internal_type(self):
+        return 'ULIDField'
+
+    def db_type(self, connection):
+        if connection.features.has_native_uuid_field:
+            return 'uuid'
+        return {'mysql': 'binary(16)', 'oracle': 'RAW(16)'}.get(connection.vendor, 'blob')
+
+    def cast_db_type(self, connection):
+        return self.db_type(connection)
+
+    def to_python(self, value):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            if is_ulid(value):
+                return value.upper()
+        elif isinstance(value, uuid.UUID):
+            return ulid_from_bytes(value.bytes)
+        elif isinstance(value, ulid.ULID):
+            return value.str
+        elif isinstance(value, (bytes, memoryview)) and len(value) == 16:
+            return ulid_from_bytes(value)
+        raise exceptions.ValidationError(self.error_messages['invalid'], code='invalid', params={'value': value})
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if not prepared:
+            value = self.get_prep_value(value)
+        if value is None:
+            return None
+        if not is_ulid(value):
+            value = self.to_python(value)
+        data = ulid_to_bytes(value)
+        return uuid.UUID(bytes=data) if connection.features.has_native_uuid_field else data
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return ulid_from_bytes(value.bytes)
+        if isinstance(value, str):  # A key 0009_convert_ids hasn't reached yet, or uuid text through a cast.
+            return value if is_ulid(value) else ulid_from_bytes(uuid.UUID(value).bytes)
+        return ulid_from_bytes(value)
+
+
+def convert_ulid_keys(schema_editor, tables, forward=True, batch_size=None):
+    """
+    Rewrite the 26-character ULID keys of `tables`, and every column referencing them, in the form
+    ULIDField stores them (or back, with forward=False), in batches of one short transaction each.
+
+    For the step of a migration between widening the keys to varchar(36) and altering them to
+    ULIDField: the columns are still text, so the new values are uuid text on PostgreSQL (which the
+    final `USING id::uuid` cast reads) and 16-byte blobs elsewhere. The referencing columns (foreign
+    keys of any app, many-to-many tables) are found by introspecting the database. Only unconverted keys
+    are touched, so an interrupted run can be repeated. Run it with the application stopped.
+    """
+    connection = schema_editor.connection
+    field = ULIDField()
+    qn = schema_editor.quote_name
+    native = connection.features.has_native_uuid_field
+    batch_size = batch_size or (connection.features.max_query_params or 3000) // 3  # 3 parameters per key.
+
+    def stored(value):
+        value = field.get_db_prep_value(value, connection)
+        return str(value) if native else value
+
+    def loaded(value):
+        return field.from_db_value(value, None, connection)
+
+    with connection.cursor() as cursor:
+        references = defaultdict(list)
+        for table in connection.introspection.table_names(cursor):
+            for column, (_column, referenced) in connection.introspection.get_relations(cursor, table).items():
+                if referenced in tables:
+                    references[referenced].append((table, column))
+
+        for table in tables:
+            columns = [(table, 'id'), *references[table]]
+            last = ''
+            while True:
+                with transaction.atomic(using=connection.alias):
+                    cursor.execute(
+                        f'SELECT id FROM {qn(table)} WHERE LENGTH(id) {"=" if forward else "<>"} 26 AND id > %s '
+                        f'ORDER BY id LIMIT %s',
+                        [last, batch_size],
+                    )
+                    keys = [row[0] for row in cursor.fetchall()]
+                    if not keys:
+                        break
+                    new_keys = [stored(key) if forward else loaded(key) for key in keys]
+                    for referencing, column in columns:
+                        params = [value for pair in zip(keys, new_keys) for value in pair]
+                        cursor.execute(
+                            f'UPDATE {qn(referencing)} SET {qn(column)} = CASE {qn(column)} '
+                            f'{" ".join(["WHEN %s THEN %s"] * len(keys))} END '
+                            f'WHERE {qn(column)} IN ({", ".join(["%s"] * len(keys))})',
+                            params + keys,
+                        )
+                last = keys[-1]
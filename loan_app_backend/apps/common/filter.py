@@ -9,17 +9,21 @@ class GenericFilterSet(filters.FilterSet):
         model: The Django model to filter.
         fields: List of field names to include in the filter set.
         text_search_fields: List of CharField/EmailField names for text search (icontains).
+        exact_fields: List of field names for exact-match filters (index friendly).
         date_fields: List of DateTimeField names for exact and range filters.
         boolean_fields: List of BooleanField names for exact filters.
+
+    Each option can also be set as a class attribute on a subclass.
     """
     
-    def __init__(self, *args, model=None, fields=None, text_search_fields=None, 
+    def __init__(self, *args, model=None, fields=None, text_search_fields=None, exact_fields=None,
                  date_fields=None, boolean_fields=None, **kwargs):
         self.model = model or self.Meta.model
         self.fields = fields or []
-        self.text_search_fields = text_search_fields or []
-        self.date_fields = date_fields or []
-        self.boolean_fields = boolean_fields or []
+        self.text_search_fields = text_search_fields or getattr(self, 'text_search_fields', None) or []
+        self.exact_fields = exact_fields or getattr(self, 'exact_fields', None) or []
+        self.date_fields = date_fields or getattr(self, 'date_fields', None) or []
+        self.boolean_fields = boolean_fields or getattr(self, 'boolean_fields', None) or []
 
         # Initialize parent with empty data to set up meta
         super().__init__(*args, **kwargs)
@@ -36,12 +40,19 @@ class GenericFilterSet(filters.FilterSet):
                     field_name=field_name, lookup_expr='icontains'
                 )
 
+        # Exact match filters
+        for field_name in self.exact_fields:
+            if field_name in [f.name for f in self.model._meta.get_fields()]:
+                self.filters[field_name] = filters.CharFilter(
+                    field_name=field_name, lookup_expr='exact'
+                )
+
         # Date filters (exact and range)
         for field_name in self.date_fields:
             if field_name in [f.name for f in self.model._meta.get_fields()]:
-                # Exact date filter
+                # Exact date filter (compares the date part of the datetime)
                 self.filters[field_name] = filters.DateFilter(
-                    field_name=field_name, lookup_expr='exact'
+                    field_name=field_name, lookup_expr='date'
                 )
                 # Date range filter
                 self.filters[f'{field_name}__range'] = filters.DateFromToRangeFilter(
@@ -1,15 +1,93 @@
-import ulid
+from contextvars import ContextVar
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
+from loan_app_backend.apps.common.fields import ULIDField, ulid_generator
+from loan_app_backend.apps.common.signals import bulk_write
 from middlewares.user_middleware import get_current_user
 
 
+_UNSET = object()
+# The audit values of the bulk_update() in progress, which writes each of its batches through update().
+_bulk_update_audit = ContextVar('bulk_update_audit', default=None)
+
+
 def generate_ulid_as_string():
-    return str(ulid.new())
+    return ulid_generator.new()
+
+
+class BaseQuerySet(models.QuerySet):
+    """
+    QuerySet of every BaseModel.
+
+    Bulk writes bypass save(), so they fill in the audit fields themselves, with one get_current_user()
+    lookup per call rather than per row: bulk_create() sets created_by and updated_by as save() does on
+    insert (ids come from the field default, or from ulid_generator.generate_many() where callers assign
+    them in bulk), while update() and bulk_update() set updated_by and updated_at unless the caller passes
+    them. They also send bulk_write, since no post_save is sent either.
+    """
+
+    def update(self, **kwargs):
+        audit = _bulk_update_audit.get()
+        if audit is not None:
+            # A batch of bulk_update(): write the audit values its instances were given, and leave
+            # bulk_write to bulk_update(), which sends it once with the instances.
+            return super().update(**audit, **kwargs)
+        kwargs.setdefault('updated_at', timezone.now())
+        if 'updated_by' not in kwargs and 'updated_by_id' not in kwargs:
+            kwargs['updated_by'] = get_current_user()
+        rows = super().update(**kwargs)
+        if rows:
+            bulk_write.send(sender=self.model, objs=None)
+        return rows
+
+    def bulk_create(
+        self, objs, batch_size=None, ignore_conflicts=False, update_conflicts=False, update_fields=None,
+        unique_fields=None,
+    ):
+        objs = list(objs)
+        user = _UNSET
+        for obj in objs:
+            if obj.created_by_id is None and obj.updated_by_id is None:
+                if user is _UNSET:
+                    user = get_current_user()
+                obj.created_by = obj.updated_by = user
+            else:
+                obj.created_by_id = obj.created_by_id or obj.updated_by_id
+                obj.updated_by_id = obj.updated_by_id or obj.created_by_id
+        if update_conflicts and update_fields and 'updated_by' not in update_fields:
+            update_fields = [*update_fields, 'updated_by']  # The upsert rewrites a row: record who did.
+        objs = super().bulk_create(
+            objs, batch_size=batch_size, ignore_conflicts=ignore_conflicts, update_conflicts=update_conflicts,
+            update_fields=update_fields, unique_fields=unique_fields,
+        )
+        if objs:
+            bulk_write.send(sender=self.model, objs=objs)
+        return objs
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        objs, fields = list(objs), list(fields)
+        audit = {}
+        if 'updated_at' not in fields:
+            audit['updated_at'] = timezone.now()
+        if 'updated_by' not in fields and 'updated_by_id' not in fields:
+            audit['updated_by'] = get_current_user()
+        for obj in objs:
+            for name, value in audit.items():
+                setattr(obj, name, value)
+
+        token = _bulk_update_audit.set(audit)
+        try:
+            rows = super().bulk_update(objs, fields, batch_size=batch_size)
+        finally:
+            _bulk_update_audit.reset(token)
+        if rows:
+            bulk_write.send(sender=self.model, objs=objs)
+        return rows
 
 
 class BaseModel(models.Model):
-    id = models.CharField(primary_key=True, default=generate_ulid_as_string, editable=False, max_length=26)
+    id = ULIDField(primary_key=True, default=generate_ulid_as_string, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(
@@ -27,12 +105,24 @@ class BaseModel(models.Model):
         blank=True,
     )
 
+    objects = BaseQuerySet.as_manager()
+
     class Meta:
         abstract = True
 
     def save(self, *args, **kwargs):
-        user = get_current_user()
-        if not self.pk:
-            self.created_by = user
-        self.updated_by = user
+        """
+        Attribute the write to get_current_user(): created_by and updated_by on insert, updated_by after.
+
+        The lookup is skipped when a new instance already carries created_by or updated_by (e.g. set by an
+        import acting for someone), and when update_fields leaves updated_by out, since it isn't written.
+        """
+        if self._state.adding:  # Not `not self.pk`: the ULID default gives new instances a pk already.
+            if self.created_by_id is None and self.updated_by_id is None:
+                self.created_by = self.updated_by = get_current_user()
+            else:
+                self.created_by_id = self.created_by_id or self.updated_by_id
+                self.updated_by_id = self.updated_by_id or self.created_by_id
+        elif kwargs.get('update_fields') is None or 'updated_by' in kwargs['update_fields']:
+            self.updated_by = get_current_user()
         super().save(*args, **kwargs)
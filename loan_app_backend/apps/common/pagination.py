@@ -1,30 +1,119 @@
+import base64
+import binascii
+from functools import partial
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
-from django.http import JsonResponse
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from loan_app_backend.apps.common.caching import get_versions, response_caching_enabled
+from loan_app_backend.apps.common.responses import EnvelopeResponse
+from loan_app_backend.apps.common.counting import CountingPaginator
+from loan_app_backend.apps.common.fields import is_ulid
 
 
 class GenericPagination(PageNumberPagination):
+    django_paginator_class = CountingPaginator  # Exact, cached or estimated counts (see counting.py)
     page_size = 10  # Default number of items per page
     page_size_query_param = 'page_size'  # Query parameter to control page size
     max_page_size = 100  # Maximum allowed page size to prevent large responses
+    cursor_query_param = 'cursor'  # Opaque keyset position returned in next/previous links
+    pagination_mode_query_param = 'pagination'  # ?pagination=cursor opts into keyset mode on the first page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Paginate by page number, or by keyset when the client opts in with `?pagination=cursor`.
+
+        Keyset pages are ordered by the primary key, newest first. BaseModel ids are ULIDs, so that is
+        creation order, and every page costs one indexed range query without COUNT(*) or OFFSET.
+        """
+        self.cursor_mode = (
+            self.cursor_query_param in request.query_params
+            or request.query_params.get(self.pagination_mode_query_param) == 'cursor'
+        )
+        if not self.cursor_mode:
+            if hasattr(view, 'get_cache_scopes') and response_caching_enabled():
+                # Cached counts follow the same versions as the view's cached responses (see caching.py).
+                versions = get_versions(view.get_cache_scopes())
+                self.django_paginator_class = partial(CountingPaginator, count_versions=versions)
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        direction, position = self.decode_cursor(request.query_params.get(self.cursor_query_param))
+        pk_name = queryset.model._meta.pk.name
+
+        if direction == 'previous':
+            rows = list(queryset.filter(**{f'{pk_name}__gt': position}).order_by(pk_name)[:page_size + 1])
+            self.has_previous = len(rows) > page_size
+            rows = rows[:page_size][::-1]
+            self.has_next = True
+        else:
+            queryset = queryset.order_by(f'-{pk_name}')
+            if position is not None:
+                queryset = queryset.filter(**{f'{pk_name}__lt': position})
+            rows = list(queryset[:page_size + 1])
+            self.has_next = len(rows) > page_size
+            rows = rows[:page_size]
+            self.has_previous = position is not None
+
+        self.first_key = rows[0].pk if rows else position
+        self.last_key = rows[-1].pk if rows else position
+        return rows
+
+    def decode_cursor(self, encoded):
+        """Return (direction, primary key) from a cursor; a missing cursor means the first page."""
+        if not encoded:
+            return 'next', None
+        try:
+            direction, _, position = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8').partition(':')
+        except (binascii.Error, UnicodeError, ValueError):
+            raise NotFound("Invalid cursor.")
+        if direction not in ('next', 'previous') or not is_ulid(position):  # Else the pk filter raises a 500.
+            raise NotFound("Invalid cursor.")
+        return direction, position
+
+    def encode_cursor(self, direction, position):
+        cursor = base64.urlsafe_b64encode(f'{direction}:{position}'.encode('utf-8')).decode('ascii')
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if not self.has_next or self.last_key is None:
+            return None
+        return self.encode_cursor('next', self.last_key)
+
+    def get_previous_link(self):
+        if not self.cursor_mode:
+            return super().get_previous_link()
+        if not self.has_previous or self.first_key is None:
+            return None
+        return self.encode_cursor('previous', self.first_key)
 
     def get_paginated_response(self, data):
         """
         Returns a paginated response in the format: {"message": str, "data": dict}.
-        
+
+        Page-number pages report "count_is_approximate" alongside "count"; keyset pages carry no
+        "count", since computing it is exactly the cost they avoid.
+
         Args:
             data: The serialized data for the current page.
-        
+
         Returns:
-            JsonResponse: A response containing pagination metadata and results.
+            EnvelopeResponse: A response containing pagination metadata and results.
         """
         # Use a default or provided message for the paginated response
         message = getattr(self, 'custom_message', "Data retrieved successfully.")
-        return JsonResponse({
-            "message": message,
-            "data": {
+        payload = {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data
+        }
+        if not self.cursor_mode:
+            payload = {
                 "count": self.page.paginator.count,
-                "next": self.get_next_link(),
-                "previous": self.get_previous_link(),
-                "results": data
+                "count_is_approximate": self.page.paginator.count_is_approximate,
+                **payload
             }
-        }, status=200)
+        return EnvelopeResponse(message, payload, status=200)
@@ -0,0 +1,60 @@
+import json
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+_encoder = DjangoJSONEncoder()
+
+
+def json_backend():
+    """
+    Return the JSON backend in use: "orjson" or "stdlib".
+
+    settings.JSON_BACKEND may force either one; the default "auto" uses orjson when it is installed.
+    """
+    backend = getattr(settings, 'JSON_BACKEND', 'auto')
+    if backend == 'stdlib' or orjson is None:
+        return 'stdlib'
+    return 'orjson'
+
+
+def dumps(data):
+    """
+    Encode `data` to JSON bytes.
+
+    The output is the same on both backends: decimals are encoded as strings, and datetimes, dates and
+    times as DjangoJSONEncoder writes them (ISO 8601, milliseconds, a "Z" suffix for UTC). orjson
+    handles UUIDs and dict/list/str subclasses natively; everything else, datetimes included (orjson's
+    own keep microseconds), goes through DjangoJSONEncoder.default.
+    """
+    if json_backend() == 'orjson':
+        return orjson.dumps(data, default=_encoder.default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(data, cls=DjangoJSONEncoder).encode('utf-8')
+
+
+def loads(data):
+    """Decode JSON bytes or str. Invalid input raises json.JSONDecodeError on both backends."""
+    if json_backend() == 'orjson':
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    DRF JSON renderer backed by dumps(), so DRF responses and errors use the same encoder as EnvelopeResponse.
+
+    Requests for indented output (e.g. the browsable API) fall back to DRF's own renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
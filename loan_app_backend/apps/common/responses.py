@@ -0,0 +1,56 @@
+from django.http import HttpResponse
+from loan_app_backend.apps.common.renderers import dumps
+
+
+class EnvelopeResponse(HttpResponse):
+    """
+    A JSON response in the API's {"message": str, "data": ...} shape whose body is encoded lazily.
+
+    The payload stays a Python object until the content is first read, so APIResponseMiddleware can
+    rewrap it into the response_status/response_description/response_data envelope and the JSON is
+    produced exactly once, instead of being encoded, parsed and encoded again.
+
+    Args:
+        message: Human readable description of the result.
+        data: JSON serializable payload. Defaults to an empty dict.
+        status: HTTP status code.
+    """
+
+    def __init__(self, message, data=None, status=200, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(status=status, **kwargs)
+        self.payload = {"message": message, "data": {} if data is None else data}
+        self.is_encoded = False
+
+    def wrap(self):
+        """Replace the payload with the API envelope used by every JSON response and return the response."""
+        if self.is_encoded or "response_status" in self.payload:
+            return self
+        self.payload = {
+            "response_status": "success" if self.status_code <= 399 else "error",
+            "response_description": self.payload["message"],
+            "response_data": self.payload["data"],
+        }
+        return self
+
+    def encode(self):
+        if not self.is_encoded:
+            self.content = dumps(self.payload)
+
+    @property
+    def content(self):
+        self.encode()
+        return HttpResponse.content.fget(self)
+
+    @content.setter
+    def content(self, value):
+        HttpResponse.content.fset(self, value)
+        self.is_encoded = True
+
+    def __iter__(self):
+        self.encode()
+        return super().__iter__()
+
+    def getvalue(self):
+        self.encode()
+        return super().getvalue()
@@ -0,0 +1,7 @@
+from django.dispatch import Signal
+
+
+# Sent by BaseQuerySet after bulk writes, which Django sends no post_save for.
+# Arguments: sender (the model class) and objs, the written instances, or None for QuerySet.update(),
+# whose rows are not known without another query.
+bulk_write = Signal()
@@ -0,0 +1,81 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryPlanAssertionsMixin:
+    """
+    Test helpers that EXPLAIN the SQL an endpoint actually runs.
+
+    Supports SQLite (EXPLAIN QUERY PLAN) and PostgreSQL (EXPLAIN with sequential scans disabled,
+    so a missing index still shows up as a Seq Scan instead of being hidden by a tiny test table).
+    """
+
+    def capture_queries(self, func, *args, **kwargs):
+        """Run `func` and return its result together with the SQL statements it executed."""
+        with CaptureQueriesContext(connection) as context:
+            result = func(*args, **kwargs)
+        return result, [query['sql'] for query in context.captured_queries]
+
+    def find_query(self, queries, table, contains='ORDER BY'):
+        """Return the first captured SELECT on `table` that contains `contains`."""
+        for sql in queries:
+            if sql.startswith('SELECT') and f'"{table}"' in sql and contains in sql:
+                return sql
+        self.fail(f"No SELECT on {table} containing {contains!r} was executed:\n" + "\n".join(queries))
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def explain(self, sql):
+        """Return the query plan of `sql` as a list of lines."""
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                return [row[-1] for row in cursor.fetchall()]
+            if connection.vendor == 'postgresql':
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute(f'EXPLAIN {sql}')
+                return [row[0] for row in cursor.fetchall()]
+        self.skipTest(f"Query plan assertions are not implemented for {connection.vendor}.")
+
+    def assertUsesIndex(self, sql, table):
+        """Fail if `table` is read with a full scan or the result needs a separate sort."""
+        plan = self.explain(sql)
+        rendered = "\n".join(plan)
+        for line in plan:
+            if connection.vendor == 'sqlite':
+                if line.startswith(f'SCAN {table}') and 'USING' not in line:
+                    self.fail(f"Full table scan of {table}:\n{rendered}\n\n{sql}")
+                if 'USE TEMP B-TREE FOR ORDER BY' in line:
+                    self.fail(f"Ordering is not served by an index:\n{rendered}\n\n{sql}")
+            else:
+                if f'Seq Scan on {table}' in line:
+                    self.fail(f"Sequential scan of {table}:\n{rendered}\n\n{sql}")
+                if 'Sort  (' in line:
+                    self.fail(f"Ordering is not served by an index:\n{rendered}\n\n{sql}")
+
+
+class QueryBudgetMixin:
+    """
+    Test helpers that pin the number of queries a list endpoint may run.
+
+    The budget must hold for every page size, so a serializer that lazily loads a relation per row
+    (an N+1) fails the assertion instead of slowly getting worse as pages grow. Budgets are measured
+    with a cold cache.
+    """
+    page_sizes = (1, 25)
+
+    def assertQueryBudget(self, budget, url, params=None, page_sizes=None):
+        for page_size in page_sizes or self.page_sizes:
+            cache.clear()
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url, {**(params or {}), 'page_size': page_size})
+            self.assertEqual(response.status_code, 200, response.content)
+            self.assertEqual(len(response.json()['response_data']['results']), page_size)
+            self.assertEqual(
+                len(context.captured_queries), budget,
+                f"{url} with page_size={page_size} ran {len(context.captured_queries)} queries, "
+                f"budget is {budget}:\n" + "\n".join(query['sql'] for query in context.captured_queries)
+            )
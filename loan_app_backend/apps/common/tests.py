@@ -1,3 +1,328 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import json
+from decimal import Decimal
+from unittest import mock
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.http import JsonResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from loan_app_backend.apps.common.counting import CountingPaginator, count_queryset
+from loan_app_backend.apps.common.fields import ULIDGenerator, ulid_from_bytes, ulid_to_bytes
+from loan_app_backend.apps.common.renderers import FastJSONRenderer, dumps, json_backend, loads
+from loan_app_backend.apps.common.responses import EnvelopeResponse
+from loan_app_backend.apps.common.signals import bulk_write
+from loan_app_backend.apps.common.throttling import SlidingWindowRateLimiter
+from loan_app_backend.apps.loanapp.models import Users
+from middlewares.response_middleware import APIResponseMiddleware
+from middlewares.user_middleware import CurrentUserMiddleware, acting_as, get_current_user, handling_request
 
-# Create your tests here.
+
+class CountStrategyTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Users.objects.bulk_create([
+            Users(username=f'count_{i}', email=f'count_{i}@count.test', email_domain='count.test', password='!')
+            for i in range(5)
+        ])
+
+    def setUp(self):
+        cache.clear()
+
+    def test_small_counts_are_exact_and_not_cached(self):
+        queryset = Users.objects.order_by('pk')
+        self.assertEqual(count_queryset(queryset), (5, False))
+        with self.assertNumQueries(1):
+            count_queryset(queryset)
+
+    @override_settings(PAGINATION_COUNT={'CACHE_THRESHOLD': 1, 'CACHE_TIMEOUT': 60})
+    def test_large_counts_are_cached_per_filter_set(self):
+        self.assertEqual(count_queryset(Users.objects.filter(email_domain='count.test')), (5, False))
+        with self.assertNumQueries(0):  # Possibly CACHE_TIMEOUT old.
+            self.assertEqual(count_queryset(Users.objects.filter(email_domain='count.test')), (5, True))
+        with self.assertNumQueries(1):
+            self.assertEqual(count_queryset(Users.objects.filter(email_domain='other.test')), (0, False))
+
+    @override_settings(PAGINATION_COUNT={'CACHE_THRESHOLD': 1, 'CACHE_TIMEOUT': 60})
+    def test_versioned_counts_stay_exact_until_the_data_changes(self):
+        queryset = Users.objects.filter(email_domain='count.test')
+        self.assertEqual(count_queryset(queryset, versions=[1]), (5, False))
+        with self.assertNumQueries(0):
+            self.assertEqual(count_queryset(queryset, versions=[1]), (5, False))
+        Users.objects.filter(username='count_0').delete()
+        with self.assertNumQueries(1):  # A bumped version is a new key.
+            self.assertEqual(count_queryset(queryset, versions=[2]), (4, False))
+
+    @override_settings(PAGINATION_COUNT={'ESTIMATE_THRESHOLD': 1})
+    def test_approximate_count_does_not_truncate_pages(self):
+        with mock.patch('loan_app_backend.apps.common.counting.estimate_count', return_value=3):
+            paginator = CountingPaginator(Users.objects.order_by('pk'), 2)
+            self.assertEqual(paginator.count, 3)
+            self.assertTrue(paginator.count_is_approximate)
+            self.assertEqual(len(paginator.page(2).object_list), 2)
+            self.assertEqual(len(paginator.page(3).object_list), 1)
+
+    @override_settings(PAGINATION_COUNT={'ESTIMATE_THRESHOLD': 1})
+    def test_postgresql_estimates_unfiltered_tables(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest("Row estimates are only read from PostgreSQL.")
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE loanapp_users')
+        self.assertTrue(count_queryset(Users.objects.all()).approximate)
+        self.assertFalse(count_queryset(Users.objects.filter(is_active=True)).approximate)
+
+
+class ResponseEnvelopeTest(TestCase):
+    def get_response(self, response):
+        return APIResponseMiddleware(lambda request: response)(RequestFactory().get('/'))
+
+    def test_envelope_is_wrapped_before_encoding(self):
+        with mock.patch('loan_app_backend.apps.common.responses.dumps', wraps=dumps) as encode:
+            response = self.get_response(EnvelopeResponse("Done.", {"amount": Decimal('10.50')}, status=201))
+            self.assertEqual(json.loads(response.content), {
+                "response_status": "success",
+                "response_description": "Done.",
+                "response_data": {"amount": "10.50"},
+            })
+            self.assertEqual(b"".join(response), response.content)
+        self.assertEqual(encode.call_count, 1)
+
+    def test_error_envelope(self):
+        response = self.get_response(EnvelopeResponse("Validation failed.", {"email": ["Required."]}, status=400))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(json.loads(response.content)['response_status'], "error")
+        self.assertEqual(json.loads(response.content)['response_data'], {"email": ["Required."]})
+
+    def test_plain_json_response_is_still_wrapped(self):
+        response = self.get_response(JsonResponse({"message": "Legacy.", "data": [1]}))
+        self.assertEqual(json.loads(response.content), {
+            "response_status": "success",
+            "response_description": "Legacy.",
+            "response_data": [1],
+        })
+
+
+class JSONBackendTest(TestCase):
+    payload = {
+        "amount_requested": Decimal('2500000.50'),
+        "access_token_expiration": datetime.datetime(2025, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc),
+        "purpose": "Café équipement",
+        "created_at": datetime.datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+        "naive": datetime.datetime(2025, 1, 2, 3, 4, 5, 678901),  # e.g. from .values() with USE_TZ off.
+        "time": datetime.time(3, 4, 5, 678901),
+    }
+    expected = {
+        "amount_requested": "2500000.50",
+        "access_token_expiration": "2025-01-02T03:04:05Z",
+        "purpose": "Café équipement",
+        "created_at": "2025-01-02T03:04:05.678Z",
+        "naive": "2025-01-02T03:04:05.678",
+        "time": "03:04:05.678",
+    }
+
+    def test_backends_encode_the_same_values(self):
+        for backend in ('auto', 'stdlib'):
+            with self.subTest(backend=backend), self.settings(JSON_BACKEND=backend):
+                self.assertEqual(json.loads(dumps(self.payload)), self.expected)
+                self.assertEqual(loads(dumps(self.payload)), self.expected)
+
+    def test_stdlib_fallback_without_orjson(self):
+        with mock.patch('loan_app_backend.apps.common.renderers.orjson', None):
+            self.assertEqual(json_backend(), 'stdlib')
+            self.assertEqual(json.loads(dumps(self.payload)), self.expected)
+            with self.assertRaises(json.JSONDecodeError):
+                loads(b'{')
+
+    def test_drf_renderer(self):
+        self.assertEqual(json.loads(FastJSONRenderer().render(self.payload)), self.expected)
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+
+class SlidingWindowRateLimiterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_limit_slides_over_the_window_boundary(self):
+        limiter = SlidingWindowRateLimiter(limit=3, window=60)
+        self.assertEqual([limiter.hit('k', now=600 + i).allowed for i in range(4)], [True, True, True, False])
+        self.assertEqual(limiter.hit('k', now=610).retry_after, 50)
+        self.assertTrue(limiter.hit('other', now=610).allowed)
+
+        # Half of the previous window (5 hits) still counts: 2.5 + 1 > 3 until the share decays.
+        self.assertFalse(limiter.hit('k', now=690).allowed)
+        self.assertTrue(limiter.hit('k', now=715).allowed)
+
+    def test_only_the_previous_window_counts(self):
+        limiter = SlidingWindowRateLimiter(limit=1, window=60)
+        self.assertTrue(limiter.hit('k', now=600).allowed)
+        self.assertFalse(limiter.hit('k', now=610).allowed)
+        self.assertTrue(limiter.hit('k', now=730).allowed)
+
+
+class CurrentUserTest(TestCase):
+    async def test_concurrent_requests_see_their_own_user(self):
+        users = [Users(username='first'), Users(username='second')]
+        both_started = asyncio.Barrier(len(users))
+
+        async def view(request):
+            await both_started.wait()  # Both requests are in flight on the same thread here.
+            return get_current_user()
+
+        middleware = CurrentUserMiddleware(view)
+        requests = []
+        for user in users:
+            request = RequestFactory().get('/')
+            request.user = user
+            requests.append(request)
+
+        self.assertEqual(await asyncio.gather(*(middleware(request) for request in requests)), users)
+        self.assertIsNone(get_current_user())
+
+    def test_acting_as_takes_precedence_and_restores_on_exit(self):
+        request_user, worker = Users(username='request'), Users(username='worker')
+        request = RequestFactory().get('/')
+        request.user = request_user
+        with handling_request(request):
+            with acting_as(worker):
+                self.assertIs(get_current_user(), worker)
+                with acting_as(None):
+                    self.assertIsNone(get_current_user())
+                self.assertIs(get_current_user(), worker)
+            self.assertIs(get_current_user(), request_user)
+        self.assertIsNone(get_current_user())
+
+    async def test_acting_as_follows_tasks_and_sync_to_async(self):
+        worker = Users(username='worker')
+        with acting_as(worker):
+            seen = await asyncio.gather(
+                sync_to_async(get_current_user)(), asyncio.create_task(self.current_user_later())
+            )
+        self.assertEqual(seen, [worker, worker])
+        self.assertIsNone(await sync_to_async(get_current_user)())
+
+    async def current_user_later(self):
+        await asyncio.sleep(0)
+        return get_current_user()
+
+
+class ULIDFieldTest(TestCase):
+    def test_keys_are_stored_in_16_bytes_and_read_as_strings(self):
+        admin = Users.objects.create_user(username='admin', email='admin@example.com', password='!')
+        with acting_as(admin):
+            user = Users.objects.create_user(username='ada', email='ada@example.com', password='!')
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT id, created_by_id FROM loanapp_users WHERE username = %s', ['ada'])
+            stored = cursor.fetchone()
+        if connection.vendor == 'sqlite':
+            self.assertEqual([len(value) for value in stored], [16, 16])
+            self.assertEqual([ulid_from_bytes(value) for value in stored], [user.pk, admin.pk])
+
+        user = Users.objects.select_related('created_by').get(pk=user.pk.lower())
+        self.assertEqual((len(user.pk), user.created_by.pk), (26, admin.pk))
+        self.assertEqual(list(Users.objects.order_by('pk')), sorted([admin, user], key=lambda user: user.pk))
+        with self.assertRaises(ValidationError):
+            Users.objects.filter(pk='not-a-ulid').exists()
+
+
+class ULIDGeneratorTest(TestCase):
+    def setUp(self):
+        self.now = 1_700_000_000_000 * 1_000_000  # Nanoseconds, as time.time_ns() returns.
+        self.generator = ULIDGenerator(clock=lambda: self.now)
+
+    def number(self, value):
+        return int.from_bytes(ulid_to_bytes(value), 'big')
+
+    def test_ulids_of_a_millisecond_count_up(self):
+        first, second = self.generator.new(), self.generator.new()
+        batch = self.generator.generate_many(3000)  # Crosses 1024-ULID blocks.
+        self.assertEqual(
+            [self.number(value) - self.number(first) for value in [second, *batch]], list(range(1, 3002))
+        )
+        self.assertEqual(self.number(first) >> 80, 1_700_000_000_000)
+        self.assertEqual(self.generator.generate_many(0), [])
+
+    def test_ulids_sort_by_time(self):
+        earlier = self.generator.generate_many(5)
+        self.now += 1_000_000
+        later = self.generator.new()
+        self.assertEqual(self.number(later) >> 80, 1_700_000_000_001)
+        self.now -= 5_000_000  # The clock steps back: keep counting up.
+        values = [*earlier, later, self.generator.new()]
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(len(set(values)), 7)
+
+
+class AuditFieldsTest(TestCase):
+    def setUp(self):
+        self.admin = Users.objects.create_user(username='admin', email='admin@example.com', password='!')
+
+    def test_insert_sets_created_by_and_updated_by(self):
+        with acting_as(self.admin):
+            user = Users.objects.create_user(username='new', email='new@example.com', password='!')
+        self.assertEqual((user.created_by_id, user.updated_by_id), (self.admin.pk, self.admin.pk))
+
+        other = Users.objects.create_user(username='other', email='other@example.com', password='!')
+        with acting_as(other):
+            user.first_name = 'Ada'
+            user.save()
+        user.refresh_from_db()
+        self.assertEqual((user.created_by_id, user.updated_by_id), (self.admin.pk, other.pk))
+
+    def test_explicit_audit_fields_skip_the_lookup(self):
+        with mock.patch('loan_app_backend.apps.common.models.get_current_user') as lookup:
+            user = Users(username='new', email='new@example.com', created_by=self.admin)
+            user.save()
+            user.save(update_fields=['first_name'])
+        lookup.assert_not_called()
+        self.assertEqual((user.created_by_id, user.updated_by_id), (self.admin.pk, self.admin.pk))
+
+    def test_bulk_writes_fill_in_the_audit_fields(self):
+        other = Users.objects.create_user(username='other', email='other@example.com', password='!')
+        with acting_as(self.admin):
+            created = Users.objects.bulk_create([
+                Users(id=None, username='bulk1', email='bulk1@example.com'),
+                Users(username='bulk2', email='bulk2@example.com', updated_by=other),
+            ])
+        self.assertEqual(len(created[0].pk), 26)
+        self.assertEqual(
+            [(user.created_by_id, user.updated_by_id) for user in Users.objects.filter(username__startswith='bulk')
+             .order_by('username')],
+            [(self.admin.pk, self.admin.pk), (other.pk, other.pk)],
+        )
+
+        before = timezone.now()
+        with acting_as(other):
+            Users.objects.filter(username='bulk1').update(first_name='Ada')
+            created[1].last_name = 'Obi'
+            Users.objects.bulk_update([created[1]], ['last_name'])
+        for user in Users.objects.filter(username__startswith='bulk'):
+            self.assertEqual(user.updated_by_id, other.pk)
+            self.assertGreaterEqual(user.updated_at, before)
+
+        with acting_as(other):
+            Users.objects.filter(username='bulk1').update(updated_by=self.admin)  # Passed explicitly: kept.
+        self.assertEqual(Users.objects.get(username='bulk1').updated_by_id, self.admin.pk)
+
+    def test_bulk_update_writes_the_audit_fields_in_its_own_update(self):
+        users = Users.objects.bulk_create(
+            [Users(username=f'batch{i}', email=f'batch{i}@example.com') for i in range(3)]
+        )
+        for user in users:
+            user.last_name = 'Obi'
+        receiver = mock.Mock()
+        bulk_write.connect(receiver, sender=Users)
+        self.addCleanup(bulk_write.disconnect, receiver, sender=Users)
+
+        with acting_as(self.admin), CaptureQueriesContext(connection) as queries:
+            Users.objects.bulk_update(users, ['last_name'], batch_size=2)
+        self.assertEqual([query['sql'].split()[0] for query in queries.captured_queries], ['UPDATE', 'UPDATE'])
+        receiver.assert_called_once_with(signal=bulk_write, sender=Users, objs=users)
+        stored = Users.objects.filter(pk__in=[user.pk for user in users])
+        self.assertEqual(
+            {(user.last_name, user.updated_by_id, user.updated_at) for user in stored},
+            {('Obi', self.admin.pk, users[0].updated_at)},  # The timestamp the instances were given.
+        )
@@ -0,0 +1,80 @@
+import time
+from typing import NamedTuple
+from django.core.cache import cache as default_cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class RateLimit(NamedTuple):
+    allowed: bool
+    retry_after: float  # Seconds until a hit would be allowed again; 0 when allowed.
+
+
+class SlidingWindowRateLimiter:
+    """
+    Allow `limit` hits per `window` seconds per key, with the sliding window counter approximation.
+
+    Every key keeps one counter per fixed window; a hit is allowed while the current counter plus the
+    previous one, weighted by how much of it still overlaps the sliding window, stays within the limit.
+    Counters only ever change through cache.add() and cache.incr(), which are atomic on the Redis,
+    memcached and locmem backends, so concurrent workers sharing the cache never lose a hit.
+    Rejected hits count too, so a client that keeps retrying stays blocked.
+    """
+
+    def __init__(self, limit, window, cache=default_cache):
+        self.limit = limit
+        self.window = window
+        self.cache = cache
+
+    def increment(self, key):
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # First hit in this window; the counter outlives the next window, which reads it as "previous".
+            if self.cache.add(key, 1, timeout=int(2 * self.window) + 1):
+                return 1
+            return self.cache.incr(key)
+
+    def hit(self, key, now=None):
+        now = time.time() if now is None else now
+        index, offset = divmod(now, self.window)
+        current = self.increment(f'{key}:{int(index)}')
+        previous = self.cache.get(f'{key}:{int(index) - 1}', 0)
+
+        if previous * (1 - offset / self.window) + current <= self.limit:
+            return RateLimit(True, 0)
+        if current > self.limit or not previous:
+            retry_after = self.window - offset
+        else:
+            # Until the previous window's share has decayed enough to make room for one more hit.
+            retry_after = self.window * (1 - (self.limit - current) / previous) - offset
+        return RateLimit(False, max(retry_after, 0))
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    SimpleRateThrottle on top of SlidingWindowRateLimiter.
+
+    DRF's throttles read, trim and write back a list of timestamps per client, which is a race between
+    concurrent requests and grows with the rate; this one costs an increment and a read. Subclasses set
+    `scope` and get_cache_key() as for SimpleRateThrottle; rates come from DEFAULT_THROTTLE_RATES.
+    """
+
+    @property
+    def THROTTLE_RATES(self):
+        # Read per request rather than at import, so rates follow the current settings.
+        return api_settings.DEFAULT_THROTTLE_RATES
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.rate_limit = SlidingWindowRateLimiter(self.num_requests, self.duration, self.cache).hit(self.key)
+        return self.rate_limit.allowed
+
+    def wait(self):
+        return self.rate_limit.retry_after
@@ -1,3 +1,57 @@
-from django.shortcuts import render
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils.functional import classproperty
 
-# Create your views here.
+
+# Lets a DRF view serve `async def` handlers as a native async view under ASGI, and keep its sync
+# handlers under WSGI.
+#
+# Views define the usual sync handlers (get, post, ...) and, for the methods worth running on the event
+# loop, async ones prefixed with `a` (aget, apost, ...). Whether the view is async is decided when the
+# URLconf is built, by settings.ASYNC_VIEWS, which asgi.py turns on: under WSGI an async view would cost
+# every request an event loop of its own (async_to_sync()), so there APIView.dispatch() calls the sync
+# handlers as before. The async dispatch() mirrors APIView.dispatch() and awaits the handler instead.
+# Authentication, permission and throttle checks (which may reach the cache or the database) run in one
+# sync_to_async() call; methods without an async handler run their sync one in a worker thread.
+# (A comment, not a docstring: drf-spectacular would publish it for every view.)
+class AsyncAPIViewMixin:
+    serve_async = False  # Fixed by as_view(), so every request takes the path the view function was built for.
+
+    @classproperty
+    def view_is_async(cls):
+        return settings.ASYNC_VIEWS
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return super().as_view(serve_async=cls.view_is_async, **initkwargs)
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.serve_async:
+            return self.adispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    async def adispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            method = request.method.lower()
+            if method in self.http_method_names:
+                handler = getattr(self, f'a{method}', None) or getattr(self, method, self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
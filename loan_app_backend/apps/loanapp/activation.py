@@ -0,0 +1,81 @@
+import datetime
+import secrets
+import string
+import time
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+from loan_app_backend.apps.loanapp.models import ActivationCode
+
+
+CODE_LIFETIME = datetime.timedelta(minutes=5)
+
+# Outcomes of consume_code().
+CODE_VALID = 'valid'
+CODE_EXPIRED = 'expired'
+CODE_INVALID = 'invalid'
+
+
+def generate_code():
+    return ''.join(secrets.choice(string.digits) for _ in range(6))
+
+
+def hash_code(user_id, purpose, code):
+    """HMAC-SHA256 of a code under SECRET_KEY; bound to the user and purpose so digests cannot be reused."""
+    return salted_hmac('loanapp.ActivationCode', f'{user_id}:{purpose}:{code}', algorithm='sha256').hexdigest()
+
+
+def issue_code(user, purpose, lifetime=CODE_LIFETIME):
+    """
+    Create or replace the user's code for `purpose` with a single upsert on (user, purpose).
+
+    Returns:
+        str: The plain code, to be emailed; only its hash is stored.
+    """
+    code = generate_code()
+    ActivationCode.objects.bulk_create(
+        [ActivationCode(
+            user=user, purpose=purpose, code_hash=hash_code(user.pk, purpose, code),
+            expires_at=timezone.now() + lifetime,
+        )],
+        update_conflicts=True,
+        unique_fields=['user', 'purpose'],
+        update_fields=['code_hash', 'expires_at', 'updated_at'],
+    )
+    return code
+
+
+def consume_code(user, purpose, code):
+    """
+    Check a submitted code and delete it when it matches, so every code works once.
+
+    A valid code costs one DELETE; a wrong or expired one a second.
+
+    Returns:
+        str: CODE_VALID, CODE_EXPIRED or CODE_INVALID.
+    """
+    codes = ActivationCode.objects.filter(user=user, purpose=purpose, code_hash=hash_code(user.pk, purpose, code))
+    if codes.filter(expires_at__gt=timezone.now()).delete()[0]:
+        return CODE_VALID
+    # An expired code that matches is dropped too; the user has to request a new one either way.
+    return CODE_EXPIRED if codes.delete()[0] else CODE_INVALID
+
+
+def sweep_expired_codes(batch_size=1000, pause=0):
+    """
+    Delete expired codes in batches of at most `batch_size` rows.
+
+    Each batch is one short DELETE found through the expires_at index, so the sweep never holds long locks.
+
+    Returns:
+        int: Number of codes deleted.
+    """
+    now = timezone.now()
+    deleted = 0
+    while True:
+        ids = list(ActivationCode.objects.filter(expires_at__lte=now).values_list('pk', flat=True)[:batch_size])
+        if ids:
+            deleted += ActivationCode.objects.filter(pk__in=ids).delete()[0]
+        if len(ids) < batch_size:
+            return deleted
+        if pause:
+            time.sleep(pause)
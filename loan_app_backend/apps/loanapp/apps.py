@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class LoanappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'loan_app_backend.apps.loanapp'
+
+    def ready(self):
+        from loan_app_backend.apps.loanapp import signals  # noqa: F401
+        from loan_app_backend.apps.loanapp.emails import TemplatedEmail
+
+        TemplatedEmail.warm_up()
@@ -0,0 +1,221 @@
+import threading
+import time
+from cachetools import LRUCache, TTLCache
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, router, transaction
+from django.db.models import DEFERRED
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+from loan_app_backend.apps.loanapp.models import Users
+
+
+# User fields copied into every token, enough for IsAuthenticated/IsAdminUser and role checks.
+USER_CLAIMS = ('role', 'is_active', 'is_staff', 'is_superuser')
+
+DEFAULT_AUTH_CLAIMS_SETTINGS = {
+    'LOCAL_MAXSIZE': 10_000,  # Users whose snapshot lookup is remembered per process.
+    'LOCAL_TTL': 5,  # Seconds a process may serve a remembered lookup before asking the shared cache again.
+    'BLACKLIST_LOCAL_MAXSIZE': 10_000,  # Blacklisted refresh tokens remembered per process.
+}
+
+
+def auth_claims_settings():
+    return {**DEFAULT_AUTH_CLAIMS_SETTINGS, **getattr(settings, 'AUTH_CLAIMS_CACHE', {})}
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """A refresh token (and the access tokens it mints) carrying the USER_CLAIMS of its user."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+_local_snapshots = TTLCache(
+    maxsize=auth_claims_settings()['LOCAL_MAXSIZE'], ttl=auth_claims_settings()['LOCAL_TTL']
+)
+_local_lock = threading.Lock()
+
+
+def snapshot_key(user_id):
+    return f'auth-user-claims:{user_id}'
+
+
+def get_user_snapshot(user_id):
+    """
+    Return the current claim values of a user, or {"deleted": True} if the user no longer exists.
+
+    Looks in the process-local cache first, then in the shared cache, and loads the user's claim
+    columns on a miss there: a snapshot the shared cache evicted, or one it never had, must not let a
+    token's stale claims through. The loaded values go in with add() so they never overwrite a
+    snapshot published while the query ran.
+    """
+    with _local_lock:
+        if user_id in _local_snapshots:
+            return _local_snapshots[user_id]
+    snapshot = cache.get(snapshot_key(user_id))
+    if snapshot is None:
+        snapshot = Users.objects.filter(pk=user_id).values(*USER_CLAIMS).first() or {'deleted': True}
+        cache.add(snapshot_key(user_id), snapshot, snapshot_timeout())
+    with _local_lock:
+        _local_snapshots[user_id] = snapshot
+    return snapshot
+
+
+def snapshot_timeout():
+    # A refresh keeps the claims of the token it rotates, so a snapshot must outlive any refresh token.
+    return int(api_settings.REFRESH_TOKEN_LIFETIME.total_seconds())
+
+
+def publish_user_snapshot(user_id, snapshot):
+    """Record a change to a user's claim fields so tokens issued before it stop being trusted."""
+    cache.set(snapshot_key(user_id), snapshot, snapshot_timeout())
+    with _local_lock:
+        _local_snapshots.pop(user_id, None)
+
+
+def claims_user(user_id, claims):
+    """
+    Build a Users instance from token claims without a query.
+
+    Every other field is deferred, so code that needs e.g. the email still loads it on access.
+    """
+    values = {Users._meta.pk.attname: user_id, **claims}
+    return Users.from_db(
+        router.db_for_read(Users),
+        list(values),
+        [values.get(field.attname, DEFERRED) for field in Users._meta.concrete_fields],
+    )
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that builds request.user from the token's USER_CLAIMS instead of loading the row.
+
+    Claims are overridden by the user's snapshot: published when their claim fields change or the user
+    is deleted (see signals.py), or loaded from the database when the shared cache has none, so
+    deactivations and role changes apply to tokens that are already out. Tokens issued without the
+    claims fall back to the database lookup.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN or not all(claim in validated_token for claim in USER_CLAIMS):
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        claims = {claim: validated_token[claim] for claim in USER_CLAIMS}
+        snapshot = get_user_snapshot(user_id)
+        if snapshot.get('deleted'):
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        claims.update(snapshot)
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not claims['is_active']:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return claims_user(user_id, claims)
+
+
+_blacklisted_jtis = LRUCache(maxsize=auth_claims_settings()['BLACKLIST_LOCAL_MAXSIZE'])
+
+
+def blacklist_key(jti):
+    return f'token-blacklisted:{jti}'
+
+
+def is_known_blacklisted(jti):
+    """True if this process or the shared cache has seen `jti` blacklisted; False means "not known", not "valid"."""
+    with _local_lock:
+        if jti in _blacklisted_jtis:
+            return True
+    if cache.get(blacklist_key(jti)):
+        with _local_lock:
+            _blacklisted_jtis[jti] = True
+        return True
+    return False
+
+
+def remember_blacklisted(jti, exp):
+    """Cache a blacklisted jti until its token would have expired anyway."""
+    with _local_lock:
+        _blacklisted_jtis[jti] = True
+    cache.set(blacklist_key(jti), True, max(int(exp - time.time()), 1))
+
+
+class RotatingRefreshToken(ClaimsRefreshToken):
+    """
+    Refresh token used by ClaimsTokenRefreshSerializer.
+
+    check_blacklist() only consults the caches, so replayed tokens are rejected without a query. It
+    is not a complete check on its own: the serializer must call blacklist_once(), whose unique insert
+    into the blacklist is the authoritative check (and also closes the race between two concurrent
+    refreshes of the same token).
+    """
+
+    def check_blacklist(self):
+        if is_known_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist_once(self, user):
+        """Blacklist this token, raising TokenError if it already was."""
+        jti, exp = self.payload[api_settings.JTI_CLAIM], self.payload['exp']
+        token_id = OutstandingToken.objects.filter(jti=jti).values_list('pk', flat=True).first()
+        if token_id is None:
+            token_id = self.outstand_for(user).pk
+        try:
+            with transaction.atomic():
+                BlacklistedToken.objects.create(token_id=token_id)
+        except IntegrityError:
+            remember_blacklisted(jti, exp)
+            raise TokenError(_("Token is blacklisted"))
+        remember_blacklisted(jti, exp)
+
+    def outstand_for(self, user):
+        """Record this (new) token as outstanding without looking the user up again."""
+        return OutstandingToken.objects.create(
+            user=user,
+            jti=self.payload[api_settings.JTI_CLAIM],
+            token=str(self),
+            created_at=self.current_time,
+            expires_at=datetime_from_epoch(self.payload['exp']),
+        )
+
+
+def purge_expired_tokens(chunk_size=5000, pause=0):
+    """
+    Delete expired outstanding tokens and their blacklist entries in primary-key chunks.
+
+    Each chunk is its own short transaction, so purging millions of rows never holds long locks.
+
+    Returns:
+        int: Number of outstanding tokens deleted.
+    """
+    now = timezone.now()
+    deleted, last_pk = 0, 0
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(pk__gt=last_pk, expires_at__lte=now)
+            .order_by('pk').values_list('pk', flat=True)[:chunk_size]
+        )
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            OutstandingToken.objects.filter(pk__in=ids).delete()
+        deleted += len(ids)
+        last_pk = ids[-1]
+        if pause:
+            time.sleep(pause)
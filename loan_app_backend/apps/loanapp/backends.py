@@ -0,0 +1,17 @@
+from django.contrib.auth.backends import ModelBackend
+
+
+class ResolvedUserBackend(ModelBackend):
+    """
+    Authenticate a user the caller has already loaded, e.g. by LoginSerializer's email-or-username query.
+
+    Used as authenticate(request, user=user, password=password), so login keeps Django's signals and
+    check_password()'s rehash-on-login without fetching the user a second time.
+    """
+
+    def authenticate(self, request, user=None, password=None, **kwargs):
+        if user is None or password is None:
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
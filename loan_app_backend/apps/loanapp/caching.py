@@ -0,0 +1,10 @@
+# Versioned scopes of the cached list responses (see common/caching.py); bumped by the receivers in signals.py.
+LOANS = 'loans'  # Any loan application.
+LOANS_BULK = 'loans:bulk'  # Loans changed by QuerySet.update(), whose owners are not known.
+USERS = 'users'
+FRAUD_FLAGS = 'fraud-flags'
+
+
+def user_loans(user_id):
+    """The loan applications of one user."""
+    return f'loans:user:{user_id}'
@@ -1,102 +1,94 @@
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
-from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.template.loader import get_template
+from loan_app_backend.apps.loanapp.outbox import enqueue_email, enqueue_many, outbound_email
 
 
-class CustomActivationEmail:
-    html_email_template_name = "email_templates/user_activation.html"
+class TemplatedEmail:
+    """
+    Base class for the HTML emails below; subclasses set `subject` and `html_email_template_name`.
+
+    Each template is loaded and compiled once per process (see warm_up()) and shared by every send.
+    Messages are queued for the outbox worker, which delivers them in batches over one connection.
+    """
+    subject = None
+    html_email_template_name = None
+    _templates = {}
 
     def __init__(self, context):
         self.context = context
 
-    def send(self, to):
-        subject = "Activate Your LoanApp Account"
-        html_message = render_to_string(self.html_email_template_name, self.context)
-        from_email = settings.DEFAULT_FROM_EMAIL
+    @classmethod
+    def get_template(cls):
+        name = cls.html_email_template_name
+        if name not in TemplatedEmail._templates:
+            TemplatedEmail._templates[name] = get_template(name)
+        return TemplatedEmail._templates[name]
 
-        send_mail(
-            subject,
-            '', #  Plain text message (not used here)
-            from_email,
-            to,
-            html_message=html_message,
-            fail_silently=False,
-        )
+    @classmethod
+    def warm_up(cls):
+        """Compile the template of every email class; called from LoanappConfig.ready()."""
+        for email_class in cls.__subclasses__():
+            email_class.get_template()
+            email_class.warm_up()
 
+    def render(self):
+        return self.get_template().render(self.context)
 
-class BlockedUserEmail:
-    html_email_template_name = "email_templates/user_blocked.html"
+    def send(self, to):
+        enqueue_email(self.subject, to, html_body=self.render())
 
-    def __init__(self, context):
-        self.context = context
+    @classmethod
+    def send_many(cls, messages):
+        """
+        Render and queue one email per recipient in bulk, e.g. to notify every user blocked by an admin action.
 
-    def send(self, to):
-        subject = "LoanApp Account Blocked"
-        html_message = render_to_string(self.html_email_template_name, self.context)
-        from_email = settings.DEFAULT_FROM_EMAIL
+        Args:
+            messages (iterable): (context, to) pairs, where `to` is a list of addresses.
 
-        send_mail(
-            subject,
-            '',  # Plain text message (not used here)
-            from_email,
-            to,
-            html_message=html_message,
-            fail_silently=False,
-        )
+        Returns:
+            list: The queued OutboundEmail instances.
+        """
+        return enqueue_many([
+            outbound_email(cls.subject, to, html_body=cls(context).render()) for context, to in messages
+        ])
 
 
-class UnblockedUserEmail:
-    html_email_template_name = "email_templates/user_unblocked.html"
+@receiver(setting_changed)
+def clear_template_cache(setting, **kwargs):
+    if setting == 'TEMPLATES':
+        TemplatedEmail._templates.clear()
 
-    def __init__(self, context):
-        self.context = context
 
-    def send(self, to):
-        subject = "LoanApp Account Unblocked"
-        html_message = render_to_string(self.html_email_template_name, self.context)
-        from_email = settings.DEFAULT_FROM_EMAIL
+class CustomActivationEmail(TemplatedEmail):
+    subject = "Activate Your LoanApp Account"
+    html_email_template_name = "email_templates/user_activation.html"
 
-        send_mail(
-            subject,
-            '',  # Plain text message (not used here)
-            from_email,
-            to,
-            html_message=html_message,
-            fail_silently=False,
-        )
 
+class BlockedUserEmail(TemplatedEmail):
+    subject = "LoanApp Account Blocked"
+    html_email_template_name = "email_templates/user_blocked.html"
 
-class PasswordResetEmail:
-    html_email_template_name = "email_templates/password_reset.html"
 
-    def __init__(self, context):
-        self.context = context
+class UnblockedUserEmail(TemplatedEmail):
+    subject = "LoanApp Account Unblocked"
+    html_email_template_name = "email_templates/user_unblocked.html"
 
-    def send(self, to):
-        subject = "Reset Your LoanApp Password"
-        html_message = render_to_string(self.html_email_template_name, self.context)
-        from_email = settings.DEFAULT_FROM_EMAIL
 
-        send_mail(
-            subject,
-            '',  # Empty plain text version
-            from_email,
-            to,
-            html_message=html_message,
-            fail_silently=False,
-        )
+class PasswordResetEmail(TemplatedEmail):
+    subject = "Reset Your LoanApp Password"
+    html_email_template_name = "email_templates/password_reset.html"
 
 
 def send_email(subject, message, recipient_list, from_email=None, fail_silently=False):
     """
-    Send a plain text email using Django's configured backend.
+    Queue a plain text email for the outbox worker (see outbox.py).
 
     Args:
         subject (str): Email subject line.
         message (str): Plain text email body.
         recipient_list (list): List of recipient email addresses.
         from_email (str, optional): Sender email. Defaults to settings.DEFAULT_FROM_EMAIL.
-        fail_silently (bool, optional): If True, suppress email send errors. Defaults to False.
+        fail_silently (bool, optional): Kept for compatibility; delivery errors are retried by the worker.
     """
-    from_email = from_email or settings.DEFAULT_FROM_EMAIL
-    send_mail(subject, message, from_email, recipient_list, fail_silently=fail_silently)
+    enqueue_email(subject, recipient_list, body=message, from_email=from_email)
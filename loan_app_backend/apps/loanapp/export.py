@@ -0,0 +1,85 @@
+import csv
+import datetime
+import io
+from collections import defaultdict
+from itertools import islice
+from asgiref.sync import sync_to_async
+from django.db.models import F
+from loan_app_backend.apps.common.renderers import dumps
+from loan_app_backend.apps.loanapp.models import FraudFlag
+
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+CONTENT_TYPES = {'csv': 'text/csv; charset=utf-8', 'jsonl': 'application/x-ndjson'}
+EXPORT_CHUNK_SIZE = 2000
+
+LOAN_EXPORT_FIELDS = ['id', 'created_at', 'status', 'amount_requested', 'purpose', 'user_id', 'user_email', 'fraud_flags']
+USER_EXPORT_FIELDS = ['id', 'username', 'email', 'first_name', 'last_name', 'role', 'is_active', 'date_joined']
+
+
+def loan_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield loans as dicts with their user's email and fraud flag reasons, without building model instances.
+
+    Loans come from one server-side cursor; the flags of each chunk are fetched with one IN query.
+    """
+    fields = [field for field in LOAN_EXPORT_FIELDS if field not in ('user_email', 'fraud_flags')]
+    rows = queryset.values(*fields, user_email=F('user__email')).iterator(chunk_size=chunk_size)
+    while chunk := list(islice(rows, chunk_size)):
+        flags = defaultdict(list)
+        for loan_id, reason in FraudFlag.objects.filter(
+            loan_application_id__in=[row['id'] for row in chunk]
+        ).order_by('created_at', 'pk').values_list('loan_application_id', 'reason'):
+            flags[loan_id].append(reason)
+        for row in chunk:
+            row['fraud_flags'] = flags.get(row['id'], [])
+            yield row
+
+
+def user_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    return queryset.values(*USER_EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+
+
+def csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        value = '; '.join(value)
+    elif isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@'):
+        return "'" + value  # Keep spreadsheets from evaluating user-supplied text as a formula.
+    return value
+
+
+def encode_rows(rows, fields, format, chunk_size=EXPORT_CHUNK_SIZE):
+    """Encode rows as CSV (with a header) or JSON Lines, yielding one bytes block per `chunk_size` rows."""
+    rows = iter(rows)
+    if format == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        while chunk := list(islice(rows, chunk_size)):
+            writer.writerows([csv_value(row[field]) for field in fields] for row in chunk)
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')  # Header of an empty export.
+        return
+    while chunk := list(islice(rows, chunk_size)):
+        yield b''.join(dumps({field: row[field] for field in fields}) + b'\n' for row in chunk)
+
+
+async def iterate_async(blocks):
+    """
+    Yield the items of a sync iterator to async code, producing each one in the request's sync thread.
+
+    An ASGI server given a sync iterator reads the whole of it into memory before sending a byte; this
+    keeps the stream flowing one block at a time, with the server-side cursor used from a single thread.
+    """
+    blocks = iter(blocks)
+    next_block = sync_to_async(next, thread_sensitive=True)
+    done = object()
+    while (block := await next_block(blocks, done)) is not done:
+        yield block
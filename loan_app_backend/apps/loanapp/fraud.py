@@ -0,0 +1,290 @@
+import datetime
+from collections import Counter, defaultdict
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+from django.utils.functional import cached_property
+from loan_app_backend.apps.loanapp.models import EmailDomainStats, LoanApplication, LoanVelocityBucket, Users
+
+
+VELOCITY_WINDOW = datetime.timedelta(hours=24)
+VELOCITY_BUCKET = datetime.timedelta(hours=1)
+
+
+def velocity_window_start(moment):
+    """Truncate a datetime to the start of its velocity bucket."""
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def velocity_window(now):
+    """
+    Return (start of the rolling window ending at `now`, start of its first whole bucket).
+
+    Loans from the first whole bucket on are counted from the buckets. The oldest bucket lies only partly
+    inside the window, so its loans are counted from the loans table instead (an indexed range on
+    (user, created_at) of at most one hour); summing the whole bucket would count loans up to 24h59m old.
+    """
+    start = now - VELOCITY_WINDOW
+    return start, velocity_window_start(start) + VELOCITY_BUCKET
+
+
+def _adjust_counter(model, lookup, field, delta):
+    """
+    Atomically add `delta` to a counter row, creating the row on the first increment.
+
+    Decrements never create rows and never take a counter below zero.
+    """
+    if delta < 0:
+        model.objects.filter(**lookup, **{f'{field}__gte': -delta}).update(**{field: F(field) + delta})
+        return
+
+    if model.objects.filter(**lookup).update(**{field: F(field) + delta}):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **{field: delta})
+    except IntegrityError:
+        # Another request created the row between our UPDATE and INSERT.
+        model.objects.filter(**lookup).update(**{field: F(field) + delta})
+
+
+def adjust_email_domain_count(domain, delta):
+    if domain:
+        _adjust_counter(EmailDomainStats, {'domain': domain}, 'user_count', delta)
+
+
+def adjust_loan_velocity(user_id, created_at, delta):
+    if delta < 0 and created_at < timezone.now() - VELOCITY_WINDOW - VELOCITY_BUCKET:
+        return  # The bucket has already left the window.
+    lookup = {'user_id': user_id, 'window_start': velocity_window_start(created_at)}
+    _adjust_counter(LoanVelocityBucket, lookup, 'loan_count', delta)
+
+
+def add_loan_velocity(loans):
+    """
+    Count many new loans into their velocity buckets with grouped queries, for loans made by bulk_create().
+
+    Existing buckets get one UPDATE per distinct increment and missing ones a single INSERT.
+    """
+    counts = Counter((loan.user_id, velocity_window_start(loan.created_at)) for loan in loans)
+    by_window = defaultdict(dict)
+    for (user_id, window_start), count in counts.items():
+        by_window[window_start][user_id] = count
+
+    for window_start, user_counts in by_window.items():
+        with transaction.atomic():
+            existing = set(
+                LoanVelocityBucket.objects.select_for_update()
+                .filter(window_start=window_start, user_id__in=user_counts).values_list('user_id', flat=True)
+            )
+            by_delta = defaultdict(list)
+            for user_id in existing:
+                by_delta[user_counts[user_id]].append(user_id)
+            for delta, user_ids in by_delta.items():
+                LoanVelocityBucket.objects.filter(window_start=window_start, user_id__in=user_ids).update(
+                    loan_count=F('loan_count') + delta
+                )
+
+            missing = [
+                LoanVelocityBucket(user_id=user_id, window_start=window_start, loan_count=count)
+                for user_id, count in user_counts.items() if user_id not in existing
+            ]
+            try:
+                with transaction.atomic():
+                    LoanVelocityBucket.objects.bulk_create(missing)
+            except IntegrityError:
+                # A concurrent submission created some of these buckets first.
+                for bucket in missing:
+                    _adjust_counter(
+                        LoanVelocityBucket, {'user_id': bucket.user_id, 'window_start': window_start},
+                        'loan_count', bucket.loan_count,
+                    )
+
+
+def prune_velocity_buckets(now=None):
+    """Delete velocity buckets that can no longer fall inside the rolling window."""
+    now = now or timezone.now()
+    cutoff = velocity_window_start(now - VELOCITY_WINDOW)
+    return LoanVelocityBucket.objects.filter(window_start__lt=cutoff).delete()[0]
+
+
+def rebuild_fraud_counters(chunk_size=2000):
+    """
+    Recompute every fraud counter from the source tables.
+
+    Used to seed counters for existing data and to repair them after bulk writes that bypass signals.
+    """
+    now = timezone.now()
+    domains = dict(
+        Users.objects.exclude(email_domain='').order_by()
+        .values('email_domain').annotate(total=Count('pk')).values_list('email_domain', 'total')
+    )
+
+    buckets = Counter(
+        (user_id, velocity_window_start(created_at))
+        for user_id, created_at in LoanApplication.objects.filter(
+            created_at__gte=velocity_window_start(now - VELOCITY_WINDOW)
+        ).values_list('user_id', 'created_at').iterator(chunk_size=chunk_size)
+    )
+
+    with transaction.atomic():
+        EmailDomainStats.objects.all().delete()
+        EmailDomainStats.objects.bulk_create(
+            [EmailDomainStats(domain=domain, user_count=count) for domain, count in domains.items()],
+            batch_size=chunk_size,
+        )
+        LoanVelocityBucket.objects.all().delete()
+        LoanVelocityBucket.objects.bulk_create(
+            [
+                LoanVelocityBucket(user_id=user_id, window_start=window_start, loan_count=count)
+                for (user_id, window_start), count in buckets.items()
+            ],
+            batch_size=chunk_size,
+        )
+    return len(domains), len(buckets)
+
+
+class FraudContext:
+    """
+    Everything the fraud rules may look at for one loan submission.
+
+    Counter reads are lazy and cached, so each one costs at most a single indexed query
+    no matter how many rules use it.
+    """
+
+    def __init__(self, user, amount_requested, now=None):
+        self.user = user
+        self.amount_requested = amount_requested
+        self.now = now or timezone.now()
+
+    @classmethod
+    def prefetch(cls, contexts):
+        """
+        Load the counters of many contexts with one grouped query each, instead of one query per context.
+
+        Contexts are taken in submission order: earlier ones count towards the velocity of later ones for
+        the same user, as if the loans had been submitted one at a time. The window is the earliest
+        context's.
+        """
+        if not contexts:
+            return contexts
+        start, whole_buckets_start = velocity_window(min(context.now for context in contexts))
+        user_ids = {context.user.pk for context in contexts}
+        recent = Counter(dict(
+            LoanVelocityBucket.objects.filter(user_id__in=user_ids, window_start__gte=whole_buckets_start)
+            .order_by().values('user_id').annotate(total=Sum('loan_count')).values_list('user_id', 'total')
+        ))
+        recent.update(dict(
+            LoanApplication.objects.filter(
+                user_id__in=user_ids, created_at__gte=start, created_at__lt=whole_buckets_start,
+            ).order_by().values('user_id').annotate(total=Count('pk')).values_list('user_id', 'total')
+        ))
+        domains = {context.email_domain for context in contexts} - {''}
+        domain_counts = dict(
+            EmailDomainStats.objects.filter(domain__in=domains).values_list('domain', 'user_count')
+        ) if domains else {}
+
+        submitted = Counter()
+        for context in contexts:
+            # cached_property reads these from the instance dict.
+            context.__dict__['recent_loan_count'] = recent.get(context.user.pk, 0) + submitted[context.user.pk]
+            context.__dict__['email_domain_user_count'] = domain_counts.get(context.email_domain, 0)
+            submitted[context.user.pk] += 1
+        return contexts
+
+    async def aload(self):
+        """
+        Read both counters with the async ORM, for async views, and return the context.
+
+        The user's email_domain must already be loaded: a deferred field can't be fetched from async code.
+        """
+        start, whole_buckets_start = velocity_window(self.now)
+        totals = await LoanVelocityBucket.objects.filter(
+            user_id=self.user.pk, window_start__gte=whole_buckets_start,
+        ).aaggregate(total=Sum('loan_count'))
+        oldest = await LoanApplication.objects.filter(
+            user_id=self.user.pk, created_at__gte=start, created_at__lt=whole_buckets_start,
+        ).acount()
+        self.__dict__['recent_loan_count'] = (totals['total'] or 0) + oldest
+        user_count = None
+        if self.email_domain:
+            user_count = await EmailDomainStats.objects.filter(
+                domain=self.email_domain
+            ).values_list('user_count', flat=True).afirst()
+        self.__dict__['email_domain_user_count'] = user_count or 0
+        return self
+
+    @cached_property
+    def recent_loan_count(self):
+        """Loans the user submitted within the rolling window: whole buckets plus the oldest, partial hour."""
+        start, whole_buckets_start = velocity_window(self.now)
+        buckets = LoanVelocityBucket.objects.filter(
+            user_id=self.user.pk, window_start__gte=whole_buckets_start,
+        ).aggregate(total=Sum('loan_count'))['total'] or 0
+        return buckets + LoanApplication.objects.filter(
+            user_id=self.user.pk, created_at__gte=start, created_at__lt=whole_buckets_start,
+        ).count()
+
+    @cached_property
+    def email_domain(self):
+        return self.user.email_domain
+
+    @cached_property
+    def email_domain_user_count(self):
+        if not self.email_domain:
+            return 0
+        stats = EmailDomainStats.objects.filter(domain=self.email_domain).values_list('user_count', flat=True)
+        return next(iter(stats), 0)
+
+
+class FraudRule:
+    """Base class for fraud rules. Subclasses set `reason` and implement `matches()`."""
+    reason = None
+
+    def matches(self, context):
+        raise NotImplementedError
+
+
+class LoanVelocityRule(FraudRule):
+    reason = "More than 3 loans in 24 hours"
+    max_recent_loans = 3
+
+    def matches(self, context):
+        return context.recent_loan_count >= self.max_recent_loans
+
+
+class HighAmountRule(FraudRule):
+    reason = "Amount exceeds NGN 5,000,000"
+    max_amount = 5_000_000
+
+    def matches(self, context):
+        return context.amount_requested > self.max_amount
+
+
+class SharedEmailDomainRule(FraudRule):
+    reason = "Email domain used by more than 10 users"
+    max_users_per_domain = 10
+
+    def matches(self, context):
+        return context.email_domain_user_count > self.max_users_per_domain
+
+
+class FraudRuleEngine:
+    """Holds the registered fraud rules and evaluates all of them against a context in one pass."""
+
+    def __init__(self, rules=None):
+        self.rules = list(rules or [])
+
+    def register(self, rule):
+        self.rules.append(rule)
+        return rule
+
+    def unregister(self, rule):
+        self.rules.remove(rule)
+
+    def evaluate(self, context):
+        """Return every rule that matches the context, in registration order."""
+        return [rule for rule in self.rules if rule.matches(context)]
+
+
+fraud_engine = FraudRuleEngine([LoanVelocityRule(), HighAmountRule(), SharedEmailDomainRule()])
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, PBKDF2PasswordHasher, ScryptPasswordHasher
+
+
+DEFAULT_HASHER_POLICY = {
+    'SCRYPT_WORK_FACTOR': 2**14,  # N; memory is 128 * N * BLOCK_SIZE bytes (16 MiB by default).
+    'SCRYPT_BLOCK_SIZE': 8,
+    'SCRYPT_PARALLELISM': 1,
+    'ARGON2_TIME_COST': 2,
+    'ARGON2_MEMORY_COST': 19_456,  # KiB.
+    'ARGON2_PARALLELISM': 1,
+    'PBKDF2_ITERATIONS': 1_000_000,
+}
+
+# Importable paths of the hashers below, by algorithm.
+POLICY_HASHERS = {
+    'scrypt': 'loan_app_backend.apps.loanapp.hashers.TunedScryptPasswordHasher',
+    'argon2': 'loan_app_backend.apps.loanapp.hashers.TunedArgon2PasswordHasher',
+    'pbkdf2_sha256': 'loan_app_backend.apps.loanapp.hashers.TunedPBKDF2PasswordHasher',
+}
+
+
+def hasher_policy():
+    return {**DEFAULT_HASHER_POLICY, **getattr(settings, 'PASSWORD_HASHER_POLICY', {})}
+
+
+def password_hashers(algorithm):
+    """
+    Return a PASSWORD_HASHERS list that hashes with `algorithm` and still verifies the others.
+
+    Django upgrades a stored hash on the next successful check_password() when it was made by another
+    hasher or with other parameters than the policy's, so changing the policy migrates users as they log in.
+    """
+    preferred = POLICY_HASHERS[algorithm]
+    return [preferred, *(path for path in POLICY_HASHERS.values() if path != preferred)]
+
+
+# Parameters are properties so they follow the current settings; must_update() compares them with the
+# parameters stored in each hash.
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    work_factor = property(lambda self: hasher_policy()['SCRYPT_WORK_FACTOR'])
+    block_size = property(lambda self: hasher_policy()['SCRYPT_BLOCK_SIZE'])
+    parallelism = property(lambda self: hasher_policy()['SCRYPT_PARALLELISM'])
+    # OpenSSL's default limit (32 MiB) would reject work factors above 2**14.
+    maxmem = property(lambda self: 256 * self.work_factor * self.block_size)
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Requires argon2-cffi; only needed when the policy selects "argon2" or such hashes are stored."""
+    time_cost = property(lambda self: hasher_policy()['ARGON2_TIME_COST'])
+    memory_cost = property(lambda self: hasher_policy()['ARGON2_MEMORY_COST'])
+    parallelism = property(lambda self: hasher_policy()['ARGON2_PARALLELISM'])
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = property(lambda self: hasher_policy()['PBKDF2_ITERATIONS'])
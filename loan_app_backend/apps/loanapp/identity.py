@@ -0,0 +1,37 @@
+from loan_app_backend.apps.loanapp.models import Users
+
+
+class IdentityResolver:
+    """
+    Looks users up by email at most once per request.
+
+    A serializer's validate_email() and the view that then acts on the same address share one resolver
+    through the request (see resolve_user_by_email()), so the row fetched for validation is reused.
+    Misses are remembered too, as None.
+    """
+
+    def __init__(self):
+        self._by_email = {}
+
+    def by_email(self, email):
+        if email not in self._by_email:
+            self._by_email[email] = Users.objects.filter(email=email).first()
+        return self._by_email[email]
+
+    def forget(self, email):
+        self._by_email.pop(email, None)
+
+
+def get_identity_resolver(request):
+    """Return the resolver attached to `request`, creating it on first use; a fresh one without a request."""
+    if request is None:
+        return IdentityResolver()
+    resolver = getattr(request, '_identity_resolver', None)
+    if resolver is None:
+        resolver = request._identity_resolver = IdentityResolver()
+    return resolver
+
+
+def resolve_user_by_email(request, email):
+    """The user with `email`, or None, fetched once per request."""
+    return get_identity_resolver(request).by_email(email)
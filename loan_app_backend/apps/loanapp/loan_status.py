@@ -0,0 +1,53 @@
+from collections import defaultdict
+from django.db import transaction
+from django.utils import timezone
+from loan_app_backend.apps.common.fields import is_ulid
+from loan_app_backend.apps.loanapp.models import LoanApplication
+
+
+# Per-id outcomes of bulk_update_loan_statuses().
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+NOT_FOUND = 'not_found'
+
+
+def bulk_update_loan_statuses(updates, user):
+    """
+    Set the status of many loan applications in one transaction.
+
+    Reads the current statuses with one locking SELECT, then issues one UPDATE ... WHERE id IN (...) per
+    target status, setting updated_by and updated_at as BaseModel.save() would.
+
+    Args:
+        updates (list): {"id": str, "status": str} dicts with distinct ids, in either case.
+        user (Users): The admin making the change.
+
+    Returns:
+        list: One {"id", "status", "previous_status", "result"} dict per update, in order, with the id as given.
+    """
+    # ULIDField reads ids back in upper case, so compare in upper case. Anything but a ULID can't be found.
+    ids = [update['id'].upper() for update in updates if is_ulid(update['id'])]
+    now = timezone.now()
+    with transaction.atomic():
+        current = dict(
+            LoanApplication.objects.select_for_update().filter(pk__in=ids).values_list('pk', 'status')
+        )
+        by_status = defaultdict(list)
+        for update in updates:
+            loan_id = update['id'].upper()
+            if loan_id in current and current[loan_id] != update['status']:
+                by_status[update['status']].append(loan_id)
+        for status, loan_ids in by_status.items():
+            LoanApplication.objects.filter(pk__in=loan_ids).update(status=status, updated_by=user, updated_at=now)
+
+    results = []
+    for update in updates:
+        previous = current.get(update['id'].upper())
+        if previous is None:
+            result = NOT_FOUND
+        elif previous == update['status']:
+            result = UNCHANGED
+        else:
+            result = UPDATED
+        results.append({'id': update['id'], 'status': update['status'], 'previous_status': previous, 'result': result})
+    return results
@@ -0,0 +1,40 @@
+import json
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from loan_app_backend.apps.loanapp.loan_import import IMPORT_FORMATS, guess_format, import_loans, read_rows
+from loan_app_backend.apps.loanapp.models import Users
+from middlewares.user_middleware import acting_as
+
+
+class Command(BaseCommand):
+    help = "Import loan applications from a JSON Lines or CSV file, streaming it in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Input file, or - for standard input.")
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help="Defaults to csv for .csv files and jsonl otherwise.")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--acting-as', metavar='EMAIL', help="Record the loans as created by this user.")
+
+    def handle(self, *args, **options):
+        user = None
+        if options['acting_as']:
+            user = Users.objects.filter(email=options['acting_as']).first()
+            if user is None:
+                raise CommandError(f"No user found with the email {options['acting_as']!r}.")
+
+        path = options['path']
+        format = options['format'] or guess_format(path)
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8-sig')
+        try:
+            with acting_as(user):
+                result = import_loans(read_rows(stream, format), batch_size=options['batch_size'])
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        for error in result.errors:
+            self.stderr.write(f"Row {error['row']}: {json.dumps(error['errors'])}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.created} loans ({result.flagged} flagged), rejected {len(result.errors)} rows "
+            f"in {result.seconds:.2f}s ({result.rows_per_second:,.0f} rows/s)."
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from loan_app_backend.apps.loanapp.authentication import purge_expired_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete expired outstanding and blacklisted JWT refresh tokens in small batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--pause', type=float, default=0, help="Seconds to sleep between chunks to limit database load.")
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_tokens(chunk_size=options['chunk_size'], pause=options['pause'])
+        self.stdout.write(self.style.SUCCESS(f"Purged {deleted} expired tokens."))
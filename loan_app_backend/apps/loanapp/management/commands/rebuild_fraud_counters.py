@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from loan_app_backend.apps.loanapp.fraud import prune_velocity_buckets, rebuild_fraud_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the email-domain and loan-velocity counters used by the fraud rules."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prune', action='store_true', help="Only delete velocity buckets outside the rolling window.")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if options['prune']:
+            deleted = prune_velocity_buckets()
+            self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} stale velocity buckets."))
+            return
+
+        domains, buckets = rebuild_fraud_counters(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {domains} email domain counters and {buckets} velocity buckets."))
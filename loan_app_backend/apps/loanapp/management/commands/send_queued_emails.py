@@ -0,0 +1,28 @@
+import time
+from django.core.management.base import BaseCommand
+from loan_app_backend.apps.loanapp.outbox import process_outbox
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbound emails in batches, retrying failures with backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep polling the outbox instead of exiting once it is drained.")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds to sleep when no message is due (with --loop).")
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                result = process_outbox(batch_size=options['batch_size'])
+                if any(result):
+                    self.stdout.write(
+                        f"Sent {result.sent}, rescheduled {result.retried}, failed {result.failed}."
+                    )
+                    continue
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS("Outbox worker stopped." if options['loop'] else "Outbox drained."))
@@ -0,0 +1,26 @@
+import time
+from django.core.management.base import BaseCommand
+from loan_app_backend.apps.loanapp.activation import sweep_expired_codes
+
+
+class Command(BaseCommand):
+    help = "Delete expired activation and password reset codes in bounded batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep sweeping periodically instead of exiting after one pass.")
+        parser.add_argument('--interval', type=float, default=300.0, help="Seconds between sweeps (with --loop).")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0, help="Seconds to sleep between batches to limit database load.")
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                deleted = sweep_expired_codes(batch_size=options['batch_size'], pause=options['pause'])
+                if deleted or not options['loop']:
+                    self.stdout.write(f"Deleted {deleted} expired codes.")
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS("Sweeper stopped." if options['loop'] else "Sweep finished."))
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.2 on 2026-10-18 12:36
+
+import datetime
+from collections import Counter
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def seed_fraud_counters(apps, schema_editor):
+    Users = apps.get_model('loanapp', 'Users')
+    LoanApplication = apps.get_model('loanapp', 'LoanApplication')
+    EmailDomainStats = apps.get_model('loanapp', 'EmailDomainStats')
+    LoanVelocityBucket = apps.get_model('loanapp', 'LoanVelocityBucket')
+
+    domains = Counter(
+        email.rsplit('@', 1)[-1].strip().lower()
+        for email in Users.objects.values_list('email', flat=True).iterator(chunk_size=2000)
+        if email and '@' in email
+    )
+    EmailDomainStats.objects.bulk_create(
+        [EmailDomainStats(domain=domain, user_count=count) for domain, count in domains.items()],
+        batch_size=2000,
+    )
+
+    since = (timezone.now() - datetime.timedelta(hours=24)).replace(minute=0, second=0, microsecond=0)
+    buckets = Counter(
+        (user_id, created_at.replace(minute=0, second=0, microsecond=0))
+        for user_id, created_at in LoanApplication.objects.filter(created_at__gte=since)
+        .values_list('user_id', 'created_at').iterator(chunk_size=2000)
+    )
+    LoanVelocityBucket.objects.bulk_create(
+        [
+            LoanVelocityBucket(user_id=user_id, window_start=window_start, loan_count=count)
+            for (user_id, window_start), count in buckets.items()
+        ],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loanapp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailDomainStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('domain', models.CharField(max_length=255, unique=True)),
+                ('user_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LoanVelocityBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window_start', models.DateTimeField()),
+                ('loan_count', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='loan_velocity_buckets', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'window_start'), name='unique_loan_velocity_bucket')],
+            },
+        ),
+        migrations.RunPython(seed_fraud_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.2 on 2026-10-18 12:37
+
+from django.db import migrations, models, transaction
+
+
+BACKFILL_CHUNK_SIZE = 1000
+
+
+def backfill_email_domain(apps, schema_editor):
+    """Populate email_domain in primary-key order, one short transaction per chunk."""
+    Users = apps.get_model('loanapp', 'Users')
+    last_pk = None
+    while True:
+        chunk = Users.objects.order_by('pk').only('pk', 'email')
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+        chunk = list(chunk[:BACKFILL_CHUNK_SIZE])
+        if not chunk:
+            break
+
+        for user in chunk:
+            email = user.email or ''
+            user.email_domain = email.rsplit('@', 1)[-1].strip().lower() if '@' in email else ''
+        with transaction.atomic():
+            Users.objects.bulk_update(chunk, ['email_domain'])
+        last_pk = chunk[-1].pk
+
+
+class Migration(migrations.Migration):
+    # Each backfill chunk commits on its own so the table is never locked for the whole walk.
+    atomic = False
+
+    dependencies = [
+        ('loanapp', '0002_fraud_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='users',
+            name='email_domain',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(backfill_email_domain, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.2 on 2026-10-18 12:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loanapp', '0003_users_email_domain'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(fields=['user', '-created_at'], name='loan_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(fields=['status', '-created_at'], name='loan_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(fields=['-created_at'], name='loan_created_idx'),
+        ),
+    ]
@@ -0,0 +1,64 @@
+from django.db import migrations, models
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+
+BATCH_SIZE = 2000
+
+
+def hash_existing_codes(apps, schema_editor):
+    """
+    Keep the newest unexpired code per (user, purpose) and replace the stored code with its hash.
+
+    Expired codes can never be redeemed, so they are deleted up front rather than hashed; the hashes
+    are then written and the superseded codes deleted BATCH_SIZE rows per query.
+    """
+    ActivationCode = apps.get_model('loanapp', 'ActivationCode')
+    ActivationCode.objects.filter(expires_at__lte=timezone.now()).delete()
+
+    seen = set()
+    stale = []
+    hashed = []
+    codes = ActivationCode.objects.order_by('-created_at').values_list('pk', 'user_id', 'purpose', 'code')
+    for pk, user_id, purpose, code in codes.iterator(chunk_size=BATCH_SIZE):
+        if (user_id, purpose) in seen:
+            stale.append(pk)
+            continue
+        seen.add((user_id, purpose))
+        # Same digest as activation.hash_code().
+        code_hash = salted_hmac('loanapp.ActivationCode', f'{user_id}:{purpose}:{code}', algorithm='sha256').hexdigest()
+        hashed.append(ActivationCode(pk=pk, code_hash=code_hash))
+        if len(hashed) == BATCH_SIZE:
+            ActivationCode.objects.bulk_update(hashed, ['code_hash'])
+            hashed = []
+    ActivationCode.objects.bulk_update(hashed, ['code_hash'])
+    for start in range(0, len(stale), BATCH_SIZE):
+        ActivationCode.objects.filter(pk__in=stale[start:start + BATCH_SIZE]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loanapp', '0005_outbound_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activationcode',
+            name='code_hash',
+            field=models.CharField(default='', max_length=64),
+            preserve_default=False,
+        ),
+        migrations.RunPython(hash_existing_codes, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='activationcode',
+            name='code',
+        ),
+        migrations.AddConstraint(
+            model_name='activationcode',
+            constraint=models.UniqueConstraint(fields=('user', 'purpose'), name='unique_activation_code'),
+        ),
+        migrations.AddIndex(
+            model_name='activationcode',
+            index=models.Index(fields=['expires_at'], name='activation_code_expiry_idx'),
+        ),
+    ]
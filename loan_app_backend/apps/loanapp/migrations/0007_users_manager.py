@@ -0,0 +1,20 @@
+# Generated by Django 5.2.2 on 2026-10-18 13:06
+
+import loan_app_backend.apps.loanapp.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loanapp', '0006_activation_code_redesign'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='users',
+            managers=[
+                ('objects', loan_app_backend.apps.loanapp.models.UsersManager()),
+            ],
+        ),
+    ]
@@ -0,0 +1,43 @@
+import loan_app_backend.apps.common.models
+from django.db import migrations, models
+
+
+# Step 1 of 3 towards ULIDField keys: make room in the varchar keys (and, through them, every foreign key
+# column) for the 36-character uuid text that 0009 writes on PostgreSQL. The third-party apps with
+# foreign keys to Users are dependencies so their columns are altered too.
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loanapp', '0007_users_manager'),
+        ('admin', '0003_logentry_add_action_flag_choices'),
+        ('social_django', '0016_alter_usersocialauth_extra_data'),
+        ('token_blacklist', '0012_alter_outstandingtoken_user'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='activationcode',
+            name='id',
+            field=models.CharField(default=loan_app_backend.apps.common.models.generate_ulid_as_string, editable=False, max_length=36, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='fraudflag',
+            name='id',
+            field=models.CharField(default=loan_app_backend.apps.common.models.generate_ulid_as_string, editable=False, max_length=36, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='loanapplication',
+            name='id',
+            field=models.CharField(default=loan_app_backend.apps.common.models.generate_ulid_as_string, editable=False, max_length=36, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='outboundemail',
+            name='id',
+            field=models.CharField(default=loan_app_backend.apps.common.models.generate_ulid_as_string, editable=False, max_length=36, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='users',
+            name='id',
+            field=models.CharField(default=loan_app_backend.apps.common.models.generate_ulid_as_string, editable=False, max_length=36, primary_key=True, serialize=False),
+        ),
+    ]
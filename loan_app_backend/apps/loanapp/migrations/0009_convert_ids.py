@@ -0,0 +1,35 @@
+from django.db import migrations
+from loan_app_backend.apps.common.fields import convert_ulid_keys
+
+
+MODELS = ['Users', 'LoanApplication', 'FraudFlag', 'OutboundEmail', 'ActivationCode']
+
+
+def tables(apps):
+    return [apps.get_model('loanapp', name)._meta.db_table for name in MODELS]
+
+
+def convert_ids(apps, schema_editor):
+    convert_ulid_keys(schema_editor, tables(apps))
+
+
+def restore_ids(apps, schema_editor):
+    convert_ulid_keys(schema_editor, tables(apps), forward=False)
+
+
+# Step 2 of 3: rewrite the keys and every column referencing them in ULIDField's storage form, while the
+# columns are still text. Not atomic: each batch commits on its own, so no lock is held for the whole
+# rewrite and an interrupted run resumes where it stopped. Not online-safe: the application must be
+# stopped for 0008-0010, as deploy.sh does, since code serving requests meanwhile reads and writes keys
+# of either format.
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('loanapp', '0008_widen_ids'),
+    ]
+
+    operations = [
+        migrations.RunPython(convert_ids, restore_ids),
+    ]
@@ -0,0 +1,52 @@
+import importlib
+
+import loan_app_backend.apps.common.fields
+import loan_app_backend.apps.common.models
+from django.db import migrations
+
+convert_ids = importlib.import_module('loan_app_backend.apps.loanapp.migrations.0009_convert_ids')
+
+
+def convert_remaining_ids(apps, schema_editor):
+    """Catch keys written between 0009 and now, then run the deferred foreign key checks of the rewrite."""
+    convert_ids.convert_ids(apps, schema_editor)
+    # PostgreSQL refuses to ALTER a table with pending (deferred) constraint triggers.
+    schema_editor.connection.check_constraints()
+
+
+# Step 3 of 3: the keys now hold uuid text (PostgreSQL) or 16-byte blobs, which the type change reads as
+# they are: `USING id::uuid` rewrites the tables on PostgreSQL, SQLite copies them into new tables.
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loanapp', '0009_convert_ids'),
+    ]
+
+    operations = [
+        migrations.RunPython(convert_remaining_ids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='activationcode',
+            name='id',
+            field=loan_app_backend.apps.common.fields.ULIDField(default=loan_app_backend.apps.common.models.generate_ulid_as_string, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='fraudflag',
+            name='id',
+            field=loan_app_backend.apps.common.fields.ULIDField(default=loan_app_backend.apps.common.models.generate_ulid_as_string, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='loanapplication',
+            name='id',
+            field=loan_app_backend.apps.common.fields.ULIDField(default=loan_app_backend.apps.common.models.generate_ulid_as_string, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='outboundemail',
+            name='id',
+            field=loan_app_backend.apps.common.fields.ULIDField(default=loan_app_backend.apps.common.models.generate_ulid_as_string, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='users',
+            name='id',
+            field=loan_app_backend.apps.common.fields.ULIDField(default=loan_app_backend.apps.common.models.generate_ulid_as_string, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
@@ -1,23 +1,46 @@
 from django.db import models
-from django.contrib.auth.models import AbstractUser
-from loan_app_backend.apps.common.models import BaseModel
+from django.contrib.auth.models import AbstractUser, UserManager
+from loan_app_backend.apps.common.models import BaseModel, BaseQuerySet
 from django.conf import settings
 from django.utils import timezone
 
 
+def get_email_domain(email):
+    """Return the lower-cased domain part of an email address ('' when there is none)."""
+    if not email or '@' not in email:
+        return ''
+    return email.rsplit('@', 1)[-1].strip().lower()
+
+
+class UsersManager(UserManager.from_queryset(BaseQuerySet)):
+    """AbstractUser's manager (create_user() and friends) on top of BaseQuerySet."""
+
+
 class Users(BaseModel, AbstractUser):
     email = models.EmailField(unique=True)
+    email_domain = models.CharField(max_length=255, blank=True, default='', editable=False, db_index=True)
     role = models.CharField(max_length=20, choices=[
         ('admin', 'Admin'),
         ('user', 'User'),
     ], default='user')
 
+    objects = UsersManager()  # BaseModel's own manager would shadow AbstractUser's.
+
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
 
     def __str__(self):
         return f"{self.email} ({self.role})"
 
+    def save(self, *args, **kwargs):
+        # Skip when the email is deferred so saving a partially loaded user doesn't fetch it.
+        if 'email' in self.__dict__:
+            self.email_domain = get_email_domain(self.email)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'email' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'email_domain'}
+        super().save(*args, **kwargs)
+
 
 class LoanApplication(BaseModel):
     STATUS_CHOICES = [
@@ -34,6 +57,16 @@ class LoanApplication(BaseModel):
     purpose = models.TextField()
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
 
+    class Meta:
+        indexes = [
+            # A user's own loans, newest first (LoanApplicationView).
+            models.Index(fields=['user', '-created_at'], name='loan_user_created_idx'),
+            # Admin list filtered by status, newest first (AdminLoanListView).
+            models.Index(fields=['status', '-created_at'], name='loan_status_created_idx'),
+            # Unfiltered admin list, newest first.
+            models.Index(fields=['-created_at'], name='loan_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.amount_requested}"
 
@@ -48,12 +81,78 @@ class FraudFlag(BaseModel):
         return f"Fraud: {self.reason}"
 
 
+class EmailDomainStats(models.Model):
+    """Number of users registered per (lower-cased) email domain, kept up to date by signals."""
+    domain = models.CharField(max_length=255, unique=True)
+    user_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.domain}: {self.user_count}"
+
+
+class LoanVelocityBucket(models.Model):
+    """Number of loans a user submitted within one hourly window, used for the rolling 24h rule."""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="loan_velocity_buckets"
+    )
+    window_start = models.DateTimeField()
+    loan_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'window_start'], name='unique_loan_velocity_bucket'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} @ {self.window_start}: {self.loan_count}"
+
+
+class OutboundEmail(BaseModel):
+    """An email queued by the request cycle and delivered by the outbox worker (see outbox.py)."""
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("sent", "Sent"),
+        ("failed", "Failed")
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="queued")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Due messages, oldest first (outbox.claim_batch).
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+
+
 class ActivationCode(BaseModel):
+    """The current activation or password reset code of a user; issued and checked through activation.py."""
     user = models.ForeignKey(Users, on_delete=models.CASCADE)
-    code = models.CharField(max_length=6)
+    code_hash = models.CharField(max_length=64)  # HMAC-SHA256 of the code, never the code itself.
     purpose = models.CharField(max_length=20, choices=[('activation', 'Activation'), ('reset', 'Reset')])
     expires_at = models.DateTimeField()
 
+    class Meta:
+        constraints = [
+            # One live code per user and purpose; also the index every lookup uses.
+            models.UniqueConstraint(fields=['user', 'purpose'], name='unique_activation_code'),
+        ]
+        indexes = [
+            # Expiry sweeps (activation.sweep_expired_codes).
+            models.Index(fields=['expires_at'], name='activation_code_expiry_idx'),
+        ]
+
     def is_expired(self):
         return timezone.now() > self.expires_at
 
@@ -0,0 +1,154 @@
+import datetime
+from typing import NamedTuple
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from loan_app_backend.apps.loanapp.models import OutboundEmail
+
+
+DEFAULT_OUTBOX_SETTINGS = {
+    'BATCH_SIZE': 100,  # Messages claimed and sent over one SMTP connection per batch.
+    'MAX_ATTEMPTS': 5,  # Deliveries tried before a message is marked failed.
+    'RETRY_DELAY': 30,  # Seconds before the first retry; doubles on every further attempt.
+    'MAX_RETRY_DELAY': 3600,  # Upper bound for the retry delay.
+    'CLAIM_TIMEOUT': 300,  # Seconds after which a batch claimed by a worker that died is picked up again.
+}
+
+
+class OutboxResult(NamedTuple):
+    sent: int
+    retried: int
+    failed: int
+
+
+def outbox_settings():
+    return {**DEFAULT_OUTBOX_SETTINGS, **getattr(settings, 'EMAIL_OUTBOX', {})}
+
+
+def enqueue_email(subject, to, body='', html_body='', from_email=None):
+    """
+    Queue an email for the outbox worker instead of sending it inside the request.
+
+    Args:
+        subject (str): Email subject line.
+        to (list): Recipient email addresses.
+        body (str, optional): Plain text body.
+        html_body (str, optional): HTML alternative.
+        from_email (str, optional): Sender email. Defaults to settings.DEFAULT_FROM_EMAIL.
+
+    Returns:
+        OutboundEmail: The queued message.
+    """
+    email = outbound_email(subject, to, body, html_body, from_email)
+    email.save()
+    return email
+
+
+def enqueue_many(emails, batch_size=500):
+    """
+    Queue many unsaved OutboundEmail instances (see outbound_email()) with bulk INSERTs.
+
+    Returns:
+        list: The queued messages.
+    """
+    return OutboundEmail.objects.bulk_create(emails, batch_size=batch_size)
+
+
+def outbound_email(subject, to, body='', html_body='', from_email=None):
+    """Build an unsaved OutboundEmail; arguments as for enqueue_email()."""
+    return OutboundEmail(
+        subject=subject,
+        body=body,
+        html_body=html_body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(to),
+    )
+
+
+def retry_delay(attempts, options):
+    """Exponential backoff: RETRY_DELAY, 2x, 4x, ... capped at MAX_RETRY_DELAY."""
+    return datetime.timedelta(seconds=min(options['RETRY_DELAY'] * 2 ** (attempts - 1), options['MAX_RETRY_DELAY']))
+
+
+def claim_batch(batch_size, options):
+    """
+    Claim up to `batch_size` due messages for this worker.
+
+    Claimed rows get their attempt counted and are pushed CLAIM_TIMEOUT into the future, so concurrent
+    workers skip them (SKIP LOCKED where the database supports it) and a crashed worker's batch is retried.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status='queued', next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        OutboundEmail.objects.filter(pk__in=ids).update(
+            attempts=F('attempts') + 1,
+            next_attempt_at=now + datetime.timedelta(seconds=options['CLAIM_TIMEOUT']),
+            updated_at=now,
+        )
+    return list(OutboundEmail.objects.filter(pk__in=ids).order_by('created_at'))
+
+
+def build_message(email, connection):
+    message = EmailMultiAlternatives(
+        email.subject, email.body, email.from_email, email.to, connection=connection
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, 'text/html')
+    return message
+
+
+def process_outbox(batch_size=None):
+    """
+    Send one batch of due messages over a single connection to the email backend.
+
+    Failed deliveries are rescheduled with exponential backoff until MAX_ATTEMPTS, then marked failed.
+
+    Returns:
+        OutboxResult: Number of messages sent, rescheduled and given up on.
+    """
+    options = outbox_settings()
+    emails = claim_batch(batch_size or options['BATCH_SIZE'], options)
+    if not emails:
+        return OutboxResult(0, 0, 0)
+
+    sent, errors = [], {}
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exc:
+        errors = {email.pk: exc for email in emails}
+    else:
+        try:
+            # One message per call, so a rejected recipient fails only its own message.
+            for email in emails:
+                try:
+                    connection.send_messages([build_message(email, connection)])
+                except Exception as exc:
+                    errors[email.pk] = exc
+                else:
+                    sent.append(email.pk)
+        finally:
+            connection.close()
+
+    now = timezone.now()
+    OutboundEmail.objects.filter(pk__in=sent).update(status='sent', sent_at=now, last_error='', updated_at=now)
+
+    failed = [email for email in emails if email.pk in errors]
+    for email in failed:
+        email.last_error = repr(errors[email.pk])
+        email.updated_at = now
+        if email.attempts >= options['MAX_ATTEMPTS']:
+            email.status = 'failed'
+        else:
+            email.next_attempt_at = now + retry_delay(email.attempts, options)
+    OutboundEmail.objects.bulk_update(failed, ['status', 'next_attempt_at', 'last_error', 'updated_at'])
+
+    gave_up = sum(1 for email in failed if email.status == 'failed')
+    return OutboxResult(len(sent), len(failed) - gave_up, gave_up)
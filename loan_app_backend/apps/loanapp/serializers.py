@@ -1,8 +1,14 @@
-import uuid
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.core.validators import MinLengthValidator
+from django.db.models import Q
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from loan_app_backend.apps.common.models import generate_ulid_as_string
+from loan_app_backend.apps.loanapp.authentication import USER_CLAIMS, RotatingRefreshToken
+from loan_app_backend.apps.loanapp.identity import get_identity_resolver, resolve_user_by_email
 from loan_app_backend.apps.loanapp.models import LoanApplication, Users
 
 
@@ -16,19 +22,15 @@ class RegistrationSerializer(serializers.ModelSerializer):
         fields = ('first_name', 'last_name', 'email', 'password')
 
     def validate_email(self, value):
-        if Users.objects.filter(email=value).exists():
+        if resolve_user_by_email(self.context.get('request'), value) is not None:
             raise serializers.ValidationError("This email is already in use.")
         return value
 
     def create(self, validated_data):
-        # Generate a unique username
-        while True:
-            random_username = f"user_{uuid.uuid4().hex[:8]}"
-            if not Users.objects.filter(username=random_username).exists():
-                break
-
-        validated_data["username"] = random_username
+        # ULIDs are unique by construction, so there is no need to probe for a free username.
+        validated_data["username"] = f"user_{generate_ulid_as_string().lower()}"
         user = Users.objects.create_user(**validated_data, is_active=False)
+        get_identity_resolver(self.context.get('request')).forget(user.email)
         return user
 
 
@@ -40,26 +42,22 @@ class LoginSerializer(serializers.Serializer):
         email_or_username = data.get('email_or_username')
         password = data.get('password')
 
-        user = None
-
-        # Try email first
-        if Users.objects.filter(email=email_or_username).exists():
-            user = Users.objects.get(email=email_or_username)
-        elif Users.objects.filter(username=email_or_username).exists():
-            user = Users.objects.get(username=email_or_username)
-        else:
+        # One query for both login keys; an exact email match wins over another user's username.
+        candidates = sorted(
+            Users.objects.filter(Q(email=email_or_username) | Q(username=email_or_username))[:2],
+            key=lambda candidate: candidate.email != email_or_username,
+        )
+        user = candidates[0] if candidates else None
+        if user is None:
+            # Hash anyway so unknown accounts take as long as wrong passwords.
+            Users().set_password(password)
             raise serializers.ValidationError({'detail': 'Invalid email/username or password.'})
 
         if not user.is_active:
             raise serializers.ValidationError({'detail': 'Account not activated.'})
 
-        # Authenticate with username or email (depending on what was found)
-        login_key = user.email if Users.USERNAME_FIELD == "email" else user.username
-        authenticated_user = authenticate(
-            request=self.context.get('request'),
-            username=login_key,
-            password=password
-        )
+        # Verifies (and, if the hasher policy changed, upgrades) the stored hash without reloading the user.
+        authenticated_user = authenticate(request=self.context.get('request'), user=user, password=password)
 
         if not authenticated_user:
             raise serializers.ValidationError({'detail': 'Invalid email/username or password.'})
@@ -74,7 +72,7 @@ class ActivateUserSerializer(serializers.Serializer):
     resend_code = serializers.BooleanField(default=False)
 
     def validate_email(self, value):
-        if not Users.objects.filter(email=value).exists():
+        if resolve_user_by_email(self.context.get('request'), value) is None:
             raise serializers.ValidationError("No user found with this email.")
         return value
 
@@ -83,7 +81,7 @@ class ForgotPasswordSerializer(serializers.Serializer):
     email = serializers.EmailField()
 
     def validate_email(self, value):
-        if not Users.objects.filter(email=value).exists():
+        if resolve_user_by_email(self.context.get('request'), value) is None:
             raise serializers.ValidationError("No user found with this email.")
         return value
 
@@ -131,3 +129,63 @@ class AdminLoanApplicationSerializer(serializers.ModelSerializer):
     class Meta:
         model = LoanApplication
         fields = ['id', 'amount_requested', 'purpose', 'user', 'status']
+
+
+class LoanStatusUpdateSerializer(serializers.Serializer):
+    id = serializers.CharField(max_length=26)
+    status = serializers.ChoiceField(choices=LoanApplication.STATUS_CHOICES)
+
+
+class AdminBulkLoanStatusSerializer(serializers.Serializer):
+    updates = LoanStatusUpdateSerializer(many=True, allow_empty=False, max_length=500)
+
+    def validate_updates(self, value):
+        ids = [update['id'].upper() for update in value]  # ULIDs are case-insensitive.
+        if len(set(ids)) != len(ids):
+            raise serializers.ValidationError("Each loan id may appear only once.")
+        return value
+
+
+class LoanImportSerializer(serializers.Serializer):
+    loans = serializers.ListField(required=False, allow_empty=False, max_length=10_000)
+    file = serializers.FileField(required=False, help_text="CSV (.csv) or JSON Lines file of loans.")
+
+    def validate(self, attrs):
+        if ('loans' in attrs) == ('file' in attrs):
+            raise serializers.ValidationError("Send either a list of loans or a CSV/JSONL file.")
+        return attrs
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh serializer for /api/token/refresh/ that keeps rotation down to a few indexed queries.
+
+    The user is loaded once (claim fields only) and reused for the blacklist and the new outstanding
+    token, replayed tokens are rejected from cache, and the new tokens carry the user's current claims.
+    """
+    token_class = RotatingRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        user = Users.objects.only(*USER_CLAIMS).filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+
+        if api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION:
+            refresh.blacklist_once(user)
+
+        for claim in USER_CLAIMS:
+            refresh[claim] = getattr(user, claim)
+        data = {"access": str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand_for(user)
+            data["refresh"] = str(refresh)
+
+        return data
+
@@ -0,0 +1,87 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from loan_app_backend.apps.common.caching import bump_versions
+from loan_app_backend.apps.common.signals import bulk_write
+from loan_app_backend.apps.loanapp import caching
+from loan_app_backend.apps.loanapp.authentication import USER_CLAIMS, publish_user_snapshot
+from loan_app_backend.apps.loanapp.fraud import adjust_email_domain_count, adjust_loan_velocity
+from loan_app_backend.apps.loanapp.models import FraudFlag, LoanApplication, Users
+
+
+@receiver(post_init, sender=Users)
+def remember_email_domain(sender, instance, **kwargs):
+    # Read from __dict__ so a deferred column is not loaded just to remember it.
+    instance._loaded_email_domain = instance.__dict__.get('email_domain')
+    instance._loaded_claims = {claim: instance.__dict__.get(claim) for claim in USER_CLAIMS}
+
+
+@receiver(post_save, sender=Users)
+def count_user_email_domain(sender, instance, created, **kwargs):
+    domain = instance.__dict__.get('email_domain')
+    previous = instance._loaded_email_domain
+    if created:
+        adjust_email_domain_count(domain, 1)
+    elif previous and domain and previous != domain:
+        adjust_email_domain_count(previous, -1)
+        adjust_email_domain_count(domain, 1)
+    instance._loaded_email_domain = domain
+
+
+@receiver(post_delete, sender=Users)
+def uncount_user_email_domain(sender, instance, **kwargs):
+    adjust_email_domain_count(instance._loaded_email_domain, -1)
+
+
+@receiver(post_save, sender=Users)
+def publish_user_claims(sender, instance, created, **kwargs):
+    # Tokens carry these fields as claims; publish changes so ClaimsJWTAuthentication stops trusting old ones.
+    claims = {claim: instance.__dict__.get(claim) for claim in USER_CLAIMS}
+    if not created and claims != instance._loaded_claims:
+        if None in claims.values():
+            claims = Users.objects.values(*USER_CLAIMS).get(pk=instance.pk)
+        publish_user_snapshot(instance.pk, claims)
+    instance._loaded_claims = claims
+
+
+@receiver(post_delete, sender=Users)
+def revoke_user_claims(sender, instance, **kwargs):
+    publish_user_snapshot(instance.pk, {'deleted': True})
+
+
+@receiver(post_save, sender=LoanApplication)
+def count_loan_velocity(sender, instance, created, **kwargs):
+    if created:
+        adjust_loan_velocity(instance.user_id, instance.created_at, 1)
+
+
+@receiver(post_delete, sender=LoanApplication)
+def uncount_loan_velocity(sender, instance, **kwargs):
+    adjust_loan_velocity(instance.user_id, instance.created_at, -1)
+
+
+@receiver(post_save, sender=LoanApplication)
+@receiver(post_delete, sender=LoanApplication)
+def invalidate_loan_responses(sender, instance, **kwargs):
+    bump_versions(caching.LOANS, caching.user_loans(instance.user_id))
+
+
+@receiver(bulk_write, sender=LoanApplication)
+def invalidate_bulk_loan_responses(sender, objs, **kwargs):
+    if objs is None:
+        bump_versions(caching.LOANS, caching.LOANS_BULK)
+    else:
+        bump_versions(caching.LOANS, *{caching.user_loans(loan.user_id) for loan in objs})
+
+
+@receiver(post_save, sender=FraudFlag)
+@receiver(post_delete, sender=FraudFlag)
+@receiver(bulk_write, sender=FraudFlag)
+def invalidate_fraud_flag_responses(sender, **kwargs):
+    bump_versions(caching.FRAUD_FLAGS)
+
+
+@receiver(post_save, sender=Users)
+@receiver(post_delete, sender=Users)
+@receiver(bulk_write, sender=Users)
+def invalidate_user_responses(sender, **kwargs):
+    bump_versions(caching.USERS)
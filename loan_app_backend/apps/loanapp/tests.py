@@ -1,7 +1,45 @@
+from unittest import mock
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from smtplib import SMTPException
+from rest_framework.mixins import ListModelMixin
 from rest_framework.test import APITestCase
-from django.urls import reverse
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.core.cache import cache
+from django.core.management import call_command
+from django.conf import settings
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, resolve, reverse
 from django.utils import timezone
-from loan_app_backend.apps.loanapp.models import LoanApplication, FraudFlag, Users
+from loan_app_backend.apps.common.testing import QueryBudgetMixin, QueryPlanAssertionsMixin
+from loan_app_backend.apps.loanapp import urls as loanapp_urls
+from loan_app_backend.apps.loanapp.activation import (
+    CODE_EXPIRED, CODE_INVALID, CODE_VALID, consume_code, hash_code, issue_code, sweep_expired_codes
+)
+from loan_app_backend.apps.loanapp.authentication import ClaimsRefreshToken, _local_snapshots, purge_expired_tokens
+from loan_app_backend.apps.loanapp.emails import BlockedUserEmail, PasswordResetEmail, TemplatedEmail
+from loan_app_backend.apps.loanapp.fraud import FraudContext, rebuild_fraud_counters
+from loan_app_backend.apps.loanapp.export import loan_rows
+from loan_app_backend.apps.loanapp.hashers import password_hashers
+from loan_app_backend.apps.loanapp.loan_import import import_loans, read_rows
+from loan_app_backend.apps.loanapp.models import (
+    ActivationCode, LoanApplication, FraudFlag, Users, EmailDomainStats, OutboundEmail
+)
+from loan_app_backend.apps.loanapp.outbox import enqueue_email, process_outbox
+import asyncio
+import base64
+import csv
+import datetime
+import importlib.util
+import io
+import json
+import os
+import tempfile
+import types
 import uuid
 
 
@@ -14,6 +52,7 @@ class LoanApplicationTest(APITestCase):
         )
         self.client.login(email='testuser@example.com', password='pass1234')
         self.url = reverse('loan-application')
+        cache.clear()
 
     def test_successful_loan_application(self):
         payload = {
@@ -80,3 +119,972 @@ class LoanApplicationTest(APITestCase):
         loan = LoanApplication.objects.latest('created_at')
         self.assertEqual(loan.status, 'flagged')
         self.assertTrue(FraudFlag.objects.filter(loan_application=loan, reason__icontains="Email domain").exists())
+
+    def test_every_matched_rule_is_flagged(self):
+        for _ in range(3):
+            LoanApplication.objects.create(user=self.user, amount_requested=100000, purpose="Test")
+
+        payload = {
+            "amount_requested": 6000000,
+            "purpose": "Expensive equipment"
+        }
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(self.url, data=payload)
+
+        self.assertEqual(response.status_code, 201)
+        loan = LoanApplication.objects.latest('created_at')
+        self.assertEqual(loan.status, 'flagged')
+        self.assertEqual(
+            set(loan.fraud_flags.values_list('reason', flat=True)),
+            {"More than 3 loans in 24 hours", "Amount exceeds NGN 5,000,000"}
+        )
+
+
+class FraudCounterTest(APITestCase):
+    def setUp(self):
+        self.user = Users.objects.create_user(
+            username=f'user_{uuid.uuid4().hex[:8]}',
+            email='counter@Example.com',
+            password='pass1234'
+        )
+
+    def test_loan_velocity_follows_creates_and_deletes(self):
+        loans = [
+            LoanApplication.objects.create(user=self.user, amount_requested=1000, purpose="Test")
+            for _ in range(3)
+        ]
+        self.assertEqual(FraudContext(self.user, 1000).recent_loan_count, 3)
+
+        loans[0].delete()
+        self.assertEqual(FraudContext(self.user, 1000).recent_loan_count, 2)
+
+    def test_loan_velocity_window_is_exactly_24_hours(self):
+        now = timezone.now()
+        ages = [
+            datetime.timedelta(hours=24, minutes=5),  # In the oldest bucket, but outside the window.
+            datetime.timedelta(hours=23, minutes=55),
+            datetime.timedelta(hours=1),
+        ]
+        for age in ages:
+            loan = LoanApplication.objects.create(user=self.user, amount_requested=1000, purpose="Test")
+            LoanApplication.objects.filter(pk=loan.pk).update(created_at=now - age)
+        rebuild_fraud_counters()
+
+        context = FraudContext(self.user, 1000, now=now)
+        self.assertEqual(context.recent_loan_count, 2)
+        self.assertEqual(FraudContext.prefetch([FraudContext(self.user, 1000, now=now)])[0].recent_loan_count, 2)
+        self.assertEqual(async_to_sync(FraudContext(self.user, 1000, now=now).aload)().recent_loan_count, 2)
+
+    def test_email_domain_column_is_normalized(self):
+        self.assertEqual(self.user.email_domain, 'example.com')
+
+        self.user.email = 'counter@Sub.Example.ORG'
+        self.user.save(update_fields=['email'])
+        self.assertEqual(Users.objects.get(pk=self.user.pk).email_domain, 'sub.example.org')
+
+    def test_email_domain_follows_user_changes(self):
+        self.assertEqual(EmailDomainStats.objects.get(domain='example.com').user_count, 1)
+
+        self.user.email = 'counter@other.org'
+        self.user.save()
+        self.assertEqual(EmailDomainStats.objects.get(domain='example.com').user_count, 0)
+        self.assertEqual(EmailDomainStats.objects.get(domain='other.org').user_count, 1)
+
+        self.user.delete()
+        self.assertEqual(EmailDomainStats.objects.get(domain='other.org').user_count, 0)
+
+    def test_rebuild_matches_maintained_counters(self):
+        LoanApplication.objects.create(user=self.user, amount_requested=1000, purpose="Test")
+        rebuild_fraud_counters()
+
+        self.assertEqual(EmailDomainStats.objects.get(domain='example.com').user_count, 1)
+        self.assertEqual(FraudContext(self.user, 1000).recent_loan_count, 1)
+
+
+class LoanQueryPlanTest(QueryPlanAssertionsMixin, APITestCase):
+    table = 'loanapp_loanapplication'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Users.objects.create_user(
+            username='plan_admin', email='admin@plans.test', password='pass1234', is_staff=True
+        )
+        users = Users.objects.bulk_create([
+            Users(username=f'plan_{i}', email=f'plan_{i}@plans{i % 7}.test', password='!')
+            for i in range(50)
+        ])
+        statuses = [choice for choice, _ in LoanApplication.STATUS_CHOICES]
+        LoanApplication.objects.bulk_create([
+            LoanApplication(user=user, amount_requested=1000 * (i + 1), purpose="Seed", status=statuses[i % 4])
+            for user in users for i in range(20)
+        ])
+        cls.user = users[0]
+
+    def setUp(self):
+        self.analyze()
+
+    def assertEndpointUsesIndex(self, url, user, params=None):
+        self.client.force_authenticate(user=user)
+        response, queries = self.capture_queries(self.client.get, url, params or {})
+        self.assertEqual(response.status_code, 200)
+        self.assertUsesIndex(self.find_query(queries, self.table), self.table)
+
+    def test_user_loan_list_uses_index(self):
+        self.assertEndpointUsesIndex(reverse('loan-application'), self.user)
+
+    def test_user_loans_in_window_uses_index(self):
+        queryset = LoanApplication.objects.filter(
+            user=self.user, created_at__gte=timezone.now() - datetime.timedelta(hours=24)
+        )
+        _, queries = self.capture_queries(list, queryset)
+        self.assertUsesIndex(self.find_query(queries, self.table, contains='created_at'), self.table)
+
+    def test_admin_loan_list_uses_index(self):
+        self.assertEndpointUsesIndex(reverse('admin-loan-list'), self.admin)
+
+    def test_admin_loan_list_by_status_uses_index(self):
+        self.assertEndpointUsesIndex(reverse('admin-loan-list'), self.admin, {'status': 'flagged'})
+
+
+class ListEndpointQueryBudgetTest(QueryBudgetMixin, APITestCase):
+    # Every list endpoint in loanapp.urls must declare a budget here.
+    QUERY_BUDGETS = {
+        'loan-application': 2,  # COUNT + page
+        'admin-user-list': 2,  # COUNT + page
+        'admin-loan-list': 2,  # COUNT + page joined with users
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Users.objects.create_user(
+            username='budget_admin', email='admin@budget.test', password='pass1234', is_staff=True
+        )
+        users = Users.objects.bulk_create([
+            Users(username=f'budget_{i}', email=f'budget_{i}@budget.test', password='!') for i in range(30)
+        ])
+        LoanApplication.objects.bulk_create([
+            LoanApplication(user=user, amount_requested=1000, purpose="Seed") for user in users
+        ])
+        LoanApplication.objects.bulk_create([
+            LoanApplication(user=cls.admin, amount_requested=1000, purpose="Seed") for _ in range(30)
+        ])
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.admin)
+        cache.clear()  # Budgets are for uncached responses.
+
+    def test_every_list_endpoint_has_a_budget(self):
+        list_endpoints = {
+            pattern.name for pattern in loanapp_urls.urlpatterns
+            if issubclass(getattr(pattern.callback, 'view_class', object), ListModelMixin)
+        }
+        self.assertEqual(list_endpoints, set(self.QUERY_BUDGETS))
+
+    def test_list_endpoints_stay_within_budget(self):
+        for name, budget in self.QUERY_BUDGETS.items():
+            with self.subTest(endpoint=name):
+                self.assertQueryBudget(budget, reverse(name))
+
+
+class CursorPaginationTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Users.objects.create_user(username='cursor_user', email='cursor@example.com', password='pass1234')
+        cls.loans = [
+            LoanApplication.objects.create(user=cls.user, amount_requested=1000 + i, purpose="Seed")
+            for i in range(25)
+        ]
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def get_page(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['response_data']
+
+    def test_cursor_pages_walk_forward_and_back(self):
+        newest_first = sorted((loan.id for loan in self.loans), reverse=True)
+
+        with self.assertNumQueries(1):
+            first = self.get_page(reverse('loan-application'), {'pagination': 'cursor', 'page_size': 10})
+        self.assertNotIn('count', first)
+        self.assertIsNone(first['previous'])
+        self.assertEqual([row['id'] for row in first['results']], newest_first[:10])
+
+        second = self.get_page(first['next'])
+        self.assertEqual([row['id'] for row in second['results']], newest_first[10:20])
+
+        third = self.get_page(second['next'])
+        self.assertEqual([row['id'] for row in third['results']], newest_first[20:])
+        self.assertIsNone(third['next'])
+
+        back = self.get_page(third['previous'])
+        self.assertEqual([row['id'] for row in back['results']], newest_first[10:20])
+
+    def test_page_number_mode_is_unchanged(self):
+        page = self.get_page(reverse('loan-application'), {'page': 2, 'page_size': 10})
+        self.assertEqual(page['count'], 25)
+        self.assertFalse(page['count_is_approximate'])
+        self.assertEqual(len(page['results']), 10)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse('loan-application'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+        for position in ('not-a-ulid', self.loans[0].id[:-1]):
+            cursor = base64.urlsafe_b64encode(f'next:{position}'.encode()).decode()
+            response = self.client.get(reverse('loan-application'), {'cursor': cursor})
+            self.assertEqual(response.status_code, 404)
+            self.assertEqual(response.json()['response_description'], "Invalid cursor.")
+
+
+@override_settings(EMAIL_OUTBOX={'MAX_ATTEMPTS': 2, 'RETRY_DELAY': 30})
+class OutboxTest(APITestCase):
+    def test_registration_queues_email_for_the_worker(self):
+        response = self.client.post(reverse('register'), {
+            'first_name': 'Ada', 'last_name': 'Obi', 'email': 'ada@example.com', 'password': 'pass12345',
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(mail.outbox), 0)
+
+        call_command('send_queued_emails', stdout=mock.MagicMock())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['ada@example.com'])
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+        self.assertEqual(OutboundEmail.objects.get().status, 'sent')
+
+    def test_batch_is_sent_over_one_connection(self):
+        for i in range(3):
+            enqueue_email("Notice", [f'user{i}@example.com'], body="Hello")
+
+        with mock.patch('loan_app_backend.apps.loanapp.outbox.get_connection', wraps=mail.get_connection) as connect:
+            self.assertEqual(process_outbox(), (3, 0, 0))
+        self.assertEqual(connect.call_count, 1)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(process_outbox(), (0, 0, 0))
+
+    def test_failures_are_retried_with_backoff_then_given_up(self):
+        email = enqueue_email("Notice", ['user@example.com'], body="Hello")
+        connection = mock.MagicMock()
+        connection.send_messages.side_effect = SMTPException("mailbox unavailable")
+
+        with mock.patch('loan_app_backend.apps.loanapp.outbox.get_connection', return_value=connection):
+            self.assertEqual(process_outbox(), (0, 1, 0))
+            email.refresh_from_db()
+            self.assertEqual((email.status, email.attempts), ('queued', 1))
+            self.assertGreater(email.next_attempt_at, timezone.now() + datetime.timedelta(seconds=25))
+            self.assertIn("mailbox unavailable", email.last_error)
+
+            self.assertEqual(process_outbox(), (0, 0, 0))  # Not due yet.
+            OutboundEmail.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(process_outbox(), (0, 0, 1))
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('failed', 2))
+
+
+class TemplatedEmailTest(APITestCase):
+    def test_templates_are_compiled_once_per_process(self):
+        for email_class in TemplatedEmail.__subclasses__():
+            self.assertIn(email_class.html_email_template_name, TemplatedEmail._templates)
+
+        with mock.patch('loan_app_backend.apps.loanapp.emails.get_template') as load:
+            PasswordResetEmail({'full_name': 'Ada Obi', 'reset_code': '123456'}).send(['ada@example.com'])
+        load.assert_not_called()
+        self.assertIn('123456', OutboundEmail.objects.get().html_body)
+
+    def test_send_many_queues_in_one_insert(self):
+        with self.assertNumQueries(1):
+            BlockedUserEmail.send_many(
+                ({'full_name': f'User {i}'}, [f'user{i}@example.com']) for i in range(5)
+            )
+        self.assertEqual(process_outbox(), (5, 0, 0))
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [f'user{i}@example.com' for i in range(5)])
+        self.assertIn('User 3', next(m for m in mail.outbox if m.to == ['user3@example.com']).alternatives[0][0])
+
+
+class ClaimsAuthenticationTest(APITestCase):
+    def setUp(self):
+        self.user = Users.objects.create_user(
+            username=f'user_{uuid.uuid4().hex[:8]}', email='claims@example.com', password='pass1234'
+        )
+        LoanApplication.objects.create(user=self.user, amount_requested=1000, purpose="Test")
+        cache.clear()
+
+    def authenticate(self, token_class=ClaimsRefreshToken):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token_class.for_user(self.user).access_token}')
+
+    def test_authenticated_requests_do_not_load_the_user(self):
+        self.authenticate()
+        with self.assertNumQueries(1):  # The user's claims, once, until they change.
+            self.assertEqual(self.client.get(reverse('admin-user-list')).status_code, 403)
+        with self.assertNumQueries(2):  # COUNT and page of loans only.
+            response = self.client.get(reverse('loan-application'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_tokens_without_claims_still_authenticate(self):
+        self.authenticate(RefreshToken)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('loan-application'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_claim_changes_apply_to_issued_tokens(self):
+        self.authenticate()
+        self.assertEqual(self.client.get(reverse('admin-user-list')).status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('admin-user-list')).status_code, 200)
+
+        Users.objects.get(pk=self.user.pk).delete()
+        self.assertEqual(self.client.get(reverse('loan-application')).status_code, 401)
+
+    def test_deactivated_user_is_rejected(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save(update_fields=['is_active'])
+        self.assertEqual(self.client.get(reverse('loan-application')).status_code, 401)
+
+    def test_revocation_survives_losing_the_cached_snapshot(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save(update_fields=['is_active'])
+        cache.clear()
+        _local_snapshots.clear()
+        self.assertEqual(self.client.get(reverse('loan-application')).status_code, 401)
+
+    def test_profile_and_loan_creation_still_see_the_full_user(self):
+        self.authenticate()
+        response = self.client.get(reverse('user-profile'))
+        self.assertEqual(response.json()['response_data']['email'], 'claims@example.com')
+
+        response = self.client.post(reverse('loan-application'), {"amount_requested": 1000, "purpose": "Test"})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(LoanApplication.objects.filter(user=self.user).count(), 2)
+
+
+class TokenRefreshTest(APITestCase):
+    def setUp(self):
+        self.user = Users.objects.create_user(
+            username=f'user_{uuid.uuid4().hex[:8]}', email='refresh@example.com', password='pass1234'
+        )
+        self.refresh = str(ClaimsRefreshToken.for_user(self.user))
+        cache.clear()
+
+    def refresh_token(self, token):
+        return self.client.post(reverse('token_refresh'), {'refresh': token})
+
+    def test_rotation_runs_a_fixed_number_of_queries(self):
+        with self.assertNumQueries(6):  # user, outstanding id, savepoint + blacklist insert + release, new outstanding
+            response = self.refresh_token(self.refresh)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(BlacklistedToken.objects.filter(token__jti=RefreshToken(self.refresh, verify=False)['jti']).exists())
+        self.assertEqual(self.refresh_token(response.data['refresh']).status_code, 200)
+
+    def test_replayed_token_is_rejected(self):
+        self.assertEqual(self.refresh_token(self.refresh).status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.refresh_token(self.refresh).status_code, 401)
+
+        cache.clear()
+        with mock.patch.dict('loan_app_backend.apps.loanapp.authentication._blacklisted_jtis', clear=True):
+            self.assertEqual(self.refresh_token(self.refresh).status_code, 401)
+
+    def test_refreshed_tokens_carry_current_claims(self):
+        self.user.is_staff = True
+        self.user.save()
+        response = self.refresh_token(self.refresh)
+        self.assertTrue(AccessToken(response.data['access'])['is_staff'])
+
+    def test_purge_removes_only_expired_tokens(self):
+        expired = [
+            OutstandingToken.objects.create(jti=f'expired-{i}', token='x', expires_at=timezone.now() - datetime.timedelta(hours=1))
+            for i in range(5)
+        ]
+        BlacklistedToken.objects.create(token=expired[0])
+        self.assertEqual(purge_expired_tokens(chunk_size=2), 5)
+        self.assertEqual(OutstandingToken.objects.count(), 1)
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+
+class LoginTest(APITestCase):
+    def setUp(self):
+        self.user = Users.objects.create_user(username='ada_login', email='ada@example.com', password='pass1234')
+        cache.clear()
+
+    def login(self, email_or_username, password='pass1234'):
+        return self.client.post(reverse('login'), {'email_or_username': email_or_username, 'password': password})
+
+    def test_login_resolves_the_user_in_one_query(self):
+        for key in ('ada@example.com', 'ada_login'):
+            with self.subTest(key=key), self.assertNumQueries(2):  # The user, then the outstanding refresh token.
+                response = self.login(key)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['response_data']['user']['email'], 'ada@example.com')
+
+    def test_wrong_password_and_unknown_user_are_rejected(self):
+        self.assertEqual(self.login('ada@example.com', 'wrong-password').status_code, 400)
+        self.assertEqual(self.login('nobody@example.com').status_code, 400)
+
+    def test_email_match_wins_over_another_users_username(self):
+        Users.objects.create_user(username='ada@example.com', email='other@example.com', password='other1234')
+        self.assertEqual(self.login('ada@example.com').status_code, 200)
+
+    def test_hash_is_upgraded_to_the_policy_on_login(self):
+        with self.settings(PASSWORD_HASHERS=password_hashers('pbkdf2_sha256'), PASSWORD_HASHER_POLICY={'PBKDF2_ITERATIONS': 1000}):
+            self.user.set_password('pass1234')
+            self.user.save()
+        self.assertTrue(Users.objects.get(pk=self.user.pk).password.startswith('pbkdf2_sha256$1000$'))
+
+        with self.settings(PASSWORD_HASHER_POLICY={'SCRYPT_WORK_FACTOR': 2**12}):
+            self.assertEqual(self.login('ada_login').status_code, 200)
+            self.assertTrue(Users.objects.get(pk=self.user.pk).password.startswith('scrypt$4096$'))
+
+            with self.assertNumQueries(2):  # Up to date: no rehash on the next login.
+                self.assertEqual(self.login('ada_login').status_code, 200)
+
+
+class AuthEndpointQueryCountTest(APITestCase):
+    """Exact query counts of the auth endpoints, so a lookup added twice shows up as a failure."""
+
+    def setUp(self):
+        self.user = Users.objects.create_user(username='ada_auth', email='ada@example.com', password='pass1234')
+        cache.clear()
+
+    def create_code(self, purpose):
+        return ActivationCode.objects.create(
+            user=self.user, code_hash=hash_code(self.user.pk, purpose, '123456'), purpose=purpose,
+            expires_at=timezone.now() + datetime.timedelta(minutes=5),
+        )
+
+    def test_register(self):
+        with self.assertNumQueries(6):
+            response = self.client.post(reverse('register'), {
+                'first_name': 'Obi', 'last_name': 'Ada', 'email': 'new@example.com', 'password': 'pass12345',
+            })
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Users.objects.get(email='new@example.com').username.startswith('user_'))
+
+    def test_register_existing_email(self):
+        with self.assertNumQueries(1):
+            response = self.client.post(reverse('register'), {
+                'first_name': 'Obi', 'last_name': 'Ada', 'email': 'ada@example.com', 'password': 'pass12345',
+            })
+        self.assertEqual(response.status_code, 400)
+
+    def test_activate(self):
+        self.user.is_active = False
+        self.user.save()
+        self.create_code('activation')
+        with self.assertNumQueries(4):
+            response = self.client.post(reverse('activate-user'), {'email': 'ada@example.com', 'code': '123456'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_resend_activation_code(self):
+        with self.assertNumQueries(3):
+            response = self.client.post(
+                reverse('activate-user'), {'email': 'ada@example.com', 'code': '000000', 'resend_code': True}
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_forgot_password(self):
+        with self.assertNumQueries(3):
+            response = self.client.post(reverse('forgot-password'), {'email': 'ada@example.com'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_reset_password(self):
+        self.create_code('reset')
+        with self.assertNumQueries(3):
+            response = self.client.post(reverse('reset-password'), {
+                'email': 'ada@example.com', 'code': '123456', 'new_password': 'N3w-passphrase!',
+            })
+        self.assertEqual(response.status_code, 200)
+
+
+class ActivationCodeTest(APITestCase):
+    def setUp(self):
+        self.user = Users.objects.create_user(username='ada_code', email='ada@example.com', password='pass1234')
+
+    def test_issue_replaces_code_in_place(self):
+        first = issue_code(self.user, 'activation')
+        with self.assertNumQueries(1):
+            second = issue_code(self.user, 'activation')
+        issue_code(self.user, 'reset')
+
+        self.assertEqual(ActivationCode.objects.filter(user=self.user).count(), 2)
+        stored = ActivationCode.objects.get(user=self.user, purpose='activation')
+        self.assertEqual(stored.code_hash, hash_code(self.user.pk, 'activation', second))
+        self.assertNotIn(second, stored.code_hash)
+        if first != second:
+            self.assertEqual(consume_code(self.user, 'activation', first), CODE_INVALID)
+
+    def test_code_is_single_use(self):
+        code = issue_code(self.user, 'reset')
+        self.assertEqual(consume_code(self.user, 'activation', code), CODE_INVALID)
+        with self.assertNumQueries(1):
+            self.assertEqual(consume_code(self.user, 'reset', code), CODE_VALID)
+        self.assertEqual(consume_code(self.user, 'reset', code), CODE_INVALID)
+
+    def test_expired_code(self):
+        code = issue_code(self.user, 'activation', lifetime=-datetime.timedelta(seconds=1))
+        self.assertEqual(consume_code(self.user, 'activation', code), CODE_EXPIRED)
+        self.assertFalse(ActivationCode.objects.exists())
+
+    def test_sweep_deletes_only_expired_codes(self):
+        users = [
+            Users.objects.create_user(username=f'ada_code_{i}', email=f'ada{i}@example.com', password='!')
+            for i in range(5)
+        ]
+        for user in users:
+            issue_code(user, 'activation', lifetime=-datetime.timedelta(minutes=1))
+        issue_code(self.user, 'activation')
+
+        with self.assertNumQueries(6):  # Three batches of at most two rows; the short one ends the sweep.
+            self.assertEqual(sweep_expired_codes(batch_size=2), 5)
+        self.assertEqual(list(ActivationCode.objects.values_list('user', flat=True)), [self.user.pk])
+
+        call_command('sweep_activation_codes', stdout=io.StringIO())
+        self.assertEqual(ActivationCode.objects.count(), 1)
+
+
+def throttle_rates(**rates):
+    """override_settings() for REST_FRAMEWORK with the given throttle rates."""
+    return override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {**settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], **rates},
+    })
+
+
+class ThrottlingTest(APITestCase):
+    def setUp(self):
+        self.user = Users.objects.create_user(username='ada_throttle', email='ada@example.com', password='pass1234')
+        cache.clear()
+
+    def login(self, email_or_username, password='wrong-password', ip='10.0.0.1'):
+        return self.client.post(
+            reverse('login'), {'email_or_username': email_or_username, 'password': password}, REMOTE_ADDR=ip
+        )
+
+    @throttle_rates(login_account='2/min')
+    def test_login_is_limited_per_account_and_client_ip(self):
+        self.assertEqual(self.login('ada@example.com').status_code, 400)
+        self.assertEqual(self.login('ADA@example.com ').status_code, 400)
+
+        with self.assertNumQueries(0):  # Rejected before the user lookup and password hashing.
+            response = self.login('ada@example.com', password='pass1234')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json()['response_status'], 'error')
+        self.assertGreater(int(response['Retry-After']), 0)
+
+        self.assertEqual(self.login('someone@example.com').status_code, 400)
+        # Someone else hammering the account doesn't lock its owner out.
+        self.assertEqual(self.login('ada@example.com', password='pass1234', ip='10.0.0.2').status_code, 200)
+
+    @throttle_rates(login='2/min')
+    def test_login_is_limited_per_client_ip(self):
+        self.login('a@example.com')
+        self.login('b@example.com')
+        self.assertEqual(self.login('c@example.com').status_code, 429)
+        self.assertEqual(self.login('c@example.com', ip='10.0.0.2').status_code, 400)
+
+    @throttle_rates(password_reset_account='1/hour')
+    def test_forgot_password_is_limited_before_sending_email(self):
+        self.assertEqual(self.client.post(reverse('forgot-password'), {'email': 'ada@example.com'}).status_code, 200)
+        response = self.client.post(reverse('forgot-password'), {'email': 'ada@example.com'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(OutboundEmail.objects.count(), 1)
+
+    @throttle_rates(loans='1/min')
+    def test_loans_are_limited_per_user(self):
+        other = Users.objects.create_user(username='obi_throttle', email='obi@example.com', password='pass1234')
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(reverse('loan-application')).status_code, 200)
+        self.assertEqual(self.client.get(reverse('loan-application')).status_code, 429)
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get(reverse('loan-application')).status_code, 200)
+
+    @throttle_rates(admin_loans='1/min')
+    def test_admin_bulk_endpoints_have_their_own_limit(self):
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(reverse('admin-loan-export')).status_code, 200)
+        self.assertEqual(self.client.get(reverse('admin-loan-export')).status_code, 429)
+        self.assertEqual(self.client.get(reverse('admin-loan-list')).status_code, 200)
+
+
+class ResponseCacheTest(APITestCase):
+    def setUp(self):
+        self.user = Users.objects.create_user(username='ada_cache', email='ada@example.com', password='pass1234')
+        self.other = Users.objects.create_user(username='obi_cache', email='obi@example.com', password='pass1234')
+        self.admin = Users.objects.create_user(
+            username='admin_cache', email='admin@example.com', password='pass1234', is_staff=True
+        )
+        self.loan = LoanApplication.objects.create(user=self.user, amount_requested=1000, purpose="Rent")
+        cache.clear()
+
+    def get(self, user, name, **headers):
+        self.client.force_authenticate(user)
+        return self.client.get(reverse(name), **headers)
+
+    def statuses(self, response):
+        return [loan['status'] for loan in response.json()['response_data']['results']]
+
+    def test_repeated_list_is_served_from_cache(self):
+        first = self.get(self.user, 'loan-application')
+        with self.assertNumQueries(0):
+            second = self.get(self.user, 'loan-application')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertIn('private', second['Cache-Control'])
+
+        # Another user's loan leaves this user's cached list alone.
+        LoanApplication.objects.create(user=self.other, amount_requested=500, purpose="Fees")
+        with self.assertNumQueries(0):
+            self.get(self.user, 'loan-application')
+
+    def test_conditional_requests(self):
+        response = self.get(self.user, 'loan-application')
+        not_modified = self.get(self.user, 'loan-application', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b'')
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+
+        self.assertNotIn('Last-Modified', response)
+        since = self.get(self.user, 'loan-application', HTTP_IF_MODIFIED_SINCE='Sun, 18 Oct 2099 00:00:00 GMT')
+        self.assertEqual(since.status_code, 200)
+
+        LoanApplication.objects.create(user=self.user, amount_requested=500, purpose="Fees")
+        changed = self.get(self.user, 'loan-application', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()['response_data']['count'], 2)
+
+    @override_settings(RESPONSE_CACHE={'ALLOW_LOCAL_CACHE': False})
+    def test_process_local_cache_is_not_used_in_production(self):
+        self.get(self.user, 'loan-application')
+        with self.assertNumQueries(2):
+            self.get(self.user, 'loan-application')
+
+    def test_keys_include_filters_and_page(self):
+        self.assertEqual(self.statuses(self.get(self.user, 'loan-application')), ['pending'])
+        self.client.force_authenticate(self.user)
+        response = self.client.get(reverse('loan-application'), {'status': 'approved'})
+        self.assertEqual(self.statuses(response), [])
+
+    def test_saves_and_bulk_updates_invalidate(self):
+        self.assertEqual(self.statuses(self.get(self.admin, 'admin-loan-list')), ['pending'])
+        self.assertEqual(self.statuses(self.get(self.user, 'loan-application')), ['pending'])
+
+        LoanApplication.objects.filter(pk=self.loan.pk).update(status='approved')
+        self.assertEqual(self.statuses(self.get(self.admin, 'admin-loan-list')), ['approved'])
+        self.assertEqual(self.statuses(self.get(self.user, 'loan-application')), ['approved'])
+
+        self.loan.status = 'rejected'
+        self.loan.save()
+        self.assertEqual(self.statuses(self.get(self.admin, 'admin-loan-list')), ['rejected'])
+
+        self.user.email = 'ada.new@example.com'
+        self.user.save()
+        response = self.get(self.admin, 'admin-loan-list')
+        self.assertEqual(response.json()['response_data']['results'][0]['user']['email'], 'ada.new@example.com')
+
+        Users.objects.bulk_create([Users(username='new_cache', email='new@example.com', password='!')])
+        self.assertEqual(self.get(self.admin, 'admin-user-list').json()['response_data']['count'], 4)
+
+
+class AdminBulkLoanStatusTest(APITestCase):
+    def setUp(self):
+        self.admin = Users.objects.create_user(
+            username='admin_bulk', email='admin@example.com', password='pass1234', is_staff=True
+        )
+        self.user = Users.objects.create_user(username='ada_bulk', email='ada@example.com', password='pass1234')
+        self.loans = [
+            LoanApplication.objects.create(user=self.user, amount_requested=1000, purpose="Rent", status='flagged')
+            for _ in range(4)
+        ]
+        self.url = reverse('admin-loan-bulk-update')
+        self.client.force_authenticate(self.admin)
+        cache.clear()
+
+    def test_updates_are_grouped_by_status(self):
+        updates = [
+            {'id': self.loans[0].pk, 'status': 'approved'},
+            {'id': self.loans[1].pk, 'status': 'rejected'},
+            {'id': self.loans[2].pk, 'status': 'approved'},
+            {'id': self.loans[3].pk, 'status': 'flagged'},
+            {'id': 'missing', 'status': 'approved'},
+        ]
+        # SAVEPOINT, SELECT ... FOR UPDATE, one UPDATE per target status, RELEASE SAVEPOINT.
+        with self.assertNumQueries(5):
+            response = self.client.post(self.url, {'updates': updates}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        data = response.json()['response_data']
+        self.assertEqual(data['updated'], 3)
+        self.assertEqual(
+            [(result['result'], result['previous_status']) for result in data['results']],
+            [('updated', 'flagged'), ('updated', 'flagged'), ('updated', 'flagged'), ('unchanged', 'flagged'),
+             ('not_found', None)],
+        )
+
+        loans = {loan.pk: loan for loan in LoanApplication.objects.all()}
+        self.assertEqual(
+            [loans[loan.pk].status for loan in self.loans], ['approved', 'rejected', 'approved', 'flagged']
+        )
+        self.assertEqual(loans[self.loans[0].pk].updated_by_id, self.admin.pk)
+        self.assertGreater(loans[self.loans[0].pk].updated_at, self.loans[0].updated_at)
+        self.assertIsNone(loans[self.loans[3].pk].updated_by_id)
+
+    def test_invalid_requests(self):
+        for updates in (
+            [],
+            [{'id': self.loans[0].pk, 'status': 'unknown'}],
+            [{'id': self.loans[0].pk, 'status': 'approved'}, {'id': self.loans[0].pk, 'status': 'rejected'}],
+            [{'id': self.loans[0].pk, 'status': 'approved'}, {'id': self.loans[0].pk.lower(), 'status': 'rejected'}],
+        ):
+            with self.subTest(updates=updates):
+                response = self.client.post(self.url, {'updates': updates}, format='json')
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(LoanApplication.objects.exclude(status='flagged').exists())
+
+    def test_lower_case_ids_are_found(self):
+        response = self.client.post(
+            self.url, {'updates': [{'id': self.loans[0].pk.lower(), 'status': 'approved'}]}, format='json'
+        )
+        result = response.json()['response_data']['results'][0]
+        self.assertEqual((result['id'], result['result']), (self.loans[0].pk.lower(), 'updated'))
+        self.assertEqual(LoanApplication.objects.get(pk=self.loans[0].pk).status, 'approved')
+
+    def test_single_update_takes_the_string_id(self):
+        url = reverse('admin-loan-update', args=[self.loans[0].pk])
+        response = self.client.patch(url, {'status': 'approved'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['id'], self.loans[0].pk)
+        for missing in ('missing', '01' + 'Z' * 24):
+            with self.subTest(id=missing):
+                response = self.client.patch(reverse('admin-loan-update', args=[missing]), {'status': 'approved'})
+                self.assertEqual(response.status_code, 404)
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            self.url, {'updates': [{'id': self.loans[0].pk, 'status': 'approved'}]}, format='json'
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+class LoanImportTest(APITestCase):
+    def setUp(self):
+        self.user = Users.objects.create_user(username='ada_import', email='ada@example.com', password='pass1234')
+        self.admin = Users.objects.create_user(
+            username='admin_import', email='admin@example.org', password='pass1234', is_staff=True
+        )
+        cache.clear()
+
+    def row(self, amount=1000, email='ada@example.com'):
+        return {'email': email, 'amount_requested': str(amount), 'purpose': "Stock"}
+
+    def test_rows_are_validated_flagged_and_counted(self):
+        rows = [
+            self.row(), self.row(), self.row(),
+            self.row(),  # Fourth loan within 24 hours: velocity rule.
+            self.row(amount=6_000_000, email='admin@example.org'),
+            self.row(amount='lots'),
+            self.row(email='nobody@example.com'),
+            'not a row',
+        ]
+        result = import_loans(rows, batch_size=3)
+
+        self.assertEqual((result.created, result.flagged), (5, 2))
+        self.assertEqual([error['row'] for error in result.errors], [6, 7, 8])
+        self.assertIn('amount_requested', result.errors[0]['errors'])
+        self.assertEqual(
+            list(LoanApplication.objects.filter(user=self.user).order_by('id').values_list('status', flat=True)),
+            ['pending', 'pending', 'pending', 'flagged'],
+        )
+        self.assertEqual(
+            set(FraudFlag.objects.values_list('reason', flat=True)),
+            {"More than 3 loans in 24 hours", "Amount exceeds NGN 5,000,000"},
+        )
+        self.assertEqual(FraudContext(self.user, 1000).recent_loan_count, 4)
+        # Both flagged loans are in the second batch, which sends one alert for them.
+        self.assertEqual(OutboundEmail.objects.count(), 1)
+
+    def test_queries_do_not_grow_with_the_batch(self):
+        users = Users.objects.bulk_create([
+            Users(username=f'import_{i}', email=f'import_{i}@example.com', password='!') for i in range(40)
+        ])
+
+        def count_queries(rows):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(import_loans(rows, batch_size=100).created, len(rows))
+            return len(queries.captured_queries)
+
+        small = count_queries([self.row(email=user.email) for user in users[:10]])
+        self.assertEqual(count_queries([self.row(email=user.email) for user in users[10:]]), small)
+
+    def test_import_endpoint(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(reverse('admin-loan-import'), {'loans': [self.row(), {}]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()['response_data']
+        self.assertEqual((data['created'], data['rejected']), (1, 1))
+
+        upload = SimpleUploadedFile(
+            'loans.csv', b'\xef\xbb\xbfemail,amount_requested,purpose\nada@example.com,2500.50,Rent\n', 'text/csv'
+        )
+        response = self.client.post(reverse('admin-loan-import'), {'file': upload}, format='multipart')
+        self.assertEqual(response.json()['response_data']['created'], 1)
+        self.assertEqual(LoanApplication.objects.get(amount_requested='2500.50').created_by_id, self.admin.pk)
+
+        self.client.force_authenticate(self.user)
+        response = self.client.post(reverse('admin-loan-import'), {'loans': [self.row()]}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_command_streams_jsonl(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as jsonl:
+            jsonl.write(json.dumps(self.row()) + '\n\n{broken\n' + json.dumps(self.row()) + '\n')
+        self.addCleanup(os.remove, jsonl.name)
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command('import_loans', jsonl.name, '--acting-as', self.admin.email, stdout=stdout, stderr=stderr)
+        self.assertIn('Imported 2 loans', stdout.getvalue())
+        self.assertIn('rows/s', stdout.getvalue())
+        self.assertIn('Row 2:', stderr.getvalue())
+        self.assertEqual(set(LoanApplication.objects.values_list('created_by', 'updated_by')), {(self.admin.pk,) * 2})
+        self.assertEqual(list(read_rows(['email,purpose\n', 'a@b.c,Rent\n'], 'csv')), [{'email': 'a@b.c', 'purpose': 'Rent'}])
+
+
+class AdminExportTest(APITestCase):
+    def setUp(self):
+        self.admin = Users.objects.create_user(
+            username='admin_export', email='admin@example.com', password='pass1234', is_staff=True
+        )
+        self.user = Users.objects.create_user(username='ada_export', email='ada@example.com', password='pass1234')
+        self.loans = [
+            LoanApplication.objects.create(user=self.user, amount_requested=1000 + i, purpose="=SUM(A1)", status=status)
+            for i, status in enumerate(['pending', 'flagged', 'flagged', 'approved', 'pending'])
+        ]
+        FraudFlag.objects.create(loan_application=self.loans[1], reason="High amount")
+        FraudFlag.objects.create(loan_application=self.loans[1], reason="Velocity")
+        self.client.force_authenticate(self.admin)
+        self.admin_auth = f'Bearer {ClaimsRefreshToken.for_user(self.admin).access_token}'
+        cache.clear()
+
+    def export(self, name, **params):
+        response = self.client.get(reverse(name), params)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode('utf-8')
+
+    def test_loans_csv_honours_filters(self):
+        response, content = self.export('admin-loan-export', status='flagged')
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('attachment; filename="loans-', response['Content-Disposition'])
+
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual([row['id'] for row in rows], [self.loans[2].pk, self.loans[1].pk])
+        self.assertEqual(rows[1]['fraud_flags'], "High amount; Velocity")
+        self.assertEqual(rows[1]['user_email'], 'ada@example.com')
+        self.assertEqual(rows[1]['purpose'], "'=SUM(A1)")
+
+    def test_users_jsonl(self):
+        response, content = self.export('admin-user-export', export_format='jsonl')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        users = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual({user['email'] for user in users}, {'admin@example.com', 'ada@example.com'})
+        self.assertNotIn('password', users[0])
+
+    def test_flags_are_fetched_once_per_chunk(self):
+        with self.assertNumQueries(4):  # The loans, then one flag query for each chunk of two.
+            rows = list(loan_rows(LoanApplication.objects.order_by('created_at'), chunk_size=2))
+        self.assertEqual([len(row['fraud_flags']) for row in rows], [0, 2, 0, 0, 0])
+
+    async def test_streams_asynchronously_under_asgi(self):
+        response = await self.async_client.get(
+            reverse('admin-loan-export'), {'status': 'flagged'}, headers={'Authorization': self.admin_auth}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        content = b''.join([block async for block in response.streaming_content]).decode('utf-8')
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual([row['id'] for row in rows], [self.loans[2].pk, self.loans[1].pk])
+
+    def test_invalid_format_and_permissions(self):
+        response = self.client.get(reverse('admin-loan-export'), {'export_format': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(reverse('admin-loan-export')).status_code, 403)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'loans.jsonl')
+            call_command('export_data', 'loans', '--format', 'jsonl', '--output', path, '--filter', 'status=pending')
+            with open(path) as output:
+                loans = [json.loads(line) for line in output]
+        self.assertEqual({loan['id'] for loan in loans}, {self.loans[0].pk, self.loans[4].pk})
+        self.assertEqual(loans[0]['amount_requested'], '1004.00')
+
+
+def async_urlconf():
+    """The users API as asgi.py serves it: the URLconf built again with ASYNC_VIEWS on."""
+    spec = importlib.util.find_spec(loanapp_urls.__name__)
+    users_urls = importlib.util.module_from_spec(spec)
+    with override_settings(ASYNC_VIEWS=True):
+        spec.loader.exec_module(users_urls)
+    urlconf = types.ModuleType('async_urls')
+    urlconf.urlpatterns = [path('api/v1/users/', include(users_urls))]
+    return urlconf
+
+
+@override_settings(ROOT_URLCONF=async_urlconf())
+class AsyncViewTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [
+            Users.objects.create_user(
+                username=f'async{i}', email=f'async{i}@example.com', password='testpassword', is_active=True
+            )
+            for i in range(2)
+        ]
+        # Issuing a token writes an OutstandingToken, which async tests can't do directly.
+        self.auth = {user.pk: f'Bearer {ClaimsRefreshToken.for_user(user).access_token}' for user in self.users}
+
+    def submit(self, user, amount):
+        return self.async_client.post(
+            reverse('loan-application'), {'amount_requested': amount, 'purpose': "Async"},
+            content_type='application/json', headers={'Authorization': self.auth[user.pk]},
+        )
+
+    def test_views_are_native_async_views_only_under_asgi(self):
+        for name in ('login', 'user-profile', 'loan-application'):
+            self.assertTrue(iscoroutinefunction(resolve(reverse(name)).func), name)
+            # Under WSGI they run their sync handlers, without an event loop per request.
+            wsgi_view = resolve(reverse(name), urlconf='loan_app_backend.loan_app_backend.urls').func
+            self.assertFalse(iscoroutinefunction(wsgi_view), name)
+
+    async def test_concurrent_submissions_are_attributed_to_their_own_users(self):
+        responses = await asyncio.gather(*(self.submit(user, 1000) for user in self.users))
+        self.assertEqual([response.status_code for response in responses], [201, 201])
+
+        attribution = {loan.user_id: loan.updated_by_id async for loan in LoanApplication.objects.all()}
+        self.assertEqual(attribution, {user.pk: user.pk for user in self.users})
+
+    async def test_flagged_submission_from_a_token_user(self):
+        response = await self.submit(self.users[0], 6_000_000)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['response_data']['status'], 'flagged')
+
+        loan = await LoanApplication.objects.aget()
+        self.assertEqual(await FraudFlag.objects.filter(loan_application=loan).acount(), 1)
+        alert = await OutboundEmail.objects.aget()
+        self.assertIn(self.users[0].email, alert.body)
+
+    async def test_profile_round_trip(self):
+        headers = {'Authorization': self.auth[self.users[0].pk]}
+        response = await self.async_client.patch(
+            reverse('user-profile'), {'first_name': 'Ada'}, content_type='application/json', headers=headers
+        )
+        self.assertEqual(response.status_code, 200)
+        response = await self.async_client.get(reverse('user-profile'), headers=headers)
+        self.assertEqual(response.json()['response_data']['first_name'], 'Ada')
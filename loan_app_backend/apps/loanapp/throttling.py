@@ -0,0 +1,80 @@
+import hashlib
+from loan_app_backend.apps.common.throttling import SlidingWindowThrottle
+
+
+class ClientRateThrottle(SlidingWindowThrottle):
+    """Limits requests per client IP, for endpoints used before logging in."""
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class AccountRateThrottle(SlidingWindowThrottle):
+    """
+    Limits requests per account named in the request body, whichever IPs they come from.
+
+    Stops a botnet from guessing one user's password or code, or flooding one inbox, from many addresses.
+    With `per_client` set, the limit is per account and client IP instead, so nobody can lock a user
+    out of an endpoint they need just by hammering it with their account name.
+    """
+    field = 'email'
+    per_client = False
+
+    def get_cache_key(self, request, view):
+        value = request.data.get(self.field) if hasattr(request.data, 'get') else None
+        if not value or not isinstance(value, str):
+            return None
+        account = value.strip().lower()
+        if self.per_client:
+            account = f'{self.get_ident(request)} {account}'
+        # Hashed so keys stay short and never contain user input.
+        ident = hashlib.sha256(account.encode('utf-8')).hexdigest()
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class UserRateThrottle(SlidingWindowThrottle):
+    """Limits requests per authenticated user."""
+
+    def get_cache_key(self, request, view):
+        if not request.user or not request.user.is_authenticated:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': request.user.pk}
+
+
+class LoginRateThrottle(ClientRateThrottle):
+    scope = 'login'
+
+
+class LoginAccountRateThrottle(AccountRateThrottle):
+    scope = 'login_account'
+    field = 'email_or_username'
+    per_client = True
+
+
+class RegistrationRateThrottle(ClientRateThrottle):
+    scope = 'registration'
+
+
+class ActivationRateThrottle(ClientRateThrottle):
+    scope = 'activation'
+
+
+class ActivationAccountRateThrottle(AccountRateThrottle):
+    scope = 'activation_account'
+
+
+class PasswordResetRateThrottle(ClientRateThrottle):
+    scope = 'password_reset'
+
+
+class PasswordResetAccountRateThrottle(AccountRateThrottle):
+    scope = 'password_reset_account'
+
+
+class LoanRateThrottle(UserRateThrottle):
+    scope = 'loans'
+
+
+class AdminLoanRateThrottle(UserRateThrottle):
+    """For the admin bulk endpoints, which are each far heavier than a loan list or detail request."""
+    scope = 'admin_loans'
@@ -1,9 +1,13 @@
 from django.urls import path
 from loan_app_backend.apps.loanapp.views.admin_views import (
+    AdminBulkLoanStatusView,
+    AdminLoanExportView,
+    AdminLoanImportView,
     AdminLoanListView,
     AdminLoanUpdateView,
     AdminMakeSuperUserView,
     AdminUserDeleteView,
+    AdminUserExportView,
     AdminUserListView
 )
 from loan_app_backend.apps.loanapp.views.loan_request import (
@@ -13,18 +17,32 @@ from loan_app_backend.apps.loanapp.views.login_registration import (
     RegisterUserView, LoginView, ActivateUserView,
     ForgotPasswordView, ResetPasswordView, UserProfileView
 )
+from loan_app_backend.apps.loanapp.throttling import (
+    ActivationAccountRateThrottle, ActivationRateThrottle, AdminLoanRateThrottle, LoanRateThrottle,
+    LoginAccountRateThrottle, LoginRateThrottle, PasswordResetAccountRateThrottle, PasswordResetRateThrottle,
+    RegistrationRateThrottle
+)
+
+# Rates per scope are set in REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'].
+password_reset_throttles = [PasswordResetRateThrottle, PasswordResetAccountRateThrottle]
 
 urlpatterns = [
-    path('auth/register/', RegisterUserView.as_view(), name='register'),
-    path('auth/login/', LoginView.as_view(), name='login'),
-    path('auth/activate/', ActivateUserView.as_view(), name='activate-user'),
-    path('auth/forgot-password/', ForgotPasswordView.as_view(), name='forgot-password'),
-    path('auth/reset-password/', ResetPasswordView.as_view(), name='reset-password'),
+    path('auth/register/', RegisterUserView.as_view(throttle_classes=[RegistrationRateThrottle]), name='register'),
+    path('auth/login/', LoginView.as_view(throttle_classes=[LoginRateThrottle, LoginAccountRateThrottle]), name='login'),
+    path('auth/activate/', ActivateUserView.as_view(
+        throttle_classes=[ActivationRateThrottle, ActivationAccountRateThrottle]
+    ), name='activate-user'),
+    path('auth/forgot-password/', ForgotPasswordView.as_view(throttle_classes=password_reset_throttles), name='forgot-password'),
+    path('auth/reset-password/', ResetPasswordView.as_view(throttle_classes=password_reset_throttles), name='reset-password'),
     path('profile/', UserProfileView.as_view(), name='user-profile'),
-    path('loans/', LoanApplicationView.as_view(), name='loan-application'),
+    path('loans/', LoanApplicationView.as_view(throttle_classes=[LoanRateThrottle]), name='loan-application'),
     path("admin/users/", AdminUserListView.as_view(), name="admin-user-list"),
+    path("admin/users/export/", AdminUserExportView.as_view(), name="admin-user-export"),
     path("admin/users/<str:id>/delete/", AdminUserDeleteView.as_view(), name="admin-user-delete"),
     path("admin/users/<str:id>/make-superuser/", AdminMakeSuperUserView.as_view(), name="admin-user-make-superuser"),
-    path("admin/loans/", AdminLoanListView.as_view(), name="admin-loan-list"),
-    path("admin/loans/<str:id>/update/", AdminLoanUpdateView.as_view(), name="admin-loan-update"),
+    path("admin/loans/", AdminLoanListView.as_view(throttle_classes=[LoanRateThrottle]), name="admin-loan-list"),
+    path("admin/loans/bulk-update/", AdminBulkLoanStatusView.as_view(throttle_classes=[AdminLoanRateThrottle]), name="admin-loan-bulk-update"),
+    path("admin/loans/export/", AdminLoanExportView.as_view(throttle_classes=[AdminLoanRateThrottle]), name="admin-loan-export"),
+    path("admin/loans/import/", AdminLoanImportView.as_view(throttle_classes=[AdminLoanRateThrottle]), name="admin-loan-import"),
+    path("admin/loans/<str:id>/update/", AdminLoanUpdateView.as_view(throttle_classes=[LoanRateThrottle]), name="admin-loan-update"),
 ]
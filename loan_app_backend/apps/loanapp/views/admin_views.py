@@ -1,3 +1,8 @@
+import codecs
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.permissions import IsAdminUser
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics
@@ -5,18 +10,31 @@ from rest_framework.permissions import IsAuthenticated
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics
+from loan_app_backend.apps.loanapp import caching
 from loan_app_backend.apps.loanapp.models import Users
 from loan_app_backend.apps.loanapp.models import LoanApplication
-from loan_app_backend.apps.loanapp.serializers import AdminLoanApplicationSerializer, LoanApplicationSerializer, UserProfileSerializer
+from loan_app_backend.apps.loanapp.export import (
+    CONTENT_TYPES, EXPORT_FORMATS, LOAN_EXPORT_FIELDS, USER_EXPORT_FIELDS, encode_rows, iterate_async, loan_rows,
+    user_rows
+)
+from loan_app_backend.apps.loanapp.loan_import import guess_format, import_loans, read_rows
+from loan_app_backend.apps.loanapp.loan_status import bulk_update_loan_statuses, UPDATED
+from loan_app_backend.apps.loanapp.serializers import (
+    AdminBulkLoanStatusSerializer, AdminLoanApplicationSerializer, LoanApplicationSerializer, LoanImportSerializer,
+    UserProfileSerializer
+)
+from loan_app_backend.apps.common.caching import CachedListMixin
 from loan_app_backend.apps.common.filter import GenericFilterSet
 from loan_app_backend.apps.common.pagination import GenericPagination
+from loan_app_backend.apps.common.responses import EnvelopeResponse
 
 
-class AdminUserListView(generics.ListAPIView):
+class AdminUserListView(CachedListMixin, generics.ListAPIView):
     serializer_class = UserProfileSerializer
     permission_classes = [IsAuthenticated, IsAdminUser]
     pagination_class = GenericPagination
-    queryset = Users.objects.all().order_by('-date_joined')
+    cache_scopes = [caching.USERS]
+    queryset = Users.objects.only(*UserProfileSerializer.Meta.fields).order_by('-date_joined')
     filter_backends = [DjangoFilterBackend]
     filterset_class = type(
         'UserFilterSet',
@@ -36,10 +54,11 @@ class AdminUserListView(generics.ListAPIView):
         return super().get(request, *args, **kwargs)
 
 
-class AdminLoanListView(generics.ListAPIView):
+class AdminLoanListView(CachedListMixin, generics.ListAPIView):
     serializer_class = AdminLoanApplicationSerializer
     permission_classes = [IsAuthenticated, IsAdminUser]
     pagination_class = GenericPagination
+    cache_scopes = [caching.LOANS, caching.USERS, caching.FRAUD_FLAGS]  # Each loan embeds its user.
     filter_backends = [DjangoFilterBackend]
     filterset_class = type(
         'LoanFilterSet',
@@ -49,24 +68,83 @@ class AdminLoanListView(generics.ListAPIView):
                 'model': LoanApplication,
                 'fields': [],
             }),
-            'text_search_fields': ['status'],
+            'exact_fields': ['status'],
             'date_fields': ['created_at'],
             '__module__': __name__,
             '__doc__': 'Dynamic Loan filter'
         }
     )
 
-    queryset = LoanApplication.objects.all().order_by('-created_at')
+    queryset = LoanApplication.objects.select_related('user').only(
+        *AdminLoanApplicationSerializer.Meta.fields, 'created_at',
+        *(f'user__{field}' for field in UserProfileSerializer.Meta.fields),
+    ).order_by('-created_at')
 
     @extend_schema(summary="Admin View All Loans", responses={200: LoanApplicationSerializer})
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
 
+class AdminExportView(generics.GenericAPIView):
+    """
+    Streams the filtered queryset as CSV or JSON Lines (`?export_format=csv|jsonl`).
+
+    Rows are read through a server-side cursor and sent as they are encoded, so memory stays flat however
+    many rows match, under WSGI and ASGI alike. Subclasses set `export_name`, `export_fields` and
+    `export_rows` (queryset -> dicts).
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    filter_backends = [DjangoFilterBackend]
+    pagination_class = None
+    export_name = None
+    export_fields = None
+    export_rows = None
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return EnvelopeResponse(
+                "Validation failed.", {"export_format": [f"Choose one of: {', '.join(EXPORT_FORMATS)}."]}, status=400
+            )
+
+        rows = self.export_rows(self.filter_queryset(self.get_queryset()))
+        blocks = encode_rows(rows, self.export_fields, export_format)
+        if isinstance(request._request, ASGIRequest):
+            blocks = iterate_async(blocks)
+        response = StreamingHttpResponse(blocks, content_type=CONTENT_TYPES[export_format])
+        filename = f"{self.export_name}-{timezone.now():%Y%m%d-%H%M%S}.{export_format}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class AdminLoanExportView(AdminExportView):
+    queryset = LoanApplication.objects.order_by('-created_at')
+    filterset_class = AdminLoanListView.filterset_class
+    export_name = 'loans'
+    export_fields = LOAN_EXPORT_FIELDS
+    export_rows = staticmethod(loan_rows)
+
+    @extend_schema(summary="Admin Export Loans", responses={200: OpenApiResponse(description="CSV or JSON Lines file")})
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
+class AdminUserExportView(AdminExportView):
+    queryset = Users.objects.order_by('-date_joined')
+    filterset_class = AdminUserListView.filterset_class
+    export_name = 'users'
+    export_fields = USER_EXPORT_FIELDS
+    export_rows = staticmethod(user_rows)
+
+    @extend_schema(summary="Admin Export Users", responses={200: OpenApiResponse(description="CSV or JSON Lines file")})
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
 class AdminLoanUpdateView(generics.UpdateAPIView):
     serializer_class = AdminLoanApplicationSerializer
     permission_classes = [IsAuthenticated, IsAdminUser]
-    queryset = LoanApplication.objects.all()
+    queryset = LoanApplication.objects.select_related('user')
     lookup_field = 'id'
 
     @extend_schema(summary="Admin Update Loan Status", request=AdminLoanApplicationSerializer, responses={200: AdminLoanApplicationSerializer})
@@ -74,6 +152,58 @@ class AdminLoanUpdateView(generics.UpdateAPIView):
         return super().partial_update(request, *args, **kwargs)
 
 
+class AdminBulkLoanStatusView(generics.GenericAPIView):
+    serializer_class = AdminBulkLoanStatusSerializer
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    @extend_schema(
+        summary="Admin Bulk Update Loan Statuses",
+        request=AdminBulkLoanStatusSerializer,
+        responses={200: OpenApiResponse(description="Per-loan results")}
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return EnvelopeResponse("Validation failed.", serializer.errors, status=400)
+
+        results = bulk_update_loan_statuses(serializer.validated_data['updates'], request.user)
+        return EnvelopeResponse("Loan statuses updated.", {
+            "updated": sum(result['result'] == UPDATED for result in results),
+            "results": results,
+        }, status=200)
+
+
+class AdminLoanImportView(generics.GenericAPIView):
+    serializer_class = LoanImportSerializer
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    parser_classes = [JSONParser, MultiPartParser]
+
+    @extend_schema(
+        summary="Admin Import Loans",
+        request=LoanImportSerializer,
+        responses={200: OpenApiResponse(description="Import summary with per-row errors")}
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return EnvelopeResponse("Validation failed.", serializer.errors, status=400)
+
+        upload = serializer.validated_data.get('file')
+        if upload is not None:
+            rows = read_rows(codecs.iterdecode(upload, 'utf-8-sig'), guess_format(upload.name))
+        else:
+            rows = serializer.validated_data['loans']
+
+        result = import_loans(rows)
+        return EnvelopeResponse("Loan import finished.", {
+            "created": result.created,
+            "flagged": result.flagged,
+            "rejected": len(result.errors),
+            "errors": result.errors,
+            "rows_per_second": round(result.rows_per_second),
+        }, status=200)
+
+
 class AdminUserDeleteView(generics.DestroyAPIView):
     permission_classes = [IsAuthenticated, IsAdminUser]
     queryset = Users.objects.all()
@@ -98,7 +228,6 @@ class AdminMakeSuperUserView(generics.UpdateAPIView):
         user = self.get_object()
         user.is_superuser = True
         user.save()
-        return JsonResponse({
-            "message": "User successfully promoted to superuser.",
-            "data": {"user_id": user.id, "email": user.email}
-        }, status=200)
+        return EnvelopeResponse(
+            "User successfully promoted to superuser.", {"user_id": user.id, "email": user.email}, status=200
+        )
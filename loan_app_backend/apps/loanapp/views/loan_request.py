@@ -1,12 +1,15 @@
+from asgiref.sync import sync_to_async
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
 from drf_spectacular.utils import extend_schema, OpenApiResponse
-from django.utils import timezone
-from django.http import JsonResponse
-import datetime
+from loan_app_backend.apps.common.caching import CachedListMixin
+from loan_app_backend.apps.common.views import AsyncAPIViewMixin
+from loan_app_backend.apps.common.responses import EnvelopeResponse
 from django_filters.rest_framework import DjangoFilterBackend
+from loan_app_backend.apps.loanapp import caching
 from loan_app_backend.apps.loanapp.emails import send_email
-from loan_app_backend.apps.loanapp.models import Users, LoanApplication, FraudFlag
+from loan_app_backend.apps.loanapp.fraud import FraudContext, fraud_engine
+from loan_app_backend.apps.loanapp.models import LoanApplication, FraudFlag
 from loan_app_backend.apps.loanapp.serializers import LoanApplicationSerializer
 from loan_app_backend.apps.common.filter import GenericFilterSet
 from loan_app_backend.apps.common.pagination import GenericPagination
@@ -22,15 +25,22 @@ class LoanApplicationFilter(GenericFilterSet):
         boolean_fields = []
 
 
-class LoanApplicationView(generics.ListCreateAPIView):
+class LoanApplicationView(AsyncAPIViewMixin, CachedListMixin, generics.ListCreateAPIView):
     serializer_class = LoanApplicationSerializer
     permission_classes = [IsAuthenticated]
     pagination_class = GenericPagination
     filter_backends = [DjangoFilterBackend]
     filterset_class = LoanApplicationFilter
 
+    def get_cache_scopes(self):
+        return [caching.user_loans(self.request.user.pk), caching.LOANS_BULK]
+
     def get_queryset(self):
-        return LoanApplication.objects.filter(user=self.request.user).order_by('-created_at')
+        if getattr(self, 'swagger_fake_view', False):  # Schema generation: there is no user to filter by.
+            return LoanApplication.objects.none()
+        return LoanApplication.objects.filter(user=self.request.user).only(
+            *LoanApplicationSerializer.Meta.fields, 'created_at'
+        ).order_by('-created_at')
 
     @extend_schema(
         summary="Submit Loan Request",
@@ -40,57 +50,64 @@ class LoanApplicationView(generics.ListCreateAPIView):
             400: OpenApiResponse(description="Validation errors")
         }
     )
-    def create(self, request, *args, **kwargs):
+    def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         if not serializer.is_valid():
-            return JsonResponse({
-                "message": "Loan application failed.",
-                "data": serializer.errors
-            }, status=400)
+            return EnvelopeResponse("Loan application failed.", serializer.errors, status=400)
 
         self.perform_create(serializer)
-        return JsonResponse({
-            "message": "Loan application submitted successfully.",
-            "data": serializer.data
-        }, status=201)
+        return EnvelopeResponse("Loan application submitted successfully.", serializer.data, status=201)
+
+    async def apost(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return EnvelopeResponse("Loan application failed.", serializer.errors, status=400)
+
+        await self.aperform_create(serializer)
+        return EnvelopeResponse("Loan application submitted successfully.", serializer.data, status=201)
 
     def perform_create(self, serializer):
         user = self.request.user
-        now = timezone.now()
-        flagged = None
-        reason = None
-
-        # 1. More than 3 loans in last 24 hours
-        if LoanApplication.objects.filter(user=user, created_at__gte=now - datetime.timedelta(hours=24)).count() >= 3:
-            reason = "More than 3 loans in 24 hours"
-            flagged = serializer.save(user=user, status='flagged')
-            FraudFlag.objects.create(loan_application=flagged, reason=reason)
-
-        # 2. Amount exceeds 5 million
-        elif serializer.validated_data['amount_requested'] > 5_000_000:
-            reason = "Amount exceeds NGN 5,000,000"
-            flagged = serializer.save(user=user, status='flagged')
-            FraudFlag.objects.create(loan_application=flagged, reason=reason)
-
-        # 3. More than 10 users share the same email domain
-        else:
-            domain = user.email.split('@')[-1]
-            users_with_same_domain = Users.objects.filter(email__iendswith=f'@{domain}').distinct()
-            if users_with_same_domain.count() > 10:
-                reason = "Email domain used by more than 10 users"
-                flagged = serializer.save(user=user, status='flagged')
-                FraudFlag.objects.create(loan_application=flagged, reason=reason)
-
-        if flagged:
-            send_email(
-                subject="🚨 Flagged Loan Detected",
-                message=(
-                    f"Flagged Loan Alert\n\n"
-                    f"User: {user.email}\n"
-                    f"Amount: {serializer.validated_data['amount_requested']}\n"
-                    f"Reason: {reason}"
-                ),
-                recipient_list=[settings.DEFAULT_FROM_EMAIL]
-            )
-        else:
+        context = FraudContext(user, serializer.validated_data['amount_requested'])
+        matched_rules = fraud_engine.evaluate(context)
+
+        if not matched_rules:
             serializer.save(user=user, status='pending')
+            return
+
+        flagged = serializer.save(user=user, status='flagged')
+        for rule in matched_rules:
+            FraudFlag.objects.create(loan_application=flagged, reason=rule.reason)
+        self.send_flagged_alert(serializer, matched_rules)
+
+    async def aperform_create(self, serializer):
+        user = self.request.user
+        # Token-authenticated users only carry their claims; load what the fraud rules and the alert read.
+        deferred = user.get_deferred_fields() & {'email', 'email_domain'}
+        if deferred:
+            await user.arefresh_from_db(fields=sorted(deferred))
+
+        context = await FraudContext(user, serializer.validated_data['amount_requested']).aload()
+        matched_rules = fraud_engine.evaluate(context)
+
+        serializer.instance = await LoanApplication.objects.acreate(
+            user=user, status='flagged' if matched_rules else 'pending', **serializer.validated_data
+        )
+        if not matched_rules:
+            return
+
+        for rule in matched_rules:
+            await FraudFlag.objects.acreate(loan_application=serializer.instance, reason=rule.reason)
+        await sync_to_async(self.send_flagged_alert)(serializer, matched_rules)
+
+    def send_flagged_alert(self, serializer, matched_rules):
+        send_email(
+            subject="🚨 Flagged Loan Detected",
+            message=(
+                f"Flagged Loan Alert\n\n"
+                f"User: {self.request.user.email}\n"
+                f"Amount: {serializer.validated_data['amount_requested']}\n"
+                f"Reason: {'; '.join(rule.reason for rule in matched_rules)}"
+            ),
+            recipient_list=[settings.DEFAULT_FROM_EMAIL]
+        )
@@ -1,22 +1,19 @@
+from asgiref.sync import sync_to_async
 from rest_framework import generics
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 from django.utils import timezone
-from django.http import JsonResponse
-import datetime
+from loan_app_backend.apps.common.responses import EnvelopeResponse
+from loan_app_backend.apps.common.views import AsyncAPIViewMixin
 from loan_app_backend.apps.loanapp.serializers import (
     RegistrationSerializer, LoginSerializer, ActivateUserSerializer, ForgotPasswordSerializer,
     ResetPasswordSerializer, UserProfileSerializer, UserProfileUpdateSerializer
 )
-from loan_app_backend.apps.loanapp.models import Users, ActivationCode
+from loan_app_backend.apps.loanapp.models import Users
+from loan_app_backend.apps.loanapp.activation import CODE_EXPIRED, CODE_VALID, consume_code, issue_code
+from loan_app_backend.apps.loanapp.authentication import ClaimsRefreshToken
 from loan_app_backend.apps.loanapp.emails import CustomActivationEmail
-import random
-import string
-
-
-def generate_activation_code():
-    return ''.join(random.choices(string.digits, k=6))
+from loan_app_backend.apps.loanapp.identity import resolve_user_by_email
 
 
 class RegisterUserView(generics.CreateAPIView):
@@ -27,26 +24,20 @@ class RegisterUserView(generics.CreateAPIView):
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         if not serializer.is_valid():
-            return JsonResponse({
-                "message": "Validation failed.",
-                "data": serializer.errors
-            }, status=400)
+            return EnvelopeResponse("Validation failed.", serializer.errors, status=400)
 
         user = serializer.save()
 
-        code = generate_activation_code()
-        ActivationCode.objects.filter(user=user, purpose='activation').delete()
-        ActivationCode.objects.create(user=user, code=code, purpose='activation', expires_at=timezone.now() + datetime.timedelta(minutes=5))
+        code = issue_code(user, 'activation')
 
         CustomActivationEmail({'user': user, 'activation_code': code}).send([user.email])
 
-        return JsonResponse({
-            "message": "Registration successful. Please check your email to activate your account.",
-            "data": {}
-        }, status=201)
+        return EnvelopeResponse(
+            "Registration successful. Please check your email to activate your account.", {}, status=201
+        )
 
 
-class LoginView(generics.GenericAPIView):
+class LoginView(AsyncAPIViewMixin, generics.GenericAPIView):
     serializer_class = LoginSerializer
     permission_classes = [AllowAny]
 
@@ -54,15 +45,22 @@ class LoginView(generics.GenericAPIView):
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         if not serializer.is_valid():
-            return JsonResponse({
-                "message": "Validation failed.",
-                "data": serializer.errors
-            }, status=400)
+            return EnvelopeResponse("Validation failed.", serializer.errors, status=400)
 
         user = serializer.validated_data['user']
+        return self.login_response(user, ClaimsRefreshToken.for_user(user))
 
-        refresh = RefreshToken.for_user(user)
+    async def apost(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        # Validation verifies the password hash, which is deliberately slow: keep it off the event loop.
+        if not await sync_to_async(serializer.is_valid)():
+            return EnvelopeResponse("Validation failed.", serializer.errors, status=400)
+
+        user = serializer.validated_data['user']
+        refresh = await sync_to_async(ClaimsRefreshToken.for_user)(user)  # Records the OutstandingToken.
+        return self.login_response(user, refresh)
 
+    def login_response(self, user, refresh):
         user_data = UserProfileSerializer(user).data
         user_data['is_superuser'] = user.is_superuser
 
@@ -74,10 +72,7 @@ class LoginView(generics.GenericAPIView):
             'refresh_token_expiration': timezone.now() + refresh.lifetime
         }
 
-        return JsonResponse({
-            "message": "User logged in successfully.",
-            "data": data
-        }, status=200)
+        return EnvelopeResponse("User logged in successfully.", data, status=200)
 
 
 class ActivateUserView(generics.GenericAPIView):
@@ -88,50 +83,38 @@ class ActivateUserView(generics.GenericAPIView):
     def post(self, request):
         serializer = self.get_serializer(data=request.data)
         if not serializer.is_valid():
-            return JsonResponse({
-                "message": "Validation failed.",
-                "data": serializer.errors
-            }, status=400)
+            return EnvelopeResponse("Validation failed.", serializer.errors, status=400)
 
         email = serializer.validated_data['email']
         resend_code = serializer.validated_data['resend_code']
         code = serializer.validated_data['code']
-        user = Users.objects.get(email=email)
+        user = resolve_user_by_email(request, email)  # Already fetched by validate_email().
 
         if resend_code:
-            ActivationCode.objects.filter(user=user, purpose='activation').delete()
-            new_code = generate_activation_code()
-            ActivationCode.objects.create(user=user, code=new_code, purpose='activation', expires_at=timezone.now() + datetime.timedelta(minutes=5))
+            new_code = issue_code(user, 'activation')
             CustomActivationEmail({'user': user, 'activation_code': new_code}).send([email])
-            return JsonResponse({"message": "New activation code sent.", "data": {}}, status=200)
-
-        try:
-            activation_code = ActivationCode.objects.get(user=user, code=code, purpose='activation')
-        except ActivationCode.DoesNotExist:
-            return JsonResponse({"message": "Invalid or expired activation code.", "data": {}}, status=400)
+            return EnvelopeResponse("New activation code sent.", {}, status=200)
 
-        if activation_code.is_expired():
-            activation_code.delete()
-            return JsonResponse({"message": "Activation code expired.", "data": {}}, status=400)
+        result = consume_code(user, 'activation', code)
+        if result == CODE_EXPIRED:
+            return EnvelopeResponse("Activation code expired.", {}, status=400)
+        if result != CODE_VALID:
+            return EnvelopeResponse("Invalid or expired activation code.", {}, status=400)
 
         user.is_active = True
         user.save()
-        activation_code.delete()
 
-        refresh = RefreshToken.for_user(user)
+        refresh = ClaimsRefreshToken.for_user(user)
 
         user_data = UserProfileSerializer(user).data
         user_data['is_superuser'] = user.is_superuser
 
-        return JsonResponse({
-            "message": "User activated successfully.",
-            "data": {
-                "user": user_data,
-                "access_token": str(refresh.access_token),
-                "refresh_token": str(refresh),
-                "access_token_expiration": (timezone.now() + refresh.access_token.lifetime).isoformat(),
-                "refresh_token_expiration": (timezone.now() + refresh.lifetime).isoformat(),
-            }
+        return EnvelopeResponse("User activated successfully.", {
+            "user": user_data,
+            "access_token": str(refresh.access_token),
+            "refresh_token": str(refresh),
+            "access_token_expiration": (timezone.now() + refresh.access_token.lifetime).isoformat(),
+            "refresh_token_expiration": (timezone.now() + refresh.lifetime).isoformat(),
         }, status=200)
 
 
@@ -143,19 +126,13 @@ class ForgotPasswordView(generics.GenericAPIView):
     def post(self, request):
         serializer = self.get_serializer(data=request.data)
         if not serializer.is_valid():
-            return JsonResponse({
-                "message": "Validation failed.",
-                "data": serializer.errors
-            }, status=400)
+            return EnvelopeResponse("Validation failed.", serializer.errors, status=400)
         email = serializer.validated_data['email']
-        user = Users.objects.get(email=email)
-        code = generate_activation_code()
-
-        ActivationCode.objects.filter(user=user, purpose='reset').delete()
-        ActivationCode.objects.create(user=user, code=code, purpose='reset', expires_at=timezone.now() + datetime.timedelta(minutes=5))
+        user = resolve_user_by_email(request, email)  # Already fetched by validate_email().
+        code = issue_code(user, 'reset')
 
         CustomActivationEmail({'user': user, 'activation_code': code}).send([email])
-        return JsonResponse({"message": "Password reset code sent to email.", "data": {}}, status=200)
+        return EnvelopeResponse("Password reset code sent to email.", {}, status=200)
 
 
 class ResetPasswordView(generics.GenericAPIView):
@@ -166,37 +143,34 @@ class ResetPasswordView(generics.GenericAPIView):
     def post(self, request):
         serializer = self.get_serializer(data=request.data)
         if not serializer.is_valid():
-            return JsonResponse({
-                "message": "Validation failed.",
-                "data": serializer.errors
-            }, status=400)
+            return EnvelopeResponse("Validation failed.", serializer.errors, status=400)
         email = serializer.validated_data['email']
         code = serializer.validated_data['code']
         new_password = serializer.validated_data['new_password']
 
-        try:
-            reset_code = ActivationCode.objects.get(user__email=email, code=code, purpose='reset')
-        except ActivationCode.DoesNotExist:
-            return JsonResponse({"message": "Invalid or expired reset code.", "data": {}}, status=400)
-
-        if reset_code.is_expired():
-            reset_code.delete()
-            return JsonResponse({"message": "Reset code expired.", "data": {}}, status=400)
+        user = resolve_user_by_email(request, email)
+        result = consume_code(user, 'reset', code) if user is not None else None
+        if result == CODE_EXPIRED:
+            return EnvelopeResponse("Reset code expired.", {}, status=400)
+        if result != CODE_VALID:
+            return EnvelopeResponse("Invalid or expired reset code.", {}, status=400)
 
-        user = reset_code.user
         user.set_password(new_password)
         user.save()
-        reset_code.delete()
 
-        return JsonResponse({"message": "Password reset successful.", "data": {}}, status=200)
+        return EnvelopeResponse("Password reset successful.", {}, status=200)
 
 
-class UserProfileView(generics.RetrieveUpdateDestroyAPIView):
+class UserProfileView(AsyncAPIViewMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = UserProfileUpdateSerializer
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
-        return self.request.user
+        # request.user only carries the token claims; the profile needs the full row.
+        return Users.objects.get(pk=self.request.user.pk)
+
+    async def aget_object(self):
+        return await Users.objects.aget(pk=self.request.user.pk)
 
     @extend_schema(
         summary="Get Current User Profile",
@@ -204,10 +178,11 @@ class UserProfileView(generics.RetrieveUpdateDestroyAPIView):
     )
     def get(self, request, *args, **kwargs):
         serializer = UserProfileSerializer(self.get_object())
-        return JsonResponse({
-            "message": "User profile fetched successfully.",
-            "data": serializer.data
-        }, status=200)
+        return EnvelopeResponse("User profile fetched successfully.", serializer.data, status=200)
+
+    async def aget(self, request, *args, **kwargs):
+        serializer = UserProfileSerializer(await self.aget_object())
+        return EnvelopeResponse("User profile fetched successfully.", serializer.data, status=200)
 
     @extend_schema(
         summary="Update User Profile",
@@ -221,15 +196,17 @@ class UserProfileView(generics.RetrieveUpdateDestroyAPIView):
         instance = self.get_object()
         serializer = self.get_serializer(instance, data=request.data, partial=True)
         if not serializer.is_valid():
-            return JsonResponse({
-                "message": "Profile update failed.",
-                "data": serializer.errors
-            }, status=400)
+            return EnvelopeResponse("Profile update failed.", serializer.errors, status=400)
         serializer.save()
-        return JsonResponse({
-            "message": "Profile updated successfully.",
-            "data": serializer.data
-        }, status=200)
+        return EnvelopeResponse("Profile updated successfully.", serializer.data, status=200)
+
+    async def apatch(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance, data=request.data, partial=True)
+        if not serializer.is_valid():
+            return EnvelopeResponse("Profile update failed.", serializer.errors, status=400)
+        await sync_to_async(serializer.save)()  # May hash a new password; keep that off the event loop.
+        return EnvelopeResponse("Profile updated successfully.", serializer.data, status=200)
 
     @extend_schema(
         summary="Delete User Profile",
@@ -237,7 +214,8 @@ class UserProfileView(generics.RetrieveUpdateDestroyAPIView):
     )
     def delete(self, request, *args, **kwargs):
         self.get_object().delete()
-        return JsonResponse({
-            "message": "User profile deleted successfully.",
-            "data": {}
-        }, status=204)
+        return EnvelopeResponse("User profile deleted successfully.", {}, status=204)
+
+    async def adelete(self, request, *args, **kwargs):
+        await (await self.aget_object()).adelete()
+        return EnvelopeResponse("User profile deleted successfully.", {}, status=204)
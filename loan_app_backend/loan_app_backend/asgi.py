@@ -8,6 +8,9 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
 
 import os
+
+os.environ.setdefault("ASYNC_VIEWS", "True")  # Serve the views that have async handlers natively async.
+
 from loan_app_backend.loan_app_backend.configurations import DEBUG
 
 from django.core.asgi import get_asgi_application
@@ -3,6 +3,7 @@ from decouple import config, Csv
 # Basic settings
 BASE_PREFIX = config('BASE_PREFIX', default='')
 DEBUG = config('DEBUG', default=True, cast=bool)
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
 SECRET_KEY = config('SECRET_KEY', default='')
 ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='127.0.0.1', cast=Csv())
 EMAIL_BACKEND = config('EMAIL_BACKEND', default='')
@@ -28,6 +29,7 @@ DB_NAME = config('DB_NAME', default='')
 DB_USER_NAME = config('DB_USER_NAME', default='')
 DB_PASSWORD = config('DB_PASSWORD', default='')
 DATABASE_URL=f'postgresql://{DB_USER_NAME}:{DB_PASSWORD}@{DB_HOST_NAME}/{DB_NAME}'
+REDIS_URL = config('REDIS_URL', default='redis://localhost:6379/0')
 STRIPE_SECRET_KEY = config('STRIPE_SECRET_KEY', default='')
 STRIPE_WEBHOOK_SECRET = config('STRIPE_WEBHOOK_SECRET', default='')
 GOOGLE_CLIENT_ID = config('GOOGLE_CLIENT_ID', default='')
@@ -21,6 +21,7 @@ from loan_app_backend.loan_app_backend.configurations import (
     ALLOWED_HOSTS,
     BASE_PREFIX,
     DEBUG,
+    ASYNC_VIEWS,
     EMAIL_BACKEND,
     EMAIL_HOST,
     EMAIL_HOST_PASSWORD,
@@ -37,7 +38,8 @@ from loan_app_backend.loan_app_backend.configurations import (
     CLOUDINARY_CLOUD_NAME,
     CLOUDINARY_API_KEY,
     CLOUDINARY_API_SECRET,
-    DATABASE_URL
+    DATABASE_URL,
+    REDIS_URL,
 )
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -56,6 +58,10 @@ DEBUG = DEBUG
 
 ALLOWED_HOSTS = ALLOWED_HOSTS
 
+# Run the views that have async handlers as native async views (see loan_app_backend/apps/common/views.py).
+# asgi.py turns this on; under WSGI they keep their sync handlers, which need no event loop per request.
+ASYNC_VIEWS = ASYNC_VIEWS
+
 CORS_ALLOWED_ORIGINS = [
     'http://localhost:5173',  # Frontend running locally
     'https://mint-molly-extremely.ngrok-free.app',  # Backend
@@ -125,6 +131,7 @@ MIDDLEWARE.insert(0, 'corsheaders.middleware.CorsMiddleware')
 
 AUTHENTICATION_BACKENDS = [
     'django.contrib.auth.backends.ModelBackend',
+    'loan_app_backend.apps.loanapp.backends.ResolvedUserBackend',
 ]
 
 if ENABLE_SOCIAL_AUTH:
@@ -142,11 +149,63 @@ SPECTACULAR_SETTINGS = {
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'loan_app_backend.apps.loanapp.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'loan_app_backend.apps.common.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    # Sliding window limits per scope; the throttles are attached per view in loanapp/urls.py
+    # (see loan_app_backend/apps/loanapp/throttling.py). They share the default cache, so run a shared
+    # cache such as Redis when serving from more than one process.
+    'DEFAULT_THROTTLE_RATES': {
+        'login': '20/min',  # Per client IP.
+        'login_account': '10/min',  # Per email or username tried, per client IP.
+        'registration': '10/hour',
+        'activation': '20/min',
+        'activation_account': '10/hour',
+        'password_reset': '10/min',
+        'password_reset_account': '5/hour',
+        'loans': '60/min',  # Per user.
+        'admin_loans': '10/min',  # Per admin, for bulk status updates, imports and exports.
+    },
+}
+
+# Shared by every worker: token claim changes, blacklisted refresh tokens, cached list responses and
+# their versions, counts and throttle history all have to be seen by every process, not just one.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    }
+}
+
+# JSON encoder for API responses: "auto" uses orjson when installed, "stdlib" forces the json module
+# (see loan_app_backend/apps/common/renderers.py)
+JSON_BACKEND = 'auto'
+
+# Count strategy for paginated list endpoints (see loan_app_backend/apps/common/counting.py)
+PAGINATION_COUNT = {
+    'ESTIMATE_THRESHOLD': 100_000,
+    'CACHE_THRESHOLD': 1_000,
+    'CACHE_TIMEOUT': 10,
+}
+
+# Cached responses of the user and admin list endpoints (see loan_app_backend/apps/common/caching.py)
+RESPONSE_CACHE = {
+    'TIMEOUT': 300,
+    'ALLOW_LOCAL_CACHE': False,
+}
+
+# Process-local caches in front of the shared cache of user claim changes and blacklisted refresh tokens
+# (see loan_app_backend/apps/loanapp/authentication.py)
+AUTH_CLAIMS_CACHE = {
+    'LOCAL_MAXSIZE': 10_000,
+    'LOCAL_TTL': 5,
+    'BLACKLIST_LOCAL_MAXSIZE': 10_000,
 }
 
 SIMPLE_JWT = {
@@ -156,6 +215,7 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
+    'TOKEN_REFRESH_SERIALIZER': 'loan_app_backend.apps.loanapp.serializers.ClaimsTokenRefreshSerializer',
 }
 
 ROOT_URLCONF = 'loan_app_backend.loan_app_backend.urls'
@@ -176,7 +236,17 @@ TEMPLATES = [
     },
 ]
 
-CELERY_BROKER_URL = 'redis://localhost:6379/0'  # Redis URL
+# Outbound email queue, delivered by `python manage.py send_queued_emails --loop`
+# (see loan_app_backend/apps/loanapp/outbox.py)
+EMAIL_OUTBOX = {
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_DELAY': 30,
+    'MAX_RETRY_DELAY': 3600,
+    'CLAIM_TIMEOUT': 300,
+}
+
+CELERY_BROKER_URL = REDIS_URL
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 
@@ -198,6 +268,24 @@ cloudinary.config(
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
+# The first hasher hashes new passwords and upgrades older hashes on login; the others only verify.
+# Cost parameters are tuned with PASSWORD_HASHER_POLICY (see loan_app_backend/apps/loanapp/hashers.py).
+PASSWORD_HASHERS = [
+    'loan_app_backend.apps.loanapp.hashers.TunedScryptPasswordHasher',
+    'loan_app_backend.apps.loanapp.hashers.TunedPBKDF2PasswordHasher',
+    'loan_app_backend.apps.loanapp.hashers.TunedArgon2PasswordHasher',
+]
+
+PASSWORD_HASHER_POLICY = {
+    'SCRYPT_WORK_FACTOR': 2**14,
+    'SCRYPT_BLOCK_SIZE': 8,
+    'SCRYPT_PARALLELISM': 1,
+    'ARGON2_TIME_COST': 2,
+    'ARGON2_MEMORY_COST': 19_456,
+    'ARGON2_PARALLELISM': 1,
+    'PBKDF2_ITERATIONS': 1_000_000,
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -13,3 +13,11 @@ DATABASES = {
         'NAME': BASE_DIR / 'db.sqlite3',
     }
 }
+
+# A single development server (and the test runner) can make do with a process-local cache.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+RESPONSE_CACHE = {**RESPONSE_CACHE, 'ALLOW_LOCAL_CACHE': True}
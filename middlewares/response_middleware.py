@@ -1,40 +1,58 @@
 # loan_app_backend/middlewares/response_middleware.py
 import json
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.http import JsonResponse
 from rest_framework.exceptions import APIException
+from loan_app_backend.apps.common.renderers import loads
+from loan_app_backend.apps.common.responses import EnvelopeResponse
 
 class APIResponseMiddleware:
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        response = self.get_response(request)
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.wrap_response(self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.wrap_response(await self.get_response(request))
 
+    def wrap_response(self, response):
         # Skip processing for redirect responses (300–399)
         if 300 <= response.status_code < 400:
             return response
 
+        # Views and GenericPagination return EnvelopeResponse: wrap the payload before it is ever encoded
+        if isinstance(response, EnvelopeResponse):
+            return response.wrap()
+
         # Handle JsonResponse
         if isinstance(response, JsonResponse):
             try:
-                content = json.loads(response.content)
+                content = loads(response.content)
                 if "response_status" not in content:
-                    return JsonResponse({
-                        "response_status": "success" if response.status_code <= 399 else "error",
-                        "response_description": content.get("response_description", content.get("message", "Request processed")),
-                        "response_data": content.get("response_data", content.get("data", {})),
-                    }, status=response.status_code)
+                    return EnvelopeResponse(
+                        content.get("response_description", content.get("message", "Request processed")),
+                        content.get("response_data", content.get("data", {})),
+                        status=response.status_code,
+                    ).wrap()
             except json.JSONDecodeError:
                 pass  # Handle non-JSON content below
         # Handle DRF errors or other responses
         if response.status_code > 399:
             try:
-                content = json.loads(response.content) if hasattr(response, 'content') else {}
+                content = loads(response.content) if hasattr(response, 'content') else {}
             except json.JSONDecodeError:
                 content = {"detail": response.reason_phrase}
-            return JsonResponse({
-                "response_status": "error",
-                "response_description": content.get("detail", "An error occurred"),
-                "response_data": content,
-            }, status=response.status_code)
+            wrapped = EnvelopeResponse(content.get("detail", "An error occurred"), content, status=response.status_code)
+            # Throttled (429) and unavailable (503) responses tell clients when to come back
+            if response.has_header("Retry-After"):
+                wrapped["Retry-After"] = response["Retry-After"]
+            return wrapped.wrap()
         return response
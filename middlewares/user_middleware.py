@@ -1,16 +1,71 @@
 # middleware.py
-import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 
-_thread_locals = threading.local()
+# Context variables rather than thread locals: under ASGI one thread runs the coroutines of many
+# requests, and sync_to_async() carries the context into the worker thread that runs sync code.
+# Threads started by hand don't inherit it; run their target with contextvars.copy_context().run().
+_current_request = ContextVar('current_request', default=None)
+_UNSET = object()
+_acting_user = ContextVar('acting_user', default=_UNSET)
 
 def get_current_user():
-    return getattr(_thread_locals, 'user', None)
+    """
+    Return the user that writes in this context are attributed to, or None.
+
+    That is the user of the innermost acting_as() block if there is one, else the authenticated user
+    of the request being handled. The request's user is resolved on first use rather than up front, so
+    requests that never save a BaseModel don't pay for it, and DRF's authentication (which runs inside
+    the view) has already set it.
+    """
+    user = _acting_user.get()
+    if user is not _UNSET:
+        return user
+    request = _current_request.get()
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return None
+    return user
+
+@contextmanager
+def acting_as(user):
+    """
+    Attribute the writes made inside the block to `user`, e.g. in a management command or worker task.
+
+    Takes precedence over the request's user; acting_as(None) attributes writes to no one. The previous
+    user is restored on exit, so blocks nest.
+    """
+    token = _acting_user.set(user)
+    try:
+        yield user
+    finally:
+        _acting_user.reset(token)
+
+@contextmanager
+def handling_request(request):
+    """Make `request` the current request inside the block, as CurrentUserMiddleware does for every request."""
+    token = _current_request.set(request)
+    try:
+        yield request
+    finally:
+        _current_request.reset(token)
 
 class CurrentUserMiddleware:
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
-        
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
     def __call__(self, request):
-        _thread_locals.user = getattr(request, 'user', None)
-        response = self.get_response(request)
-        return response
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with handling_request(request):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with handling_request(request):
+            return await self.get_response(request)